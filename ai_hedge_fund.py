@@ -886,11 +886,11 @@ def main():
                 if financials:
                     if args.dashboard:
                         # Full dashboard
-                        print(viz.generate_ascii_health_dashboard(tickers[0], financials))
+                        viz.generate_ascii_health_dashboard(tickers[0], financials, out=sys.stdout)
                         print(viz.generate_radar_summary(tickers[0], financials))
                     else:
                         # Quick visual summary
-                        print(viz.generate_ascii_health_dashboard(tickers[0], financials))
+                        viz.generate_ascii_health_dashboard(tickers[0], financials, out=sys.stdout)
             
             # Optional: Hot scanner
             if args.hot:
@@ -8,13 +8,21 @@ Integrates Alpha Vantage API for high-quality financial data
 import os
 import sys
 import json
+import asyncio
+import threading
 import subprocess
+import time
 from datetime import datetime
-from typing import Dict, List, Literal, Optional
+from typing import TYPE_CHECKING, Dict, List, Literal, Optional, Tuple
 from dataclasses import dataclass
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FutureTimeout
 from pathlib import Path
 
+from base import DailyPickleCache, download_histories
+
+if TYPE_CHECKING:
+    import pandas as pd
+
 # Load environment variables
 env_path = Path(__file__).parent / ".env"
 if env_path.exists():
@@ -80,11 +88,98 @@ class AlphaVantageClient:
 class DataFetcher:
     """Unified data fetcher"""
     
-    def __init__(self):
+    # Process-wide cap on in-flight provider requests, however many threads call in
+    MAX_CONCURRENT_REQUESTS = 8
+    _request_slots = threading.BoundedSemaphore(MAX_CONCURRENT_REQUESTS)
+    
+    CACHE_TTL = 6 * 3600  # seconds
+    
+    def __init__(self, use_disk_cache: bool = False):
         self.alpha = AlphaVantageClient()
         self.use_alpha = bool(os.environ.get("ALPHA_VANTAGE_API_KEY"))
+        self.use_disk_cache = use_disk_cache
+        # Per-day snapshot cache shared by the CLI tools (opt-in via use_disk_cache)
+        self._disk_cache = DailyPickleCache("fundamentals", ttl=self.CACHE_TTL)
+        self.cache_stats = self._disk_cache.stats
+        # (fetched at, data) per ticker, filled by get_comprehensive_data_batch
+        self._batch_results: Dict[str, Tuple[float, Dict]] = {}
+        self._batch_history: Dict[str, "pd.DataFrame"] = {}
     
     def get_comprehensive_data(self, ticker: str) -> Dict:
+        entry = self._batch_results.get(ticker)
+        if entry is not None:
+            if time.time() - entry[0] < self.CACHE_TTL:
+                return entry[1]
+            self._batch_results.pop(ticker, None)
+        if not self.use_disk_cache:
+            with self._request_slots:
+                return self._fetch_comprehensive_data(ticker)
+        
+        data = self._disk_cache.get(ticker)
+        if data is None:
+            with self._request_slots:
+                data = self._fetch_comprehensive_data(ticker)
+            if data.get("current_price") is not None:
+                self._disk_cache.put(ticker, data)
+        return data
+    
+    def report_cache_stats(self) -> None:
+        """Print disk cache hit rate for this run to stderr"""
+        stats = self.cache_stats
+        lookups = stats["hits"] + stats["misses"]
+        if self.use_disk_cache and lookups:
+            print(f"🗄️  Data cache: {stats['hits']}/{lookups} hits "
+                  f"({stats['hits'] / lookups:.0%}), {stats['bytes_read'] / 1024:.1f} KB read",
+                  file=sys.stderr)
+    
+    def get_comprehensive_data_batch(self, tickers: List[str],
+                                     timeout: Optional[float] = None) -> Dict[str, Dict]:
+        """Fetch many tickers at once, sharing one batched price-history download.
+        
+        Results are kept on the fetcher for CACHE_TTL seconds, so later
+        get_comprehensive_data calls for these tickers are served from memory.
+        ``timeout`` bounds how long this call waits for the whole batch; tickers
+        that fail or are still running by then are left out. It does not stop
+        those fetches (yfinance's .info takes no timeout), so they keep running
+        in the background and interpreter exit still waits for them.
+        """
+        tickers = list(dict.fromkeys(tickers))
+        # Tickers still held in _batch_results are answered from memory and never
+        # consume a downloaded history, so skip them too
+        now = time.time()
+        to_download = [t for t in tickers
+                       if not (self.use_disk_cache and self._disk_cache.is_fresh(t))
+                       and not (t in self._batch_results
+                                and now - self._batch_results[t][0] < self.CACHE_TTL)]
+        if to_download:
+            self._batch_history.update(download_histories(to_download, "1y"))
+        
+        results = {}
+        fetched_at = time.time()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        executor = ThreadPoolExecutor(max_workers=max(1, min(self.MAX_CONCURRENT_REQUESTS, len(tickers))))
+        try:
+            futures = [(t, executor.submit(self.get_comprehensive_data, t)) for t in tickers]
+            for ticker, future in futures:
+                remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+                try:
+                    results[ticker] = future.result(timeout=remaining)
+                except FutureTimeout:
+                    print(f"❌ {ticker}: batch fetch timed out after {timeout}s", file=sys.stderr)
+                except Exception as e:
+                    print(f"❌ {ticker}: fetch failed - {e}", file=sys.stderr)
+        finally:
+            executor.shutdown(wait=False)
+        
+        self._batch_results.update((t, (fetched_at, data)) for t, data in results.items())
+        return results
+    
+    async def aget_comprehensive_data(self, ticker: str) -> Dict:
+        """Async variant for event-loop callers; the providers' clients are blocking"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.get_comprehensive_data, ticker)
+    
+    def _fetch_comprehensive_data(self, ticker: str) -> Dict:
         print(f"📊 Fetching data for {ticker}...", file=sys.stderr)
         
         # Try Yahoo Finance first
@@ -131,7 +226,9 @@ class DataFetcher:
             import yfinance as yf
             stock = yf.Ticker(ticker)
             info = stock.info
-            hist = stock.history(period="1y")
+            hist = self._batch_history.pop(ticker, None)
+            if hist is None:
+                hist = stock.history(period="1y")
             
             price = hist['Close'].iloc[-1] if not hist.empty else None
             avg50 = hist['Close'].rolling(50).mean().iloc[-1] if len(hist) >= 50 else None
@@ -309,6 +406,15 @@ class AIHedgeFundAdvanced:
         self.use_subagents = use_subagents
         self.model = model
         self.sub_agent_runner = SubAgentRunner(model=model) if use_subagents else None
+        self._analysis_cache: Dict[Tuple[str, str], ConsensusResult] = {}
+    
+    def analyze_cached(self, ticker: str) -> ConsensusResult:
+        """analyze, memoized per ticker for the current day"""
+        key = (ticker, datetime.now().strftime("%Y-%m-%d"))
+        result = self._analysis_cache.get(key)
+        if result is None:
+            result = self._analysis_cache[key] = self.analyze(ticker)
+        return result
     
     def analyze(self, ticker: str) -> ConsensusResult:
         print(f"\n🔍 Analyzing {ticker}...", file=sys.stderr)
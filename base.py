@@ -3,11 +3,119 @@ Base classes for AI Hedge Fund
 Separated to avoid circular imports
 """
 
+import os
+import sys
+import time
+import pickle
+import threading
+import importlib.util
 from dataclasses import dataclass
-from typing import Dict, List, Literal, Optional
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Literal, Optional
 
+# Slotted dataclasses (no per-instance __dict__) need Python 3.10+; older versions keep the dict
+DATACLASS_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
 
-@dataclass
+# numba is optional; it is only imported once a kernel is decorated, so modules
+# without kernels don't pay for it
+NUMBA_AVAILABLE = importlib.util.find_spec("numba") is not None
+
+
+def njit(*args, **kwargs):
+    """numba.njit when numba is installed, otherwise a no-op decorator"""
+    if NUMBA_AVAILABLE:
+        from numba import njit as numba_njit
+        return numba_njit(*args, **kwargs)
+    if len(args) == 1 and callable(args[0]):
+        return args[0]
+    return lambda func: func
+
+
+class DailyPickleCache:
+    """Per-day pickle files shared by the CLI tools, under PORTFOLIO_CACHE_DIR
+    (default ~/.cache/ai_hedge_fund). Files are keyed by day, so entries expire
+    at midnight, or after ``ttl`` seconds if that is sooner. Best effort: read
+    and write failures count as misses.
+    """
+    
+    ROOT = Path(os.getenv('PORTFOLIO_CACHE_DIR') or Path.home() / ".cache" / "ai_hedge_fund")
+    
+    def __init__(self, name: str, ttl: Optional[float] = None):
+        self.name = name
+        self.dir = self.ROOT / name
+        self.ttl = ttl
+        self.stats = {"hits": 0, "misses": 0, "bytes_read": 0}
+        self._stats_lock = threading.Lock()
+    
+    def path(self, key: str) -> Path:
+        return self.dir / f"{key.replace(os.sep, '_')}_{datetime.now():%Y%m%d}.pkl"
+    
+    def is_fresh(self, key: str) -> bool:
+        try:
+            age = time.time() - self.path(key).stat().st_mtime
+        except OSError:
+            return False
+        return self.ttl is None or age < self.ttl
+    
+    def get(self, key: str) -> Optional[Any]:
+        """Today's cached value for key, or None"""
+        value, size = None, 0
+        try:
+            if self.is_fresh(key):
+                with open(self.path(key), 'rb') as f:
+                    raw = f.read()
+                value, size = pickle.loads(raw), len(raw)
+        except Exception:  # Unreadable, truncated, or pickled by other library versions
+            value = None
+        with self._stats_lock:
+            if value is None:
+                self.stats["misses"] += 1
+            else:
+                self.stats["hits"] += 1
+                self.stats["bytes_read"] += size
+        return value
+    
+    def put(self, key: str, value: Any) -> None:
+        """Store value for today, atomically so concurrent readers never see a partial file"""
+        path = self.path(key)
+        tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        try:
+            self.dir.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"{self.name} cache write failed: {e}", file=sys.stderr)
+            try:
+                tmp_path.unlink()
+            except OSError:
+                pass
+
+
+
+def download_histories(tickers: List[str], period: str = "1y") -> Dict[str, Any]:
+    """Adjusted daily history for several tickers in a single request; tickers
+    the download misses are left out, for the caller's per-ticker fetch"""
+    try:
+        import yfinance as yf
+        data = yf.download(tickers, period=period, group_by="ticker", auto_adjust=True,
+                           threads=True, progress=False)
+    except Exception as e:
+        print(f"Warning: Batch history download failed: {e}", file=sys.stderr)
+        return {}
+    
+    histories = {}
+    grouped = data.columns.nlevels > 1
+    for t in tickers:
+        if grouped and t not in data.columns.get_level_values(0):
+            continue
+        frame = (data[t] if grouped else data).dropna(how="all")
+        if not frame.empty:
+            histories[t] = frame
+    return histories
+
+@dataclass(**DATACLASS_SLOTS)
 class AgentSignal:
     """Signal from an investment agent"""
     agent_name: str
@@ -15,6 +123,11 @@ class AgentSignal:
     confidence: int  # 0-100
     reasoning: str
     key_metrics: Optional[Dict] = None
+    
+    def __post_init__(self):
+        # Interned labels let == against the literals short-circuit on identity
+        if type(self.signal) is str:
+            self.signal = sys.intern(self.signal)
 
 
 @dataclass
@@ -227,9 +227,7 @@ class ChinaDataAdapter:
             if df.empty:
                 return None
             
-            info = {}
-            for _, row in df.iterrows():
-                info[row['item']] = row['value']
+            info = df.set_index('item')['value'].to_dict()
             
             return {
                 'name': info.get('股票简称', ''),
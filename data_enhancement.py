@@ -3,12 +3,19 @@ Enhanced Data Fetcher for AI Hedge Fund
 Integrates features from stock-analysis skill
 """
 
+import time
+import asyncio
+import threading
+from collections import OrderedDict
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Any
-from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime, timedelta, timezone
+from concurrent.futures import ThreadPoolExecutor
 import yfinance as yf
 import pandas as pd
 
+from base import download_histories
+
 
 @dataclass
 class EarningsData:
@@ -157,11 +164,58 @@ class EnhancedStockData:
 class EnhancedDataFetcher:
     """Fetch comprehensive stock data with enhancements"""
     
-    def __init__(self):
-        self.cache: Dict[str, Any] = {}
+    MAX_CONCURRENT_REQUESTS = 8
+    CACHE_TTL_MARKET_HOURS = 60  # seconds
+    CACHE_TTL_OFF_HOURS = 3600
+    CACHE_SIZE = 4096
+    
+    def __init__(self, use_cache: bool = True):
+        # In-memory TTL cache of fetched data; backtests can turn it off
+        self.use_cache = use_cache
+        self.cache: "OrderedDict[str, Tuple[float, EnhancedStockData]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+    
+    @classmethod
+    def _cache_ttl(cls) -> int:
+        """Short TTL while US markets may be open (weekdays 13:30-21:00 UTC), longer otherwise"""
+        now = datetime.now(timezone.utc)
+        minutes = now.hour * 60 + now.minute
+        if now.weekday() < 5 and 13 * 60 + 30 <= minutes < 21 * 60:
+            return cls.CACHE_TTL_MARKET_HOURS
+        return cls.CACHE_TTL_OFF_HOURS
+    
+    def get_enhanced_data(self, ticker: str, history: Optional[pd.DataFrame] = None,
+                          macro: Optional[MacroData] = None) -> EnhancedStockData:
+        """Fetch all enhanced data for a ticker, reusing prefetched history/macro if given"""
+        data = self._cache_get(ticker)
+        if data is None:
+            data = self._fetch_enhanced_data(ticker, history, macro)
+            if data.current_price is not None:  # don't pin failed fetches
+                self._cache_put(ticker, data)
+        return data
+    
+    def _cache_get(self, ticker: str) -> Optional[EnhancedStockData]:
+        """Return cached data younger than the current TTL, if any"""
+        if not self.use_cache:
+            return None
+        with self._cache_lock:
+            entry = self.cache.get(ticker)
+            if entry and time.time() - entry[0] < self._cache_ttl():
+                self.cache.move_to_end(ticker)
+                return entry[1]
+        return None
+    
+    def _cache_put(self, ticker: str, data: EnhancedStockData):
+        if not self.use_cache:
+            return
+        with self._cache_lock:
+            self.cache[ticker] = (time.time(), data)
+            self.cache.move_to_end(ticker)
+            while len(self.cache) > self.CACHE_SIZE:
+                self.cache.popitem(last=False)
     
-    def get_enhanced_data(self, ticker: str) -> EnhancedStockData:
-        """Fetch all enhanced data for a ticker"""
+    def _fetch_enhanced_data(self, ticker: str, history: Optional[pd.DataFrame],
+                             macro: Optional[MacroData]) -> EnhancedStockData:
         data = EnhancedStockData(ticker=ticker)
         
         try:
@@ -185,11 +239,11 @@ class EnhancedDataFetcher:
             data.earnings = self._fetch_earnings(stock, info)
             data.analyst = self._fetch_analyst_data(stock, info)
             data.dividend = self._fetch_dividend_data(stock, info)
-            data.macro = self._fetch_macro_data()
+            data.macro = macro if macro is not None else self._fetch_macro_data()
             data.financials = self._fetch_financial_metrics(stock, info)
             
             # Technical data
-            hist = stock.history(period="1y")
+            hist = history if history is not None else stock.history(period="1y")
             if not hist.empty:
                 data.avg_50 = hist['Close'].rolling(50).mean().iloc[-1] if len(hist) >= 50 else None
                 data.avg_200 = hist['Close'].rolling(200).mean().iloc[-1] if len(hist) >= 200 else None
@@ -208,6 +262,24 @@ class EnhancedDataFetcher:
         
         return data
     
+    async def get_enhanced_data_async(self, ticker: str) -> EnhancedStockData:
+        """Async variant for event-loop callers; yfinance itself is blocking"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.get_enhanced_data, ticker)
+    
+    def get_enhanced_data_batch(self, tickers: List[str]) -> Dict[str, EnhancedStockData]:
+        """Fetch enhanced data for many tickers, sharing one history download and one macro fetch"""
+        tickers = list(dict.fromkeys(tickers))
+        to_fetch = [t for t in tickers if self._cache_get(t) is None]
+        histories = download_histories(to_fetch, "1y") if to_fetch else {}
+        macro = self._fetch_macro_data() if to_fetch else None
+        
+        # Company info and earnings/analyst tables are per-ticker endpoints
+        with ThreadPoolExecutor(max_workers=max(1, min(self.MAX_CONCURRENT_REQUESTS, len(tickers)))) as executor:
+            futures = [(t, executor.submit(self.get_enhanced_data, t, histories.get(t), macro))
+                       for t in tickers]
+            return {t: future.result() for t, future in futures}
+    
     def _fetch_earnings(self, stock: yf.Ticker, info: Dict) -> EarningsData:
         """Fetch earnings surprise data"""
         earnings = EarningsData()
@@ -3,19 +3,441 @@
 Analyzes external factors and news impact on stocks
 """
 
+import io
 import os
+import re
 import sys
+import gzip
 import json
-import urllib.request
-import urllib.parse
-from typing import Dict, List, Optional, Tuple
-from dataclasses import dataclass, field
-from datetime import datetime, timedelta
-from base import AgentSignal, InvestmentAgent
+import time
+import hashlib
+import tempfile
+import threading
+from urllib.parse import urlencode
+from urllib.request import Request, urlopen
+from typing import Dict, List, Literal, Optional, Tuple
+from dataclasses import dataclass, replace
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+from datetime import date
+from concurrent.futures import Future, ThreadPoolExecutor
+import numpy as np
+from base import DATACLASS_SLOTS, AgentSignal, InvestmentAgent
 from data_enhancement import EnhancedStockData
 
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
 
-@dataclass
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import onnxruntime as ort
+    from transformers import AutoTokenizer
+    FINBERT_AVAILABLE = True
+except ImportError:
+    FINBERT_AVAILABLE = False
+
+try:
+    from transformers import pipeline as hf_pipeline
+    ZERO_SHOT_AVAILABLE = True
+except ImportError:
+    ZERO_SHOT_AVAILABLE = False
+
+# orjson parses bytes directly and is several times faster than stdlib json
+_json_loads = orjson.loads if ORJSON_AVAILABLE else json.loads
+
+# Max titles kept per risk/opportunity list in a report
+NEWS_LIST_LIMIT = 5
+
+# Brave result fields consumed by search_relevant_news
+RESULT_FIELDS = ('title', 'url', 'source', 'age', 'description')
+
+
+# Categorical labels, interned once and shared by every report
+Sentiment = Literal["positive", "negative", "neutral"]
+Level = Literal["high", "medium", "low"]
+
+SENT_POS = sys.intern("positive")
+SENT_NEG = sys.intern("negative")
+SENT_NEU = sys.intern("neutral")
+LEVEL_HIGH = sys.intern("high")
+LEVEL_MEDIUM = sys.intern("medium")
+LEVEL_LOW = sys.intern("low")
+
+# Report formatting tables
+_SENTIMENT_EMOJI = {SENT_POS: '🟢', SENT_NEG: '🔴', SENT_NEU: '🟡'}
+_IMPACT_EMOJI = {LEVEL_HIGH: '🔴', LEVEL_MEDIUM: '🟡', LEVEL_LOW: '🟢'}
+_RULE = '=' * 70
+
+_popcount = getattr(int, 'bit_count', None) or (lambda x: bin(x).count('1'))
+
+
+# Keyword buckets scanned for every news article, stored pre-lowercased
+POSITIVE_WORDS = frozenset({
+    'growth', 'profit', 'beat', 'strong', 'bullish',
+    'innovation', 'breakthrough', 'partnership', 'expansion',
+    'record', 'surge', 'rally', 'upgrade', 'outperform'})
+
+NEGATIVE_WORDS = frozenset({
+    'loss', 'miss', 'weak', 'bearish', 'decline',
+    'lawsuit', 'investigation', 'recall', 'downgrade',
+    'underperform', 'cut', 'layoff', 'bankruptcy', 'crisis'})
+
+FACTOR_KEYWORDS = {
+    'political': frozenset({'policy', 'government', 'legislation', 'trump', 'biden', 'congress'}),
+    'regulatory': frozenset({'fda', 'regulation', 'antitrust', 'compliance', 'sec'}),
+    'geopolitical': frozenset({'war', 'tensions', 'sanctions', 'trade war', 'china', 'russia'}),
+    'technological': frozenset({'ai', 'breakthrough', 'innovation', 'disruption', 'patent'}),
+    'military': frozenset({'defense', 'contract', 'pentagon', 'nato', 'military spending'}),
+    'economic': frozenset({'inflation', 'recession', 'fed', 'interest rate', 'gdp'})
+}
+
+RISK_KEYWORDS = frozenset({
+    'risk', 'concern', 'warning', 'decline', 'lawsuit',
+    'investigation', 'recall', 'shortage', 'disruption'})
+
+OPPORTUNITY_KEYWORDS = frozenset({
+    'growth', 'opportunity', 'breakthrough', 'partnership',
+    'expansion', 'innovation', 'milestone', 'approval'})
+
+POLITICAL_KEYWORDS = frozenset({'policy', 'government', 'regulation', 'legislation'})
+MILITARY_KEYWORDS = frozenset({'defense', 'military', 'pentagon', 'war', 'conflict'})
+TECH_KEYWORDS = frozenset({'technology', 'disruption', 'ai', 'competition'})
+
+# Acronyms only count as whole words ('ai' must not fire inside 'said')
+ACRONYM_KEYWORDS = frozenset({'ai', 'fda', 'sec', 'nato', 'gdp'})
+
+
+# External factors and search keywords by sector
+_SECTOR_FACTORS = {
+    'Technology': {
+        'factors': (
+            ('regulatory', 'Antitrust Regulation', 'high'),
+            ('technological', 'AI Disruption', 'high'),
+            ('political', 'Data Privacy Laws', 'medium'),
+            ('geopolitical', 'China-US Tech Tensions', 'high'),
+            ('market', 'Cloud Computing Competition', 'medium'),
+        ),
+        'keywords': ('antitrust', 'regulation', 'AI', 'artificial intelligence', 
+                     'cybersecurity', 'data privacy', 'cloud', 'semiconductor')
+    },
+    'Healthcare': {
+        'factors': (
+            ('regulatory', 'FDA Approval Process', 'high'),
+            ('political', 'Healthcare Policy Changes', 'high'),
+            ('technological', 'Gene Therapy Breakthroughs', 'medium'),
+            ('regulatory', 'Drug Pricing Reform', 'high'),
+            ('market', 'Patent Expirations', 'medium'),
+        ),
+        'keywords': ('FDA', 'clinical trial', 'drug approval', 'healthcare policy',
+                     'medicare', 'patent', 'generic competition', 'vaccine')
+    },
+    'Industrials': {
+        'factors': (
+            ('geopolitical', 'Defense Spending', 'high'),
+            ('regulatory', 'Environmental Regulations', 'medium'),
+            ('political', 'Infrastructure Spending', 'high'),
+            ('geopolitical', 'Supply Chain Disruptions', 'high'),
+            ('technological', 'Automation Trends', 'medium'),
+        ),
+        'keywords': ('defense contract', 'infrastructure', 'supply chain',
+                     'aerospace', 'tariff', 'trade war', 'automation')
+    },
+    'Financials': {
+        'factors': (
+            ('regulatory', 'Banking Regulations', 'high'),
+            ('political', 'Interest Rate Policy', 'high'),
+            ('regulatory', 'Fintech Disruption', 'medium'),
+            ('market', 'Economic Recession Risk', 'high'),
+            ('political', 'Tax Policy Changes', 'medium'),
+        ),
+        'keywords': ('interest rate', 'fed', 'regulation', 'fintech',
+                     'recession', 'inflation', 'banking', 'merger')
+    },
+    'Energy': {
+        'factors': (
+            ('political', 'Climate Policy', 'high'),
+            ('geopolitical', 'Oil Supply Disruptions', 'high'),
+            ('regulatory', 'Carbon Regulations', 'high'),
+            ('technological', 'Renewable Energy Transition', 'high'),
+            ('geopolitical', 'Middle East Tensions', 'high'),
+        ),
+        'keywords': ('oil price', 'OPEC', 'renewable', 'climate', 'carbon',
+                     'natural gas', 'geopolitical', 'sanctions')
+    },
+    'Consumer': {
+        'factors': (
+            ('economic', 'Consumer Spending Trends', 'high'),
+            ('regulatory', 'Consumer Protection Laws', 'medium'),
+            ('technological', 'E-commerce Disruption', 'medium'),
+            ('market', 'Inflation Impact', 'high'),
+            ('geopolitical', 'Supply Chain Issues', 'medium'),
+        ),
+        'keywords': ('consumer spending', 'inflation', 'retail', 'supply chain',
+                     'e-commerce', 'consumer confidence', 'tariff')
+    }
+}
+
+_DEFAULT_SECTOR_INFO = {
+    'factors': (
+        ('regulatory', 'Industry Regulation', 'medium'),
+        ('market', 'Competitive Landscape', 'medium'),
+        ('economic', 'Macroeconomic Conditions', 'medium'),
+    ),
+    'keywords': ('earnings', 'revenue', 'growth', 'competition')
+}
+
+
+# Alternate spellings (GICS / Yahoo Finance) that don't start with a canonical sector name
+_SECTOR_ALIASES = {
+    'financial': 'Financials',
+    'health care': 'Healthcare',
+}
+
+_TRIE_END = '$'
+
+
+def _build_sector_trie() -> Dict:
+    """Character trie over lowercased sector names and aliases"""
+    trie: Dict = {}
+    names = {name.lower(): name for name in _SECTOR_FACTORS}
+    names.update(_SECTOR_ALIASES)
+    for key, canonical in names.items():
+        node = trie
+        for ch in key:
+            node = node.setdefault(ch, {})
+        node[_TRIE_END] = canonical
+    return trie
+
+
+_SECTOR_TRIE = _build_sector_trie()
+
+
+@lru_cache(maxsize=256)
+def match_sector(sector: str) -> Optional[str]:
+    """
+    Map a free-form sector name onto a _SECTOR_FACTORS key, case-insensitively.
+    Walks the trie from every word start and keeps the longest match that ends
+    on a word boundary, e.g. 'Information Technology' -> 'Technology',
+    'Consumer Discretionary' -> 'Consumer'.
+    """
+    text = sector.lower()
+    best, best_len = None, 0
+    for start in range(len(text)):
+        if start and text[start - 1].isalnum():
+            continue
+        node = _SECTOR_TRIE
+        for i in range(start, len(text)):
+            node = node.get(text[i])
+            if node is None:
+                break
+            end = i + 1
+            if (_TRIE_END in node and end - start > best_len
+                    and (end == len(text) or not text[end].isalnum())):
+                best, best_len = node[_TRIE_END], end - start
+    return best
+
+class KeywordScanner:
+    """
+    Multi-bucket keyword matcher over pre-lowercased keywords.
+    Each distinct keyword owns one bit; a single Aho-Corasick pass per text
+    (pyahocorasick) ORs the bits of every match into a mask, and per-bucket
+    hit counts are popcounts of that mask against precomputed bucket masks.
+    Without pyahocorasick it falls back to one precompiled regex pass.
+    Keywords listed in `acronyms` only match whole words.
+    """
+    
+    def __init__(self, buckets: Dict[str, frozenset], acronyms: frozenset = frozenset()):
+        # keyword -> bit, bucket -> OR of its keyword bits
+        self.bits: Dict[str, int] = {}
+        self.bucket_masks: Dict[str, int] = {}
+        self.acronyms = acronyms
+        for bucket, words in buckets.items():
+            mask = 0
+            for kw in words:
+                if kw not in self.bits:
+                    self.bits[kw] = 1 << len(self.bits)
+                mask |= self.bits[kw]
+            self.bucket_masks[bucket] = mask
+        
+        self.automaton = None
+        if AHOCORASICK_AVAILABLE:
+            self.automaton = ahocorasick.Automaton()
+            for kw, bit in self.bits.items():
+                self.automaton.add_word(kw, (kw, bit))
+            self.automaton.make_automaton()
+        else:
+            # One C-level regex pass instead: a lookahead alternation tried at
+            # every position reports the longest keyword starting there, and
+            # that keyword's bits include every shorter keyword it begins with
+            # (e.g. 'warning' also sets 'war'), matching substring semantics.
+            self._group_bits: Dict[str, int] = {}
+            alternatives = []
+            for i, kw in enumerate(sorted(self.bits, key=len, reverse=True)):
+                group = f"k{i}"
+                body = re.escape(kw)
+                if kw in acronyms:
+                    body = rf"\b{body}\b"
+                alternatives.append(f"(?P<{group}>{body})")
+                bits = self.bits[kw]
+                for other, other_bit in self.bits.items():
+                    if other != kw and other not in acronyms and kw.startswith(other):
+                        bits |= other_bit
+                self._group_bits[group] = bits
+            self._pattern = re.compile("(?=" + "|".join(alternatives) + ")")
+    
+    @staticmethod
+    def _is_whole_word(text: str, start: int, end: int) -> bool:
+        """Check that text[start:end] is not embedded in a longer word"""
+        if start > 0 and text[start - 1].isalnum():
+            return False
+        if end < len(text) and text[end].isalnum():
+            return False
+        return True
+    
+    def match_mask(self, text_lower: str) -> int:
+        """Bitmask of the distinct keywords present in text_lower"""
+        mask = 0
+        if self.automaton is not None:
+            for end, (kw, bit) in self.automaton.iter(text_lower):
+                if mask & bit:
+                    continue
+                if kw in self.acronyms and not self._is_whole_word(
+                        text_lower, end - len(kw) + 1, end + 1):
+                    continue
+                mask |= bit
+        else:
+            group_bits = self._group_bits
+            for m in self._pattern.finditer(text_lower):
+                mask |= group_bits[m.lastgroup]
+        return mask
+    
+    def scan(self, text_lower: str) -> Dict[str, int]:
+        """Count distinct keyword hits per bucket in already-lowercased text"""
+        mask = self.match_mask(text_lower)
+        if not mask:
+            return {}
+        counts: Dict[str, int] = {}
+        for bucket, bucket_mask in self.bucket_masks.items():
+            hit = mask & bucket_mask
+            if hit:
+                counts[bucket] = _popcount(hit)
+        return counts
+
+
+class FinBertSentiment:
+    """
+    Batched FinBERT sentiment on ONNX Runtime.
+    Expects a directory holding an ONNX export of a FinBERT classifier (e.g.
+    ProsusAI/finbert via optimum, ideally int8-quantized) plus its tokenizer
+    and config.json. Score per text is P(positive) - P(negative).
+    """
+    
+    MODEL_FILES = ('model_quantized.onnx', 'model.onnx')
+    
+    def __init__(self, model_dir: str):
+        model_path = Path(model_dir)
+        onnx_file = next((model_path / name for name in self.MODEL_FILES
+                          if (model_path / name).exists()), None)
+        if onnx_file is None:
+            raise FileNotFoundError(f"No ONNX model in {model_dir}")
+        
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        self.session = ort.InferenceSession(str(onnx_file), providers=['CPUExecutionProvider'])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+        
+        with open(model_path / 'config.json', encoding='utf-8') as f:
+            id2label = json.load(f).get('id2label', {})
+        labels = {v.lower(): int(k) for k, v in id2label.items()}
+        self.pos_idx = labels.get('positive', 0)
+        self.neg_idx = labels.get('negative', 1)
+        self.labels = [SENT_NEU] * len(labels)
+        self.labels[self.pos_idx] = SENT_POS
+        self.labels[self.neg_idx] = SENT_NEG
+    
+    @classmethod
+    def load(cls) -> Optional['FinBertSentiment']:
+        """Load the model named by FINBERT_ONNX_DIR, or None to use keyword scoring"""
+        model_dir = os.getenv('FINBERT_ONNX_DIR')
+        if not model_dir or not FINBERT_AVAILABLE:
+            return None
+        try:
+            return cls(model_dir)
+        except Exception as e:
+            print(f"FinBERT unavailable, using keyword sentiment: {e}", file=sys.stderr)
+            return None
+    
+    def predict(self, texts: List[str]) -> List[Tuple[Sentiment, float]]:
+        """Classify all texts in one forward pass"""
+        if not texts:
+            return []
+        encoded = self.tokenizer(texts, padding=True, truncation=True,
+                                 max_length=128, return_tensors='np')
+        feeds = {name: value.astype(np.int64) for name, value in encoded.items()
+                 if name in self.input_names}
+        logits = self.session.run(None, feeds)[0]
+        
+        # Softmax per row
+        exp = np.exp(logits - logits.max(axis=1, keepdims=True))
+        probs = exp / exp.sum(axis=1, keepdims=True)
+        scores = probs[:, self.pos_idx] - probs[:, self.neg_idx]
+        return [(self.labels[int(i)], float(score))
+                for i, score in zip(probs.argmax(axis=1), scores)]
+
+
+class ZeroShotCategoryTagger:
+    """
+    Zero-shot external-factor tagging (e.g. facebook/bart-large-mnli).
+    All articles go through the NLI pipeline in one batched call with the
+    factor categories as candidate labels; each article is assigned its
+    top-scoring category.
+    """
+    
+    def __init__(self, model_name: str, categories: Tuple[str, ...]):
+        self.classifier = hf_pipeline("zero-shot-classification", model=model_name, device=-1)
+        self.categories = list(categories)
+    
+    @classmethod
+    def load(cls) -> Optional['ZeroShotCategoryTagger']:
+        """Load the model named by NEWS_ZERO_SHOT_MODEL, or None to use keyword buckets"""
+        model_name = os.getenv('NEWS_ZERO_SHOT_MODEL')
+        if not model_name or not ZERO_SHOT_AVAILABLE:
+            return None
+        try:
+            return cls(model_name, tuple(FACTOR_KEYWORDS))
+        except Exception as e:
+            print(f"Zero-shot model unavailable, using keyword categories: {e}", file=sys.stderr)
+            return None
+    
+    def group(self, news_items: List['NewsItem']) -> Dict[str, List[str]]:
+        """Map category -> 'title (source)' strings, best-scoring articles first"""
+        if not news_items:
+            return {}
+        texts = [news.title + " " + news.summary for news in news_items]
+        results = self.classifier(texts, candidate_labels=self.categories, multi_label=True)
+        if isinstance(results, dict):
+            results = [results]
+        
+        ranked: Dict[str, List[Tuple[float, str]]] = {}
+        for news, result in zip(news_items, results):
+            # Labels come back sorted by descending score
+            top_label, top_score = result['labels'][0], result['scores'][0]
+            ranked.setdefault(top_label, []).append((top_score, f"{news.title} ({news.source})"))
+        return {
+            category: [text for _, text in sorted(entries, key=lambda e: -e[0])]
+            for category, entries in ranked.items()
+        }
+
+
+@dataclass(frozen=True, **DATACLASS_SLOTS)
 class NewsItem:
     """Single news item"""
     title: str
@@ -24,20 +446,20 @@ class NewsItem:
     published_date: str
     summary: str = ""
     relevance_score: float = 0.0
-    sentiment: str = "neutral"  # positive, negative, neutral
+    sentiment: Sentiment = SENT_NEU
 
 
-@dataclass
+@dataclass(frozen=True, **DATACLASS_SLOTS)
 class ExternalFactor:
     """External factor analysis"""
     category: str  # political, military, technological, regulatory, market
     factor_name: str
-    impact_level: str  # high, medium, low
+    impact_level: Level
     description: str
-    recent_developments: List[str] = field(default_factory=list)
+    recent_developments: Tuple[str, ...] = ()
 
 
-@dataclass
+@dataclass(frozen=True, **DATACLASS_SLOTS)
 class NewsAnalysisReport:
     """Comprehensive news analysis report"""
     ticker: str
@@ -45,82 +467,156 @@ class NewsAnalysisReport:
     industry: str
     
     # Business scope analysis
-    business_areas: List[str] = field(default_factory=list)
-    key_products: List[str] = field(default_factory=list)
+    business_areas: Tuple[str, ...] = ()
+    key_products: Tuple[str, ...] = ()
     
     # External factors
-    external_factors: List[ExternalFactor] = field(default_factory=list)
+    external_factors: Tuple[ExternalFactor, ...] = ()
     
     # News summary
     total_news_found: int = 0
     relevant_news_count: int = 0
-    recent_news: List[NewsItem] = field(default_factory=list)
+    recent_news: Tuple[NewsItem, ...] = ()
     
     # Analysis
-    overall_sentiment: str = "neutral"
+    overall_sentiment: Sentiment = SENT_NEU
     sentiment_score: float = 0.0  # -1 to 1
-    key_risks_from_news: List[str] = field(default_factory=list)
-    key_opportunities: List[str] = field(default_factory=list)
+    key_risks_from_news: Tuple[str, ...] = ()
+    key_opportunities: Tuple[str, ...] = ()
     
     # Political/Regulatory
-    political_risk_level: str = "low"  # high, medium, low
-    regulatory_changes: List[str] = field(default_factory=list)
+    political_risk_level: Level = LEVEL_LOW
+    regulatory_changes: Tuple[str, ...] = ()
     
     # Military/Geopolitical
-    geopolitical_exposure: str = "low"
-    military_related_news: List[str] = field(default_factory=list)
+    geopolitical_exposure: Level = LEVEL_LOW
+    military_related_news: Tuple[str, ...] = ()
     
     # Technology/Competition
-    tech_disruption_risk: str = "low"
-    competitive_threats: List[str] = field(default_factory=list)
+    tech_disruption_risk: Level = LEVEL_LOW
+    competitive_threats: Tuple[str, ...] = ()
 
 
 class BraveSearchClient:
     """Client for Brave Search API"""
     
-    def __init__(self, api_key: Optional[str] = None):
+    CACHE_TTL = 86400  # seconds; identical queries are reused for a day
+    MEMORY_CACHE_SIZE = 512
+    
+    def __init__(self, api_key: Optional[str] = None, cache_dir: Optional[str] = None):
         self.api_key = api_key or os.getenv('BRAVE_API_KEY')
         self.base_url = "https://api.search.brave.com/res/v1/news/search"
+        
+        # Two-level response cache: in-process LRU in front of on-disk JSON files
+        self.cache_dir = Path(cache_dir or os.getenv('BRAVE_CACHE_DIR')
+                              or Path(tempfile.gettempdir()) / "brave_cache")
+        self._memory_cache: "OrderedDict[str, Tuple[float, List[Dict]]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+    
+    @staticmethod
+    def _cache_key(query: str, count: int, offset: int, freshness: str) -> str:
+        """Stable key covering every parameter that changes the response"""
+        return hashlib.sha1(f"{query}|{count}|{offset}|{freshness}".encode('utf-8')).hexdigest()
     
-    def search_news(self, query: str, count: int = 10, offset: int = 0) -> List[Dict]:
+    def _cache_get(self, key: str) -> Optional[List[Dict]]:
+        """Return cached results younger than CACHE_TTL, if any"""
+        now = time.time()
+        with self._cache_lock:
+            entry = self._memory_cache.get(key)
+            if entry and now - entry[0] < self.CACHE_TTL:
+                self._memory_cache.move_to_end(key)
+                return entry[1]
+        
+        path = self.cache_dir / f"{key}.json"
+        try:
+            with open(path, encoding='utf-8') as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if now - stored.get('ts', 0) >= self.CACHE_TTL:
+            return None
+        
+        self._memory_put(key, stored['ts'], stored['results'])
+        return stored['results']
+    
+    def _memory_put(self, key: str, ts: float, results: List[Dict]):
+        with self._cache_lock:
+            self._memory_cache[key] = (ts, results)
+            self._memory_cache.move_to_end(key)
+            while len(self._memory_cache) > self.MEMORY_CACHE_SIZE:
+                self._memory_cache.popitem(last=False)
+    
+    def _cache_put(self, key: str, results: List[Dict]):
+        """Store results in memory and on disk (best effort)"""
+        ts = time.time()
+        self._memory_put(key, ts, results)
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            path = self.cache_dir / f"{key}.json"
+            tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'ts': ts, 'results': results}, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Brave cache write failed: {e}", file=sys.stderr)
+    
+    def search_news(self, query: str, count: int = 10, offset: int = 0,
+                    freshness: str = 'py') -> List[Dict]:
         """Search for news using Brave Search API"""
         if not self.api_key:
             print("Warning: BRAVE_API_KEY not set, using mock data", file=sys.stderr)
             return self._mock_search(query, count)
         
+        cache_key = self._cache_key(query, count, offset, freshness)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return cached
+        
         try:
             headers = {
                 'Accept': 'application/json',
                 'X-Subscription-Token': self.api_key
             }
             
-            params = urllib.parse.urlencode({
+            params = urlencode({
                 'q': query,
                 'count': count,
                 'offset': offset,
                 'search_lang': 'en',
-                'freshness': 'py',  # Past year
+                'freshness': freshness,  # 'py' = past year
                 'text_decorations': 'false'
             })
             
             url = f"{self.base_url}?{params}"
-            req = urllib.request.Request(url, headers=headers)
+            req = Request(url, headers=headers)
             
-            with urllib.request.urlopen(req, timeout=15) as response:
+            with urlopen(req, timeout=15) as response:
                 raw_data = response.read()
                 
                 # Check if response is gzip encoded
                 if response.info().get('Content-Encoding') == 'gzip':
-                    import gzip
                     raw_data = gzip.decompress(raw_data)
                 
-                data = json.loads(raw_data.decode('utf-8'))
-                return data.get('results', [])
+                data = _json_loads(raw_data)
+                results = self._project_results(data.get('results', []))
+                self._cache_put(cache_key, results)
+                return results
                 
         except Exception as e:
             print(f"Brave Search error: {e}", file=sys.stderr)
             return self._mock_search(query, count)
     
+    @staticmethod
+    def _project_results(results: List[Dict]) -> List[Dict]:
+        """Keep only the fields NewsAnalyst reads, with descriptions pre-truncated"""
+        projected = []
+        for rec in results:
+            item = {k: rec[k] for k in RESULT_FIELDS if k in rec}
+            if isinstance(item.get('description'), str):
+                item['description'] = item['description'][:200]
+            projected.append(item)
+        return projected
+    
     def _mock_search(self, query: str, count: int) -> List[Dict]:
         """Provide mock search results when API unavailable"""
         return [{
@@ -138,96 +634,42 @@ class NewsAnalyst(InvestmentAgent):
     Analyzes external factors and news impact
     """
     
+    REPORT_CACHE_TTL = 3600  # seconds
+    REPORT_CACHE_SIZE = 256
+    
     def __init__(self):
         super().__init__(
             "News & External Factors Analyst",
             "Analyzes political, military, technological, and regulatory news impact"
         )
         self.search_client = BraveSearchClient()
+        
+        # One automaton over every keyword bucket used in the analysis
+        buckets = {
+            'positive': POSITIVE_WORDS,
+            'negative': NEGATIVE_WORDS,
+            'risk': RISK_KEYWORDS,
+            'opportunity': OPPORTUNITY_KEYWORDS,
+            'political': POLITICAL_KEYWORDS,
+            'military': MILITARY_KEYWORDS,
+            'tech': TECH_KEYWORDS,
+        }
+        for category, keywords in FACTOR_KEYWORDS.items():
+            buckets[f"factor:{category}"] = keywords
+        self.scanner = KeywordScanner(buckets, ACRONYM_KEYWORDS)
+        
+        # Optional FinBERT model; keyword counting is the fallback
+        self.sentiment_model = FinBertSentiment.load()
+        self.category_tagger = ZeroShotCategoryTagger.load()
+        
+        self._report_cache: "OrderedDict[Tuple, Tuple[float, NewsAnalysisReport]]" = OrderedDict()
+        self._report_lock = threading.Lock()
     
     def analyze_business_scope(self, ticker: str, data: EnhancedStockData) -> Dict:
         """Analyze company business scope to identify relevant external factors"""
         sector = data.sector or "Unknown"
-        
-        # Define external factors by sector
-        sector_factors = {
-            'Technology': {
-                'factors': [
-                    ('regulatory', 'Antitrust Regulation', 'high'),
-                    ('technological', 'AI Disruption', 'high'),
-                    ('political', 'Data Privacy Laws', 'medium'),
-                    ('geopolitical', 'China-US Tech Tensions', 'high'),
-                    ('market', 'Cloud Computing Competition', 'medium'),
-                ],
-                'keywords': ['antitrust', 'regulation', 'AI', 'artificial intelligence', 
-                           'cybersecurity', 'data privacy', 'cloud', 'semiconductor']
-            },
-            'Healthcare': {
-                'factors': [
-                    ('regulatory', 'FDA Approval Process', 'high'),
-                    ('political', 'Healthcare Policy Changes', 'high'),
-                    ('technological', 'Gene Therapy Breakthroughs', 'medium'),
-                    ('regulatory', 'Drug Pricing Reform', 'high'),
-                    ('market', 'Patent Expirations', 'medium'),
-                ],
-                'keywords': ['FDA', 'clinical trial', 'drug approval', 'healthcare policy',
-                           'medicare', 'patent', 'generic competition', 'vaccine']
-            },
-            'Industrials': {
-                'factors': [
-                    ('geopolitical', 'Defense Spending', 'high'),
-                    ('regulatory', 'Environmental Regulations', 'medium'),
-                    ('political', 'Infrastructure Spending', 'high'),
-                    ('geopolitical', 'Supply Chain Disruptions', 'high'),
-                    ('technological', 'Automation Trends', 'medium'),
-                ],
-                'keywords': ['defense contract', 'infrastructure', 'supply chain',
-                           'aerospace', 'tariff', 'trade war', 'automation']
-            },
-            'Financials': {
-                'factors': [
-                    ('regulatory', 'Banking Regulations', 'high'),
-                    ('political', 'Interest Rate Policy', 'high'),
-                    ('regulatory', 'Fintech Disruption', 'medium'),
-                    ('market', 'Economic Recession Risk', 'high'),
-                    ('political', 'Tax Policy Changes', 'medium'),
-                ],
-                'keywords': ['interest rate', 'fed', 'regulation', 'fintech',
-                           'recession', 'inflation', 'banking', 'merger']
-            },
-            'Energy': {
-                'factors': [
-                    ('political', 'Climate Policy', 'high'),
-                    ('geopolitical', 'Oil Supply Disruptions', 'high'),
-                    ('regulatory', 'Carbon Regulations', 'high'),
-                    ('technological', 'Renewable Energy Transition', 'high'),
-                    ('geopolitical', 'Middle East Tensions', 'high'),
-                ],
-                'keywords': ['oil price', 'OPEC', 'renewable', 'climate', 'carbon',
-                           'natural gas', 'geopolitical', 'sanctions']
-            },
-            'Consumer': {
-                'factors': [
-                    ('economic', 'Consumer Spending Trends', 'high'),
-                    ('regulatory', 'Consumer Protection Laws', 'medium'),
-                    ('technological', 'E-commerce Disruption', 'medium'),
-                    ('market', 'Inflation Impact', 'high'),
-                    ('geopolitical', 'Supply Chain Issues', 'medium'),
-                ],
-                'keywords': ['consumer spending', 'inflation', 'retail', 'supply chain',
-                           'e-commerce', 'consumer confidence', 'tariff']
-            }
-        }
-        
-        # Get factors for this sector
-        sector_info = sector_factors.get(sector, {
-            'factors': [
-                ('regulatory', 'Industry Regulation', 'medium'),
-                ('market', 'Competitive Landscape', 'medium'),
-                ('economic', 'Macroeconomic Conditions', 'medium'),
-            ],
-            'keywords': ['earnings', 'revenue', 'growth', 'competition']
-        })
+        canonical = match_sector(sector)
+        sector_info = _SECTOR_FACTORS[canonical] if canonical else _DEFAULT_SECTOR_INFO
         
         return {
             'sector': sector,
@@ -235,18 +677,28 @@ class NewsAnalyst(InvestmentAgent):
             'keywords': sector_info['keywords']
         }
     
-    def search_relevant_news(self, ticker: str, business_info: Dict) -> List[NewsItem]:
-        """Search for relevant news based on business scope"""
-        all_news = []
-        
-        # Search queries based on ticker and keywords
-        search_queries = [
+    @staticmethod
+    def _ticker_queries(ticker: str) -> List[str]:
+        """Search queries that depend only on the ticker"""
+        return [
             f"{ticker} stock news",
             f"{ticker} earnings news 2024 2025",
         ]
+    
+    def search_relevant_news(self, ticker: str, business_info: Dict,
+                             executor: Optional[ThreadPoolExecutor] = None,
+                             pending: Optional[Dict[str, Future]] = None) -> List[NewsItem]:
+        """
+        Search for relevant news based on business scope.
+        `pending` maps queries already submitted to `executor` to their futures,
+        so searches started before the business scope was known are reused.
+        """
+        all_news = []
+        
+        # Search queries based on ticker and keywords
+        search_queries = self._ticker_queries(ticker)
         
         # Add sector-specific searches
-        sector = business_info['sector']
         keywords = business_info['keywords'][:3]  # Top 3 keywords
         
         for keyword in keywords:
@@ -258,215 +710,295 @@ class NewsAnalyst(InvestmentAgent):
             f"{ticker} geopolitical risk",
         ])
         
-        # Execute searches (limit to avoid rate limits)
-        for query in search_queries[:5]:
+        # Execute searches concurrently (limit to avoid rate limits)
+        queries = list(dict.fromkeys(search_queries[:5]))
+        if executor is None:
+            with ThreadPoolExecutor(max_workers=len(queries)) as own_executor:
+                return self.search_relevant_news(ticker, business_info, own_executor, pending)
+        
+        futures = dict(pending or {})
+        for query in queries:
+            if query not in futures:
+                futures[query] = executor.submit(self.search_client.search_news, query, 5)
+        
+        results_by_query = {}
+        for query in queries:
+            try:
+                results_by_query[query] = futures[query].result()
+            except Exception as e:
+                print(f"Search error for '{query}': {e}", file=sys.stderr)
+        
+        # Merge in query order so results don't depend on completion order;
+        # duplicates are dropped before a NewsItem is built for them
+        seen_urls = set()
+        for query in queries:
             try:
-                results = self.search_client.search_news(query, count=5)
-                for result in results:
-                    news_item = NewsItem(
+                for result in results_by_query.get(query, []):
+                    url = result.get('url', '')
+                    if url in seen_urls:
+                        continue
+                    seen_urls.add(url)
+                    all_news.append(NewsItem(
                         title=result.get('title', ''),
-                        url=result.get('url', ''),
+                        url=url,
                         source=result.get('source', 'Unknown'),
                         published_date=result.get('age', 'Unknown'),
-                        summary=result.get('description', '')[:200]
-                    )
-                    all_news.append(news_item)
+                        summary=result.get('description', '')
+                    ))
+                    if len(all_news) >= 15:
+                        return all_news  # Top 15 unique news items
             except Exception as e:
                 print(f"Search error for '{query}': {e}", file=sys.stderr)
         
-        # Remove duplicates and sort by relevance
-        seen_urls = set()
-        unique_news = []
-        for news in all_news:
-            if news.url not in seen_urls:
-                seen_urls.add(news.url)
-                unique_news.append(news)
-        
-        return unique_news[:15]  # Return top 15 unique news items
+        return all_news
     
-    def analyze_sentiment(self, text: str) -> Tuple[str, float]:
-        """Simple sentiment analysis based on keywords"""
-        positive_words = ['growth', 'profit', 'beat', 'strong', 'bullish', 
-                         'innovation', 'breakthrough', 'partnership', 'expansion',
-                         'record', 'surge', 'rally', 'upgrade', 'outperform']
-        
-        negative_words = ['loss', 'miss', 'weak', 'bearish', 'decline', 
-                         'lawsuit', 'investigation', 'recall', 'downgrade',
-                         'underperform', 'cut', 'layoff', 'bankruptcy', 'crisis']
-        
-        text_lower = text.lower()
-        pos_count = sum(1 for word in positive_words if word in text_lower)
-        neg_count = sum(1 for word in negative_words if word in text_lower)
+    def analyze_sentiment(self, text: str) -> Tuple[Sentiment, float]:
+        """Sentiment for one text: FinBERT when loaded, keyword counting otherwise"""
+        if self.sentiment_model is not None:
+            try:
+                return self.sentiment_model.predict([text])[0]
+            except Exception as e:
+                print(f"FinBERT inference failed, using keyword sentiment: {e}", file=sys.stderr)
+        return self._sentiment_from_counts(self.scanner.scan(text.lower()))
+    
+    @staticmethod
+    def _sentiment_from_counts(counts: Dict[str, int]) -> Tuple[Sentiment, float]:
+        """Map positive/negative keyword hit counts to (label, score)"""
+        pos_count = counts.get('positive', 0)
+        neg_count = counts.get('negative', 0)
         
         if pos_count > neg_count:
-            return 'positive', min(0.9, 0.3 + (pos_count - neg_count) * 0.1)
+            return SENT_POS, min(0.9, 0.3 + (pos_count - neg_count) * 0.1)
         elif neg_count > pos_count:
-            return 'negative', max(-0.9, -0.3 - (neg_count - pos_count) * 0.1)
+            return SENT_NEG, max(-0.9, -0.3 - (neg_count - pos_count) * 0.1)
         else:
-            return 'neutral', 0.0
+            return SENT_NEU, 0.0
     
     def analyze_external_factors(self, news_items: List[NewsItem], 
-                                 business_info: Dict) -> List[ExternalFactor]:
-        """Analyze external factors from news"""
+                                 business_info: Dict,
+                                 news_hits: Optional[List[Dict[str, int]]] = None) -> List[ExternalFactor]:
+        """Analyze external factors from news (news_hits: per-item scanner results, if already computed)"""
         factors = []
         
+        # Zero-shot tagging, when loaded, replaces the keyword buckets
+        developments_by_category = None
+        if self.category_tagger is not None:
+            try:
+                developments_by_category = self.category_tagger.group(news_items)
+            except Exception as e:
+                print(f"Zero-shot tagging failed, using keyword categories: {e}", file=sys.stderr)
+        if developments_by_category is None and news_hits is None:
+            news_hits = [self.scanner.scan((news.title + " " + news.summary).lower())
+                         for news in news_items]
+        
         # Create factor categories from business scope
         for category, factor_name, default_impact in business_info['factors']:
-            factor = ExternalFactor(
+            # Find relevant news for this factor
+            if developments_by_category is not None:
+                relevant_news = developments_by_category.get(category, [])
+            else:
+                bucket = f"factor:{category}"
+                relevant_news = [f"{news.title} ({news.source})"
+                                 for news, hits in zip(news_items, news_hits)
+                                 if hits.get(bucket)]
+            
+            factors.append(ExternalFactor(
                 category=category,
                 factor_name=factor_name,
                 impact_level=default_impact,
-                description=f"Key {category} factor for {business_info['sector']} sector"
-            )
-            
-            # Find relevant news for this factor
-            factor_keywords = {
-                'political': ['policy', 'government', 'legislation', 'trump', 'biden', 'congress'],
-                'regulatory': ['FDA', 'regulation', 'antitrust', 'compliance', 'SEC'],
-                'geopolitical': ['war', 'tensions', 'sanctions', 'trade war', 'china', 'russia'],
-                'technological': ['AI', 'breakthrough', 'innovation', 'disruption', 'patent'],
-                'military': ['defense', 'contract', 'pentagon', 'NATO', 'military spending'],
-                'economic': ['inflation', 'recession', 'fed', 'interest rate', 'GDP']
-            }
-            
-            keywords = factor_keywords.get(category, [])
-            relevant_news = []
-            
-            for news in news_items:
-                title_summary = (news.title + " " + news.summary).lower()
-                if any(kw in title_summary for kw in keywords):
-                    relevant_news.append(f"{news.title} ({news.source})")
-            
-            factor.recent_developments = relevant_news[:3]
-            factors.append(factor)
+                description=f"Key {category} factor for {business_info['sector']} sector",
+                recent_developments=tuple(relevant_news[:3])
+            ))
         
         return factors
     
-    def generate_news_analysis(self, ticker: str, data: EnhancedStockData) -> NewsAnalysisReport:
-        """Generate comprehensive news analysis report"""
-        report = NewsAnalysisReport(
-            ticker=ticker,
-            sector=data.sector or "Unknown",
-            industry=data.financials.industry if hasattr(data.financials, 'industry') else "Unknown"
-        )
+    def generate_news_analysis(self, ticker: str, data: EnhancedStockData,
+                               use_cache: bool = True) -> NewsAnalysisReport:
+        """
+        Generate comprehensive news analysis report.
+        Reports are memoized per (ticker, day, sector, industry) for REPORT_CACHE_TTL
+        seconds, so repeated same-day calls skip search and scoring;
+        use_cache=False always builds a fresh report and leaves the cache alone.
+        """
+        if not use_cache:
+            return self._build_news_report(ticker, data)
         
-        # Step 1: Analyze business scope
-        business_info = self.analyze_business_scope(ticker, data)
-        report.business_areas = [f[1] for f in business_info['factors']]
+        key = (ticker, date.today().isoformat(), data.sector,
+               getattr(data.financials, 'industry', None))
+        now = time.time()
+        with self._report_lock:
+            entry = self._report_cache.get(key)
+            if entry and now - entry[0] < self.REPORT_CACHE_TTL:
+                self._report_cache.move_to_end(key)
+                return entry[1]
         
-        # Step 2: Search for relevant news
-        news_items = self.search_relevant_news(ticker, business_info)
-        report.total_news_found = len(news_items)
+        report = self._build_news_report(ticker, data)
         
-        # Step 3: Analyze sentiment for each news item
-        sentiments = []
-        for news in news_items:
-            sentiment, score = self.analyze_sentiment(news.title + " " + news.summary)
-            news.sentiment = sentiment
-            sentiments.append(score)
-        
-        # Calculate overall sentiment
-        if sentiments:
-            avg_sentiment = sum(sentiments) / len(sentiments)
-            report.sentiment_score = avg_sentiment
-            if avg_sentiment > 0.2:
-                report.overall_sentiment = 'positive'
-            elif avg_sentiment < -0.2:
-                report.overall_sentiment = 'negative'
-            else:
-                report.overall_sentiment = 'neutral'
-        
-        report.recent_news = news_items[:10]  # Top 10 news
-        report.relevant_news_count = len([n for n in news_items if n.relevance_score > 0.5])
+        with self._report_lock:
+            self._report_cache[key] = (now, report)
+            self._report_cache.move_to_end(key)
+            while len(self._report_cache) > self.REPORT_CACHE_SIZE:
+                self._report_cache.popitem(last=False)
+        return report
+    
+    def _build_news_report(self, ticker: str, data: EnhancedStockData) -> NewsAnalysisReport:
+        """Run the full news pipeline (business scope, search, scoring, factors)"""
+        with ThreadPoolExecutor(max_workers=5) as executor:
+            # Ticker-only searches don't need the business scope, so start
+            # them first and let them overlap with Step 1
+            pending = {
+                query: executor.submit(self.search_client.search_news, query, 5)
+                for query in self._ticker_queries(ticker)
+            }
+            
+            # Step 1: Analyze business scope
+            business_info = self.analyze_business_scope(ticker, data)
+            
+            # Step 2: Search for relevant news
+            news_items = self.search_relevant_news(ticker, business_info, executor, pending)
         
-        # Step 4: Analyze external factors
-        report.external_factors = self.analyze_external_factors(news_items, business_info)
+        # Step 3: Single pass per news item - sentiment, risks, opportunities
+        # and political/military/tech flags all come from one keyword scan
+        scores = np.empty(len(news_items), dtype=np.float64)
+        news_hits = []
+        risks, opportunities = [], []
+        regulatory, military, threats = [], [], []
+        political_risk, geopolitical, tech_risk = LEVEL_LOW, LEVEL_LOW, LEVEL_LOW
+        risk_flags_saturated = False
+        texts = [news.title + " " + news.summary for news in news_items]
+        model_sentiments = None
+        if self.sentiment_model is not None:
+            try:
+                model_sentiments = self.sentiment_model.predict(texts)
+            except Exception as e:
+                print(f"FinBERT inference failed, using keyword sentiment: {e}", file=sys.stderr)
         
-        # Step 5: Extract risks and opportunities
-        for news in news_items:
-            text = (news.title + " " + news.summary).lower()
+        for i, news in enumerate(news_items):
+            hits = self.scanner.scan(texts[i].lower())
+            news_hits.append(hits)
+            
+            if model_sentiments is not None:
+                sentiment, score = model_sentiments[i]
+            else:
+                sentiment, score = self._sentiment_from_counts(hits)
+            news = news_items[i] = replace(news, sentiment=sentiment)
+            scores[i] = score
             
-            # Check for risk keywords
-            risk_keywords = ['risk', 'concern', 'warning', 'decline', 'lawsuit', 
-                           'investigation', 'recall', 'shortage', 'disruption']
-            if any(rk in text for rk in risk_keywords):
-                report.key_risks_from_news.append(news.title)
+            # Check for risk / opportunity keywords
+            if hits.get('risk') and len(risks) < NEWS_LIST_LIMIT:
+                risks.append(news.title)
+            if hits.get('opportunity') and len(opportunities) < NEWS_LIST_LIMIT:
+                opportunities.append(news.title)
             
-            # Check for opportunity keywords
-            opp_keywords = ['growth', 'opportunity', 'breakthrough', 'partnership',
-                          'expansion', 'innovation', 'milestone', 'approval']
-            if any(ok in text for ok in opp_keywords):
-                report.key_opportunities.append(news.title)
-        
-        # Limit lists
-        report.key_risks_from_news = report.key_risks_from_news[:5]
-        report.key_opportunities = report.key_opportunities[:5]
-        
-        # Assess specific risk categories
-        political_keywords = ['policy', 'government', 'regulation', 'legislation']
-        military_keywords = ['defense', 'military', 'pentagon', 'war', 'conflict']
-        tech_keywords = ['technology', 'disruption', 'AI', 'competition']
-        
-        for news in news_items:
-            text = (news.title + " " + news.summary).lower()
+            # Assess specific risk categories; once every flag is at its
+            # ceiling and every list is full, later articles can't change them
+            if risk_flags_saturated:
+                continue
             
-            if any(pk in text for pk in political_keywords):
-                if news.sentiment == 'negative':
-                    report.political_risk_level = 'high'
-                    report.regulatory_changes.append(news.title)
+            if hits.get('political'):
+                if sentiment == SENT_NEG:
+                    political_risk = LEVEL_HIGH
+                    if len(regulatory) < NEWS_LIST_LIMIT:
+                        regulatory.append(news.title)
             
-            if any(mk in text for mk in military_keywords):
-                report.geopolitical_exposure = 'medium'
-                report.military_related_news.append(news.title)
+            if hits.get('military'):
+                geopolitical = LEVEL_MEDIUM
+                if len(military) < NEWS_LIST_LIMIT:
+                    military.append(news.title)
             
-            if any(tk in text for tk in tech_keywords):
-                if news.sentiment == 'negative':
-                    report.tech_disruption_risk = 'medium'
-                    report.competitive_threats.append(news.title)
+            if hits.get('tech'):
+                if sentiment == SENT_NEG:
+                    tech_risk = LEVEL_MEDIUM
+                    if len(threats) < NEWS_LIST_LIMIT:
+                        threats.append(news.title)
+            
+            risk_flags_saturated = (
+                political_risk == LEVEL_HIGH
+                and geopolitical == LEVEL_MEDIUM
+                and tech_risk == LEVEL_MEDIUM
+                and len(regulatory) >= NEWS_LIST_LIMIT
+                and len(military) >= NEWS_LIST_LIMIT
+                and len(threats) >= NEWS_LIST_LIMIT
+            )
         
-        return report
+        # Calculate overall sentiment
+        avg_sentiment = float(scores.mean()) if len(scores) else 0.0
+        if avg_sentiment > 0.2:
+            overall_sentiment = SENT_POS
+        elif avg_sentiment < -0.2:
+            overall_sentiment = SENT_NEG
+        else:
+            overall_sentiment = SENT_NEU
+        
+        # Step 4: Analyze external factors
+        factors = self.analyze_external_factors(news_items, business_info, news_hits)
+        
+        # Every caller of a cached report shares it, so it is frozen and built in one go
+        return NewsAnalysisReport(
+            ticker=ticker,
+            sector=data.sector or "Unknown",
+            industry=data.financials.industry if hasattr(data.financials, 'industry') else "Unknown",
+            business_areas=tuple(f[1] for f in business_info['factors']),
+            external_factors=tuple(factors),
+            total_news_found=len(news_items),
+            relevant_news_count=len([n for n in news_items if n.relevance_score > 0.5]),
+            recent_news=tuple(news_items[:10]),  # Top 10 news
+            overall_sentiment=overall_sentiment,
+            sentiment_score=avg_sentiment,
+            key_risks_from_news=tuple(risks),
+            key_opportunities=tuple(opportunities),
+            political_risk_level=political_risk,
+            regulatory_changes=tuple(regulatory),
+            geopolitical_exposure=geopolitical,
+            military_related_news=tuple(military),
+            tech_disruption_risk=tech_risk,
+            competitive_threats=tuple(threats),
+        )
     
     def analyze_enhanced(self, data: EnhancedStockData) -> AgentSignal:
         """Generate news analysis signal"""
-        ticker = data.ticker
-        
+        return self.analyze_with_report(data)[0]
+    
+    def analyze_with_report(self, data: EnhancedStockData,
+                            use_cache: bool = True) -> Tuple[AgentSignal, NewsAnalysisReport]:
+        """News signal together with the report it was scored from"""
         # Generate comprehensive news analysis
-        report = self.generate_news_analysis(ticker, data)
+        report = self.generate_news_analysis(data.ticker, data, use_cache=use_cache)
         
         # Calculate score based on analysis
         score = 50  # Neutral base
         reasoning_parts = []
         
         # Sentiment impact
-        if report.overall_sentiment == 'positive':
+        if report.overall_sentiment == SENT_POS:
             score += 15
             reasoning_parts.append(f"Positive news sentiment ({len(report.recent_news)} articles analyzed)")
-        elif report.overall_sentiment == 'negative':
+        elif report.overall_sentiment == SENT_NEG:
             score -= 15
             reasoning_parts.append(f"Negative news sentiment detected")
         
         # External factors impact
-        high_impact_factors = [f for f in report.external_factors if f.impact_level == 'high']
+        high_impact_factors = [f for f in report.external_factors if f.impact_level == LEVEL_HIGH]
         if high_impact_factors:
             reasoning_parts.append(f"{len(high_impact_factors)} high-impact external factors identified")
         
         # Political/Regulatory risk
-        if report.political_risk_level == 'high':
+        if report.political_risk_level == LEVEL_HIGH:
             score -= 20
             reasoning_parts.append("High political/regulatory risk")
-        elif report.political_risk_level == 'low':
+        elif report.political_risk_level == LEVEL_LOW:
             score += 5
             reasoning_parts.append("Low political risk environment")
         
         # Geopolitical exposure
-        if report.geopolitical_exposure == 'high':
+        if report.geopolitical_exposure == LEVEL_HIGH:
             score -= 15
             reasoning_parts.append("High geopolitical exposure")
-        elif report.geopolitical_exposure == 'low':
+        elif report.geopolitical_exposure == LEVEL_LOW:
             score += 5
         
         # Tech disruption
-        if report.tech_disruption_risk == 'high':
+        if report.tech_disruption_risk == LEVEL_HIGH:
             score -= 10
             reasoning_parts.append("Technology disruption risk")
         
@@ -514,68 +1046,60 @@ class NewsAnalyst(InvestmentAgent):
                 "risks_identified": len(report.key_risks_from_news),
                 "opportunities": len(report.key_opportunities)
             }
-        )
+        ), report
 
 
 def format_news_report(report: NewsAnalysisReport) -> str:
     """Format news analysis report for display"""
-    lines = []
+    out = io.StringIO()
+    w = out.write
     
-    lines.append(f"\n{'='*70}")
-    lines.append(f"📰 NEWS & EXTERNAL FACTORS ANALYSIS: {report.ticker}")
-    lines.append(f"{'='*70}\n")
+    w(f"\n{_RULE}\n📰 NEWS & EXTERNAL FACTORS ANALYSIS: {report.ticker}\n{_RULE}\n\n")
     
     # Business scope
-    lines.append(f"Sector: {report.sector}")
-    lines.append(f"Key Business Areas: {', '.join(report.business_areas[:5])}")
-    lines.append("")
+    w(f"Sector: {report.sector}\n"
+      f"Key Business Areas: {', '.join(report.business_areas[:5])}\n\n")
     
     # Sentiment
-    sentiment_emoji = {'positive': '🟢', 'negative': '🔴', 'neutral': '🟡'}[report.overall_sentiment]
-    lines.append(f"{sentiment_emoji} Overall News Sentiment: {report.overall_sentiment.upper()}")
-    lines.append(f"   Sentiment Score: {report.sentiment_score:+.2f}")
-    lines.append(f"   Articles Analyzed: {report.total_news_found}")
-    lines.append("")
+    w(f"{_SENTIMENT_EMOJI[report.overall_sentiment]} Overall News Sentiment: {report.overall_sentiment.upper()}\n"
+      f"   Sentiment Score: {report.sentiment_score:+.2f}\n"
+      f"   Articles Analyzed: {report.total_news_found}\n\n")
     
     # External Factors
-    lines.append("🌍 EXTERNAL FACTORS:")
+    w("🌍 EXTERNAL FACTORS:\n")
     for factor in report.external_factors:
-        impact_emoji = {'high': '🔴', 'medium': '🟡', 'low': '🟢'}[factor.impact_level]
-        lines.append(f"  {impact_emoji} [{factor.category.upper()}] {factor.factor_name}")
-        if factor.recent_developments:
-            for dev in factor.recent_developments[:2]:
-                lines.append(f"      • {dev[:60]}...")
-    lines.append("")
+        w(f"  {_IMPACT_EMOJI[factor.impact_level]} [{factor.category.upper()}] {factor.factor_name}\n")
+        for dev in factor.recent_developments[:2]:
+            w(f"      • {dev[:60]}...\n")
+    w("\n")
     
     # Risk Assessment
-    lines.append("⚠️  RISK ASSESSMENT:")
-    lines.append(f"  Political/Regulatory Risk: {report.political_risk_level.upper()}")
-    lines.append(f"  Geopolitical Exposure: {report.geopolitical_exposure.upper()}")
-    lines.append(f"  Technology Disruption Risk: {report.tech_disruption_risk.upper()}")
-    lines.append("")
+    w(f"⚠️  RISK ASSESSMENT:\n"
+      f"  Political/Regulatory Risk: {report.political_risk_level.upper()}\n"
+      f"  Geopolitical Exposure: {report.geopolitical_exposure.upper()}\n"
+      f"  Technology Disruption Risk: {report.tech_disruption_risk.upper()}\n\n")
     
     # Key News
     if report.recent_news:
-        lines.append("📰 RECENT NEWS HIGHLIGHTS:")
+        w("📰 RECENT NEWS HIGHLIGHTS:\n")
         for i, news in enumerate(report.recent_news[:5], 1):
-            sentiment_emoji = {'positive': '🟢', 'negative': '🔴', 'neutral': '🟡'}[news.sentiment]
-            lines.append(f"  {i}. {sentiment_emoji} {news.title[:60]}...")
-            lines.append(f"     Source: {news.source} | {news.published_date}")
-        lines.append("")
+            w(f"  {i}. {_SENTIMENT_EMOJI[news.sentiment]} {news.title[:60]}...\n"
+              f"     Source: {news.source} | {news.published_date}\n")
+        w("\n")
     
     # Key Risks & Opportunities
     if report.key_risks_from_news:
-        lines.append("🚨 KEY RISKS FROM NEWS:")
+        w("🚨 KEY RISKS FROM NEWS:\n")
         for risk in report.key_risks_from_news[:3]:
-            lines.append(f"  • {risk[:70]}...")
-        lines.append("")
+            w(f"  • {risk[:70]}...\n")
+        w("\n")
     
     if report.key_opportunities:
-        lines.append("✨ KEY OPPORTUNITIES:")
+        w("✨ KEY OPPORTUNITIES:\n")
         for opp in report.key_opportunities[:3]:
-            lines.append(f"  • {opp[:70]}...")
-        lines.append("")
+            w(f"  • {opp[:70]}...\n")
+        w("\n")
     
-    lines.append(f"{'='*70}\n")
+    w(f"{_RULE}\n")
     
-    return "\n".join(lines)
+    return out.getvalue()
@@ -9,13 +9,88 @@ import sys
 import json
 import numpy as np
 from datetime import datetime, timedelta
-from typing import Dict, List, Tuple, Optional
+from typing import TYPE_CHECKING, Dict, List, Tuple, Optional
 from dataclasses import dataclass, asdict
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from scipy.optimize import minimize
+    SCIPY_AVAILABLE = True
+except ImportError:
+    SCIPY_AVAILABLE = False
 
 # Import from main module
 sys.path.insert(0, str(Path(__file__).parent))
 from ai_hedge_fund_advanced import AIHedgeFundAdvanced, DataFetcher, ConsensusResult
+from base import DailyPickleCache, download_histories, njit
+
+if TYPE_CHECKING:
+    import pandas as pd
+    import yfinance as yf
+
+# Process-wide caches so repeated portfolio builds in one session skip the network
+_TICKER_CACHE: Dict[str, "yf.Ticker"] = {}
+_HIST_CACHE: Dict[Tuple[str, str], "pd.DataFrame"] = {}
+
+# On-disk history cache shared across runs; files are keyed by day so they expire daily
+_DISK_CACHE = DailyPickleCache("history")
+
+def _fetch_history(ticker: str, period: str = "2y"):
+    """Price history for ticker, memoized per (ticker, period) in memory and on disk"""
+    key = (ticker, period)
+    hist = _HIST_CACHE.get(key)
+    if hist is None:
+        hist = _DISK_CACHE.get(f"{ticker}_{period}")
+    if hist is None:
+        import yfinance as yf
+        stock = _TICKER_CACHE.get(ticker)
+        if stock is None:
+            stock = _TICKER_CACHE[ticker] = yf.Ticker(ticker)
+        hist = stock.history(period=period)
+        if not hist.empty:
+            _DISK_CACHE.put(f"{ticker}_{period}", hist)
+    _HIST_CACHE[key] = hist
+    return hist
+
+def _preload_history(tickers: List[str], period: str = "2y") -> None:
+    """Fill _HIST_CACHE for all uncached tickers with one batched download"""
+    missing = []
+    for t in dict.fromkeys(tickers):
+        if (t, period) in _HIST_CACHE:
+            continue
+        hist = _DISK_CACHE.get(f"{t}_{period}")
+        if hist is not None:
+            _HIST_CACHE[(t, period)] = hist
+        else:
+            missing.append(t)
+    if not missing:
+        return
+    for t, frame in download_histories(missing, period).items():
+        _HIST_CACHE[(t, period)] = frame
+        _DISK_CACHE.put(f"{t}_{period}", frame)
+
+@njit(cache=True, fastmath=True)
+def _tilt_and_clip(weights: np.ndarray, returns: np.ndarray,
+                   min_position: float, max_position: float) -> np.ndarray:
+    """Tilt normalized weights toward higher returns, then apply position limits"""
+    low = returns.min()
+    weights *= 1.0 + (returns - low) / (returns.max() - low + 0.001)
+    weights /= weights.sum()
+    weights[:] = np.minimum(np.maximum(weights, min_position), max_position)
+    weights /= weights.sum()  # Re-normalize
+    return weights
+
+@njit(cache=True, fastmath=True)
+def _portfolio_stats(weights: np.ndarray, returns: np.ndarray, cov: np.ndarray,
+                     betas: np.ndarray, risk_free_rate: float) -> Tuple[float, float, float, float]:
+    """Expected return, volatility, Sharpe ratio and beta of a weighted portfolio"""
+    # Elementwise reductions rather than np.dot: numba routes dot products
+    # through scipy's BLAS, which may not be installed
+    total_return = (weights * returns).sum()
+    total_volatility = np.sqrt((np.outer(weights, weights) * cov).sum())
+    sharpe = (total_return - risk_free_rate) / total_volatility if total_volatility > 0 else 0.0
+    return total_return, total_volatility, sharpe, (weights * betas).sum()
 
 @dataclass
 class PortfolioAsset:
@@ -30,6 +105,34 @@ class PortfolioAsset:
     sector: str
     reasoning: str
 
+@dataclass
+class PortfolioArrays:
+    """Column-oriented view of portfolio assets for vectorized math"""
+    weights: np.ndarray
+    returns: np.ndarray
+    vols: np.ndarray
+    betas: np.ndarray
+    sectors: np.ndarray
+    cov: Optional[np.ndarray] = None  # Covariance the weights were optimized against
+    
+    @classmethod
+    def from_assets(cls, assets: List[PortfolioAsset],
+                    cov: Optional[np.ndarray] = None) -> "PortfolioArrays":
+        # One pass over the assets fills all numeric columns
+        numeric = np.fromiter(
+            ((a.weight, a.expected_return, a.volatility, a.beta) for a in assets),
+            dtype=np.dtype((np.float64, 4)), count=len(assets)
+        ).reshape(len(assets), 4)
+        weights, returns, vols, betas = numeric.T.copy()
+        return cls(
+            weights=weights,
+            returns=returns,
+            vols=vols,
+            betas=betas,
+            sectors=np.array([a.sector for a in assets], dtype=object),
+            cov=cov
+        )
+
 @dataclass
 class PortfolioAnalysis:
     """Portfolio analysis result"""
@@ -47,9 +150,40 @@ class PortfolioAnalysis:
 class PortfolioOptimizer:
     """Portfolio optimization using Modern Portfolio Theory"""
     
+    MAX_WORKERS = 16
+    
     def __init__(self, risk_free_rate: float = 0.04):
         self.risk_free_rate = risk_free_rate  # 4% annual
         self.data_fetcher = DataFetcher()
+        self._hf: Optional[AIHedgeFundAdvanced] = None
+    
+    @property
+    def hedge_fund(self) -> AIHedgeFundAdvanced:
+        """Rules-based analyst team, created on first use and shared across calls"""
+        if self._hf is None:
+            self._hf = AIHedgeFundAdvanced(use_subagents=False)  # Use rules for speed
+            self._hf.data_fetcher = self.data_fetcher  # analyze() reads _fetch_all's batch results
+        return self._hf
+    
+    def _fetch_all(self, tickers: List[str]) -> List:
+        """Analyze tickers concurrently; returns one future per ticker, in input order"""
+        self.hedge_fund  # Create the team before workers race to do so
+        
+        # Fetch provider data once, in one batch; analyze() and analyze_one
+        # both read it from the shared fetcher's memory
+        self.data_fetcher.get_comprehensive_data_batch(tickers)
+        
+        def analyze_one(ticker: str) -> Dict:
+            return {
+                "ticker": ticker,
+                "result": self.hedge_fund.analyze_cached(ticker),
+                "data": self.data_fetcher.get_comprehensive_data(ticker),
+                "historical": self._get_historical_returns(ticker)
+            }
+        
+        workers = max(1, min(self.MAX_WORKERS, len(tickers)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return [executor.submit(analyze_one, ticker) for ticker in tickers]
     
     def build_portfolio(self, tickers: List[str], 
                        target_risk: str = "moderate",
@@ -66,24 +200,17 @@ class PortfolioOptimizer:
         """
         print(f"\n📊 Building {target_risk} portfolio from {len(tickers)} candidates...\n", file=sys.stderr)
         
+        _preload_history(tickers)
+        
         # 1. Analyze each stock
-        hedge_fund = AIHedgeFundAdvanced(use_subagents=False)  # Use rules for speed
         analyses = []
         
-        for ticker in tickers:
+        # Network-bound per ticker, so fetch concurrently and report in input order
+        for ticker, future in zip(tickers, self._fetch_all(tickers)):
             try:
-                result = hedge_fund.analyze(ticker)
-                data = self.data_fetcher.get_comprehensive_data(ticker)
-                
-                # Calculate historical returns/volatility
-                hist_returns = self._get_historical_returns(ticker)
-                
-                analyses.append({
-                    "ticker": ticker,
-                    "result": result,
-                    "data": data,
-                    "historical": hist_returns
-                })
+                analysis = future.result()
+                result = analysis["result"]
+                analyses.append(analysis)
                 
                 emoji = {"bullish": "📈", "bearish": "📉", "neutral": "➡️"}[result.signal]
                 print(f"{emoji} {ticker:6} {result.signal.upper():8} ({result.confidence:2}%)", file=sys.stderr)
@@ -103,59 +230,70 @@ class PortfolioOptimizer:
         for a in qualified:
             a["expected_return"] = self._estimate_return(a["result"], a["historical"])
             a["volatility"] = a["historical"]["volatility"] if a["historical"] else 0.30
-            a["beta"] = a["data"].get("beta", 1.0) or 1.0
+        
+        # Missing (None -> NaN) or zero betas default to market beta
+        raw_betas = np.array([a["data"].get("beta") for a in qualified], dtype=np.float64)
+        betas = np.where(np.isnan(raw_betas) | (raw_betas == 0.0), 1.0, raw_betas)
         
         # 4. Optimize weights
-        weights = self._optimize_weights(qualified, target_risk, max_position, min_position)
+        weights, cov = self._optimize_weights(qualified, target_risk, max_position, min_position)
         
         # 5. Build portfolio assets
+        # Tolerate rounding at the lower bound
+        kept = np.flatnonzero(weights >= min_position - 1e-9)
         assets = []
-        for i, a in enumerate(qualified):
-            if weights[i] >= min_position:
-                assets.append(PortfolioAsset(
-                    ticker=a["ticker"],
-                    weight=weights[i],
-                    signal=a["result"].signal,
-                    confidence=a["result"].confidence,
-                    expected_return=a["expected_return"],
-                    volatility=a["volatility"],
-                    beta=a["beta"],
-                    sector=a["data"].get("sector", "Unknown"),
-                    reasoning=a["result"].recommendation
-                ))
+        for i in kept:
+            a = qualified[i]
+            assets.append(PortfolioAsset(
+                ticker=a["ticker"],
+                weight=weights[i],
+                signal=a["result"].signal,
+                confidence=a["result"].confidence,
+                expected_return=a["expected_return"],
+                volatility=a["volatility"],
+                beta=betas[i],
+                sector=a["data"].get("sector", "Unknown"),
+                reasoning=a["result"].recommendation
+            ))
         
         # 6. Calculate portfolio metrics
-        return self._calculate_portfolio_metrics(assets, target_risk)
+        arrays = PortfolioArrays.from_assets(assets, cov=cov[np.ix_(kept, kept)])
+        return self._calculate_portfolio_metrics(assets, arrays, target_risk)
     
     def _get_historical_returns(self, ticker: str) -> Optional[Dict]:
         """Get historical price data and calculate returns/volatility"""
         try:
-            import yfinance as yf
-            stock = yf.Ticker(ticker)
-            hist = stock.history(period="2y")
+            hist = _fetch_history(ticker, "2y")
             
             if len(hist) < 252:  # Need at least 1 year of data
                 return None
             
-            # Calculate daily returns
-            daily_returns = hist['Close'].pct_change().dropna()
+            # Calculate daily returns, keeping each return's session date so
+            # covariance can line assets up by date rather than by position
+            close_series = hist['Close'].dropna()
+            close = close_series.to_numpy(dtype=np.float64)
+            daily_returns = np.diff(close) / close[:-1]
+            dates = close_series.index
+            if getattr(dates, "tz", None) is not None:
+                dates = dates.tz_localize(None)  # Exchange-local session dates
+            return_dates = dates.normalize().to_numpy()[1:]
             
             # Annualized metrics
             annual_return = daily_returns.mean() * 252
-            annual_volatility = daily_returns.std() * np.sqrt(252)
+            annual_volatility = daily_returns.std(ddof=1) * np.sqrt(252)
             
             # Calculate max drawdown
-            cumulative = (1 + daily_returns).cumprod()
-            running_max = cumulative.expanding().max()
-            drawdown = (cumulative - running_max) / running_max
-            max_drawdown = drawdown.min()
+            cumulative = np.cumprod(1.0 + daily_returns)
+            max_drawdown = float((cumulative / np.maximum.accumulate(cumulative) - 1.0).min())
             
             return {
                 "annual_return": annual_return,
                 "annual_volatility": annual_volatility,
                 "max_drawdown": max_drawdown,
                 "sharpe": (annual_return - self.risk_free_rate) / annual_volatility if annual_volatility > 0 else 0,
-                "volatility": annual_volatility
+                "volatility": annual_volatility,
+                "daily_returns": daily_returns.astype(np.float32),  # Kept for covariance
+                "return_dates": return_dates
             }
         except Exception as e:
             print(f"Warning: Could not get historical data for {ticker}: {e}", file=sys.stderr)
@@ -181,94 +319,153 @@ class PortfolioOptimizer:
         return base_return
     
     def _optimize_weights(self, assets: List[Dict], target_risk: str, 
-                         max_position: float, min_position: float) -> np.ndarray:
+                         max_position: float, min_position: float) -> Tuple[np.ndarray, np.ndarray]:
         """
-        Optimize portfolio weights using mean-variance optimization
+        Optimize portfolio weights using mean-variance optimization;
+        returns the weights and the covariance matrix used
         """
-        n = len(assets)
-        
         # Expected returns and volatilities
         returns = np.array([a["expected_return"] for a in assets])
         vols = np.array([a["volatility"] for a in assets])
         
-        # Simplified covariance matrix (assume 0.3 correlation for now)
-        # In production, calculate from historical returns
-        corr = 0.3
-        cov = np.zeros((n, n))
-        for i in range(n):
-            for j in range(n):
-                if i == j:
-                    cov[i, j] = vols[i] ** 2
-                else:
-                    cov[i, j] = corr * vols[i] * vols[j]
-        
-        # Risk tolerance
-        risk_multiplier = {
-            "conservative": 0.5,
-            "moderate": 1.0,
-            "aggressive": 1.5
-        }.get(target_risk, 1.0)
-        
-        # Simplified optimization: maximize Sharpe ratio with constraints
-        # Using inverse volatility weighting as a simple heuristic
-        inv_vols = 1.0 / (vols + 0.01)  # Add small constant to avoid division by zero
-        weights = inv_vols / inv_vols.sum()
-        
-        # Adjust based on expected returns (higher return = higher weight)
-        return_adjustment = (returns - returns.min()) / (returns.max() - returns.min() + 0.001)
-        weights = weights * (1 + return_adjustment)
-        weights = weights / weights.sum()
-        
-        # Apply constraints
-        weights = np.clip(weights, min_position, max_position)
-        weights = weights / weights.sum()  # Re-normalize
+        # Historical covariance when every asset has price history,
+        # otherwise a simplified matrix assuming 0.3 correlation
+        hist_cov = self._historical_cov([a["historical"] for a in assets])
+        cov = hist_cov if hist_cov is not None else self._build_cov(vols)
+        
+        # Risk tolerance (higher = more variance-averse)
+        risk_aversion = {
+            "conservative": 10.0,
+            "moderate": 5.0,
+            "aggressive": 2.0
+        }.get(target_risk, 5.0)
+        
+        if SCIPY_AVAILABLE:
+            weights = self._mean_variance_weights(returns, cov, risk_aversion,
+                                                  min_position, max_position)
+            if weights is not None:
+                return weights, cov
+        
+        # Heuristic fallback. Base weights: closed-form equal-correlation portfolio w ∝ Σ⁻¹σ,
+        # falling back to inverse volatility without historical covariance
+        weights = None
+        if hist_cov is not None:
+            x = self._robust_inverse(hist_cov) @ np.sqrt(np.diag(hist_cov))
+            total = x.sum()
+            if total > 0:
+                weights = x
+                weights /= total
+        if weights is None:
+            weights = np.reciprocal(vols + 0.01)  # Add small constant to avoid division by zero
+            weights /= weights.sum()
+        
+        # Adjust based on expected returns (higher return = higher weight),
+        # then apply constraints
+        return _tilt_and_clip(weights, returns, min_position, max_position), cov
+    
+    @staticmethod
+    def _build_cov(vols: np.ndarray, corr: float = 0.3) -> np.ndarray:
+        """Covariance matrix assuming one pairwise correlation for all assets"""
+        cov = corr * np.outer(vols, vols)
+        np.fill_diagonal(cov, vols * vols)
+        return cov
+    
+    @staticmethod
+    def _mean_variance_weights(mu: np.ndarray, sigma: np.ndarray, gamma: float,
+                               min_position: float, max_position: float) -> Optional[np.ndarray]:
+        """
+        Solve max wᵀμ - (γ/2)·wᵀΣw  s.t.  Σw = 1, min_position ≤ w ≤ max_position
+        with SLSQP; returns None if the problem is infeasible or does not converge
+        """
+        n = len(mu)
+        sigma = sigma.astype(np.float64, copy=False)
+        if n * max_position < 1.0 or n * min_position > 1.0:
+            return None  # No fully invested portfolio fits the position limits
+        
+        result = minimize(
+            lambda w: 0.5 * gamma * (w @ sigma @ w) - w @ mu,
+            x0=np.full(n, 1.0 / n),
+            jac=lambda w: gamma * (sigma @ w) - mu,
+            method="SLSQP",
+            bounds=[(min_position, max_position)] * n,
+            constraints=[{"type": "eq", "fun": lambda w: w.sum() - 1.0,
+                          "jac": lambda w: np.ones_like(w)}]
+        )
+        if not result.success:
+            return None
         
+        weights = np.clip(result.x, min_position, max_position)
+        weights /= weights.sum()
         return weights
     
-    def _calculate_portfolio_metrics(self, assets: List[PortfolioAsset], 
+    @staticmethod
+    def _historical_cov(histories: List[Optional[Dict]]) -> Optional[np.ndarray]:
+        """Annualized float32 covariance of daily returns, or None if any history is missing"""
+        if not histories or any(not h or h.get("daily_returns") is None
+                                or h.get("return_dates") is None for h in histories):
+            return None
+        
+        # Align on the sessions every asset traded, so each row pairs returns from
+        # the same day even when one ticker skipped a session or trades weekends
+        common = histories[0]["return_dates"]
+        for h in histories[1:]:
+            common = np.intersect1d(common, h["return_dates"])
+        if len(common) < 2:
+            return None
+        columns = []
+        for h in histories:
+            dates, idx = np.unique(h["return_dates"], return_index=True)
+            columns.append(h["daily_returns"][idx[np.searchsorted(dates, common)]])
+        returns = np.column_stack(columns)
+        
+        # Daily-return noise sits far above float32 precision, so store Σ in
+        # single precision; solvers upcast to float64
+        sigma = np.atleast_2d(np.cov(returns, rowvar=False, ddof=1, dtype=np.float32))
+        sigma *= 252
+        sigma += np.float32(1e-4) * np.eye(len(histories), dtype=np.float32)  # Ridge term keeps Σ invertible
+        return sigma
+    
+    @staticmethod
+    def _robust_inverse(sigma: np.ndarray, max_cond: float = 1e8) -> np.ndarray:
+        """Inverse of Σ via SVD, truncating singular values when ill-conditioned"""
+        u, s, vt = np.linalg.svd(sigma.astype(np.float64, copy=False))
+        # Equivalent to inv() when cond(Σ) <= max_cond, a pseudoinverse otherwise
+        inv_s = np.divide(1.0, s, out=np.zeros_like(s), where=s > s.max() / max_cond)
+        return (vt.T * inv_s) @ u.T
+    
+    def _calculate_portfolio_metrics(self, assets: List[PortfolioAsset],
+                                    arrays: PortfolioArrays,
                                     target_risk: str) -> PortfolioAnalysis:
         """Calculate portfolio-level metrics"""
         
-        weights = np.array([a.weight for a in assets])
-        returns = np.array([a.expected_return for a in assets])
-        vols = np.array([a.volatility for a in assets])
-        betas = np.array([a.beta for a in assets])
-        
-        # Portfolio expected return (weighted average)
-        total_return = np.dot(weights, returns)
-        
-        # Portfolio volatility (simplified - assumes 0.3 correlation)
-        # In production, use full covariance matrix
-        portfolio_var = 0
-        for i in range(len(assets)):
-            for j in range(len(assets)):
-                corr = 1.0 if i == j else 0.3
-                portfolio_var += weights[i] * weights[j] * vols[i] * vols[j] * corr
+        weights = arrays.weights
         
-        total_volatility = np.sqrt(portfolio_var)
+        # Reuse the optimizer's covariance; existing portfolios fall back to 0.3 correlation
+        cov = arrays.cov if arrays.cov is not None else self._build_cov(arrays.vols)
         
-        # Sharpe ratio
-        sharpe = (total_return - self.risk_free_rate) / total_volatility if total_volatility > 0 else 0
-        
-        # Portfolio beta
-        portfolio_beta = np.dot(weights, betas)
+        # Weighted return, volatility, Sharpe ratio and beta
+        total_return, total_volatility, sharpe, portfolio_beta = _portfolio_stats(
+            weights, arrays.returns, cov, arrays.betas, self.risk_free_rate
+        )
         
         # Estimated max drawdown (rough estimate: 2.5x volatility)
         max_dd_estimate = -2.5 * total_volatility
         
         # Diversification score (based on number of positions and sector spread)
-        sectors = {}
-        for a in assets:
-            sectors[a.sector] = sectors.get(a.sector, 0) + a.weight
+        sector_ids = {}  # sector -> id, in order of first appearance
+        idx = np.fromiter((sector_ids.setdefault(s, len(sector_ids)) for s in arrays.sectors),
+                          dtype=np.intp, count=len(arrays.sectors))
+        sector_weights = np.zeros(len(sector_ids))
+        np.add.at(sector_weights, idx, weights)
+        sectors = dict(zip(sector_ids, sector_weights.tolist()))
         
         # Herfindahl index for sector concentration
-        sector_hhi = sum(w**2 for w in sectors.values())
+        sector_hhi = float(sector_weights @ sector_weights)
         diversification_score = int((1 - sector_hhi) * 100)
         
         # Check if rebalancing needed
-        rebalancing_needed = any(
-            a.weight > 0.15 or a.weight < 0.03 or a.signal == "bearish"
-            for a in assets
+        rebalancing_needed = bool(((weights > 0.15) | (weights < 0.03)).any()) or any(
+            a.signal == "bearish" for a in assets
         )
         
         # Generate recommendations
@@ -333,15 +530,17 @@ class PortfolioOptimizer:
         """
         print(f"\n📊 Analyzing existing portfolio with {len(holdings)} positions...\n", file=sys.stderr)
         
+        _preload_history(list(holdings))
+        
         # Analyze each holding
-        hedge_fund = AIHedgeFundAdvanced(use_subagents=False)
         assets = []
         
-        for ticker, weight in holdings.items():
+        tickers = list(holdings)
+        for ticker, future in zip(tickers, self._fetch_all(tickers)):
             try:
-                result = hedge_fund.analyze(ticker)
-                data = self.data_fetcher.get_comprehensive_data(ticker)
-                hist = self._get_historical_returns(ticker)
+                weight = holdings[ticker]
+                analysis = future.result()
+                result, data, hist = analysis["result"], analysis["data"], analysis["historical"]
                 
                 assets.append(PortfolioAsset(
                     ticker=ticker,
@@ -360,7 +559,8 @@ class PortfolioOptimizer:
             except Exception as e:
                 print(f"❌ {ticker}: {e}", file=sys.stderr)
         
-        return self._calculate_portfolio_metrics(assets, "moderate")
+        arrays = PortfolioArrays.from_assets(assets)
+        return self._calculate_portfolio_metrics(assets, arrays, "moderate")
 
 def format_portfolio_output(analysis: PortfolioAnalysis, title: str = "Portfolio Analysis") -> str:
     """Format portfolio analysis for display"""
@@ -377,7 +577,10 @@ def format_portfolio_output(analysis: PortfolioAnalysis, title: str = "Portfolio
     lines.append(f"{'Ticker':<10} {'Weight':<10} {'Signal':<10} {'Exp Return':<12} {'Volatility':<12}")
     lines.append("-" * 60)
     
-    for asset in sorted(analysis.assets, key=lambda x: x.weight, reverse=True):
+    assets = analysis.assets
+    asset_weights = np.fromiter((a.weight for a in assets), dtype=np.float64, count=len(assets))
+    for i in np.argsort(-asset_weights, kind="stable"):
+        asset = assets[i]
         exp_ret = asset.expected_return if asset.expected_return is not None else 0
         vol = asset.volatility if asset.volatility is not None else 0
         lines.append(
@@ -401,8 +604,12 @@ def format_portfolio_output(analysis: PortfolioAnalysis, title: str = "Portfolio
     # Sector breakdown
     lines.append("🏭 Sector Allocation:")
     lines.append("-" * 40)
-    for sector, weight in sorted(analysis.sector_concentration.items(), key=lambda x: x[1] or 0, reverse=True):
-        w = weight or 0
+    sector_items = list(analysis.sector_concentration.items())
+    sector_weights = np.fromiter((w or 0 for _, w in sector_items), dtype=np.float64,
+                                 count=len(sector_items))
+    for i in np.argsort(-sector_weights, kind="stable"):
+        sector = sector_items[i][0]
+        w = float(sector_weights[i])
         s = sector or "Unknown"
         bar = "█" * int(w * 30)
         lines.append(f"  {s:<25} {w:>6.1%} {bar}")
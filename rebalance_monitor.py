@@ -4,17 +4,22 @@ AI Hedge Fund - Rebalancing Alert System
 Monitors portfolios and alerts when rebalancing is needed
 """
 
+import io
 import os
 import sys
 import json
+import numpy as np
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 from dataclasses import dataclass
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
 
 sys.path.insert(0, str(Path(__file__).parent))
 from ai_hedge_fund_advanced import AIHedgeFundAdvanced, DataFetcher
 
+URGENCY_EMOJI = {"HIGH": "🔴", "MEDIUM": "🟡", "LOW": "🟢"}
+
 @dataclass
 class RebalanceAlert:
     ticker: str
@@ -40,10 +45,17 @@ class PortfolioHealth:
 class RebalancingMonitor:
     """Monitor portfolio and generate rebalancing alerts"""
     
-    def __init__(self, drift_threshold: float = 0.05):
+    MAX_WORKERS = 16
+    # Seconds to wait for one ticker's analysis. A ticker that takes longer is
+    # reported and skipped, but its thread is not cancelled: it runs on in the
+    # background and interpreter exit still waits for it.
+    TICKER_TIMEOUT = 30
+    
+    def __init__(self, drift_threshold: float = 0.05, use_cache: bool = False):
         self.drift_threshold = drift_threshold  # 5% drift triggers alert
-        self.data_fetcher = DataFetcher()
+        self.data_fetcher = DataFetcher(use_disk_cache=use_cache)
         self.hedge_fund = AIHedgeFundAdvanced(use_subagents=False)
+        self.hedge_fund.data_fetcher = self.data_fetcher  # analyze() reads check_portfolio's batch results
     
     def check_portfolio(self, holdings: Dict[str, float], 
                        last_rebalanced: Optional[str] = None) -> PortfolioHealth:
@@ -58,67 +70,95 @@ class RebalancingMonitor:
         
         # Calculate days since rebalance
         if last_rebalanced:
-            last_date = datetime.strptime(last_rebalanced, '%Y-%m-%d')
+            last_date = datetime.fromisoformat(last_rebalanced[:10])
             days_since = (datetime.now() - last_date).days
         else:
             days_since = 30  # Assume 30 if unknown
         
-        alerts = []
-        
-        # Check each holding
         total_weight = sum(holdings.values())
         
-        for ticker, current_weight in holdings.items():
-            try:
-                # Get current signal
-                result = self.hedge_fund.analyze(ticker)
-                data = self.data_fetcher.get_comprehensive_data(ticker)
-                
-                # Determine target weight based on signal
-                if result.signal == "bullish":
-                    target_weight = min(0.20, 0.10 + result.confidence / 1000)
-                elif result.signal == "neutral":
-                    target_weight = 0.05
-                else:  # bearish
-                    target_weight = 0
-                
-                # Calculate drift
-                drift = current_weight - target_weight
-                
-                # Determine action and urgency
-                if abs(drift) > self.drift_threshold:
-                    if drift > 0:
-                        action = "DECREASE"
-                        urgency = "HIGH" if result.signal == "bearish" else "MEDIUM"
-                    else:
-                        action = "INCREASE"
-                        urgency = "HIGH" if result.signal == "bullish" and result.confidence > 75 else "MEDIUM"
-                    
-                    alerts.append(RebalanceAlert(
-                        ticker=ticker,
-                        current_weight=current_weight,
-                        target_weight=target_weight,
-                        drift=drift,
-                        signal=result.signal,
-                        action=action,
-                        urgency=urgency,
-                        reason=f"{result.signal.upper()} signal ({result.confidence}% confidence)"
-                    ))
-                
-                print(f"{'⚠️' if abs(drift) > self.drift_threshold else '✅'} {ticker}: {current_weight:.1%} vs target {target_weight:.1%}", file=sys.stderr)
-                
-            except Exception as e:
-                print(f"❌ {ticker}: Error - {e}", file=sys.stderr)
+        # Fetch market data for all holdings in one batch; analyze() then reads it from the fetcher.
+        # The timeout covers the whole batch, so allow TICKER_TIMEOUT per wave of concurrent requests
+        waves = -(-len(holdings) // self.data_fetcher.MAX_CONCURRENT_REQUESTS)
+        self.data_fetcher.get_comprehensive_data_batch(list(holdings), timeout=self.TICKER_TIMEOUT * waves)
+        
+        # Analyze each holding; analysis is network-bound, so fan out across threads
+        tickers, weights, results = [], [], []
+        status_lines = []  # written to stderr in one go once the loop is done
+        executor = ThreadPoolExecutor(max_workers=max(1, min(self.MAX_WORKERS, len(holdings))))
+        try:
+            futures = [(ticker, weight, executor.submit(self.hedge_fund.analyze_cached, ticker))
+                       for ticker, weight in holdings.items()]
+            
+            # Collect in input order so alerts and output stay deterministic
+            for ticker, weight, future in futures:
+                try:
+                    result = future.result(timeout=self.TICKER_TIMEOUT)
+                except FutureTimeout:
+                    status_lines.append(f"❌ {ticker}: Error - timed out after {self.TICKER_TIMEOUT}s")
+                    continue
+                except Exception as e:
+                    status_lines.append(f"❌ {ticker}: Error - {e}")
+                    continue
+                tickers.append(ticker)
+                weights.append(weight)
+                results.append(result)
+        finally:
+            # Don't wait for timed-out analyses here; they finish in the background
+            executor.shutdown(wait=False)
+        
+        # Target weight from signal, for every holding at once
+        n = len(results)
+        current = np.asarray(weights, dtype=np.float64)
+        signals = np.array([r.signal for r in results], dtype=object)
+        confidence = np.fromiter((r.confidence for r in results), dtype=np.float64, count=n)
+        code = np.select([signals == "bullish", signals == "neutral"], [2, 1], default=0)
+        target = np.where(code == 2, np.minimum(0.20, 0.10 + confidence / 1000.0),
+                          np.where(code == 1, 0.05, 0.0))
+        drift = current - target
+        alert_mask = np.abs(drift) > self.drift_threshold
+        
+        # Determine action and urgency for drifted positions
+        alerts = []
+        for i in range(n):
+            ticker, result = tickers[i], results[i]
+            status_lines.append(
+                f"{'⚠️' if alert_mask[i] else '✅'} {ticker}: {current[i]:.1%} vs target {target[i]:.1%}")
+            if not alert_mask[i]:
+                continue
+            
+            if drift[i] > 0:
+                action = "DECREASE"
+                urgency = "HIGH" if result.signal == "bearish" else "MEDIUM"
+            else:
+                action = "INCREASE"
+                urgency = "HIGH" if result.signal == "bullish" and result.confidence > 75 else "MEDIUM"
+            
+            alerts.append(RebalanceAlert(
+                ticker=ticker,
+                current_weight=weights[i],
+                target_weight=float(target[i]),
+                drift=float(drift[i]),
+                signal=result.signal,
+                action=action,
+                urgency=urgency,
+                reason=f"{result.signal.upper()} signal ({result.confidence}% confidence)"
+            ))
+        
+        if status_lines:
+            sys.stderr.write("\n".join(status_lines) + "\n")
+            sys.stderr.flush()
         
         # Calculate health metrics
-        total_drift = sum(abs(a.drift) for a in alerts)
-        max_drift = max((abs(a.drift) for a in alerts), default=0)
+        abs_drift = np.abs(drift[alert_mask])
+        total_drift = float(abs_drift.sum())
+        max_drift = float(abs_drift.max()) if abs_drift.size else 0.0
         
         # Health score (0-100)
         health_score = max(0, 100 - int(total_drift * 200) - int(days_since / 2))
         
         # Generate recommendations
-        recommendations = self._generate_recommendations(alerts, days_since, holdings)
+        recommendations = self._generate_recommendations(alerts, days_since, holdings, total_weight)
         
         return PortfolioHealth(
             portfolio_id="portfolio_1",
@@ -133,7 +173,8 @@ class RebalancingMonitor:
     
     def _generate_recommendations(self, alerts: List[RebalanceAlert], 
                                   days_since: int, 
-                                  holdings: Dict[str, float]) -> List[str]:
+                                  holdings: Dict[str, float],
+                                  total_weight: float) -> List[str]:
         """Generate rebalancing recommendations"""
         recommendations = []
         
@@ -151,14 +192,12 @@ class RebalancingMonitor:
                 recommendations.append(f"   - {alert.ticker}: {alert.action} by {abs(alert.drift):.1%}")
         
         # Concentration check
-        max_pos = max(holdings.values()) if holdings else 0
+        max_ticker, max_pos = max(holdings.items(), key=lambda kv: kv[1], default=(None, 0.0))
         if max_pos > 0.20:
-            max_ticker = max(holdings.items(), key=lambda x: x[1])[0]
             recommendations.append(f"⚠️  High concentration: {max_ticker} at {max_pos:.1%}. Consider reducing.")
         
         # Cash recommendation
-        total_invested = sum(holdings.values())
-        if total_invested > 0.95:
+        if total_weight > 0.95:
             recommendations.append("💡 Portfolio fully invested. Consider keeping 5-10% cash for opportunities.")
         
         # Sector check (simplified)
@@ -196,50 +235,53 @@ class RebalancingMonitor:
 
 def format_rebalance_report(health: PortfolioHealth) -> str:
     """Format rebalancing report"""
-    lines = [
-        f"\n{'='*80}",
-        f"🔔 Portfolio Rebalancing Report",
-        f"{'='*80}",
-        f"Last Rebalanced: {health.last_rebalanced} ({health.days_since_rebalance} days ago)",
-        f"Health Score: {health.health_score}/100",
-        ""
-    ]
+    buf = io.StringIO()
+    write = buf.write
+    write(f"\n{'='*80}\n")
+    write("🔔 Portfolio Rebalancing Report\n")
+    write(f"{'='*80}\n")
+    write(f"Last Rebalanced: {health.last_rebalanced} ({health.days_since_rebalance} days ago)\n")
+    write(f"Health Score: {health.health_score}/100\n")
+    write("\n")
     
     # Alerts
-    if health.alerts:
-        lines.append("⚠️  Rebalancing Alerts:")
-        lines.append("-" * 80)
-        lines.append(f"{'Ticker':<10} {'Current':<10} {'Target':<10} {'Drift':<10} {'Action':<10} {'Urgency'}")
-        lines.append("-" * 80)
+    alerts = health.alerts
+    if alerts:
+        write("⚠️  Rebalancing Alerts:\n")
+        write("-" * 80 + "\n")
+        write(f"{'Ticker':<10} {'Current':<10} {'Target':<10} {'Drift':<10} {'Action':<10} {'Urgency'}\n")
+        write("-" * 80 + "\n")
         
-        for alert in sorted(health.alerts, key=lambda x: abs(x.drift), reverse=True):
-            urgency_emoji = {"HIGH": "🔴", "MEDIUM": "🟡", "LOW": "🟢"}[alert.urgency]
-            lines.append(
+        drift = np.fromiter((a.drift for a in alerts), dtype=np.float64, count=len(alerts))
+        emoji = [URGENCY_EMOJI[a.urgency] for a in alerts]
+        for i in np.argsort(-np.abs(drift), kind="stable"):
+            alert = alerts[i]
+            write(
                 f"{alert.ticker:<10} {alert.current_weight:>8.1%}  {alert.target_weight:>8.1%}  "
-                f"{alert.drift:>+8.1%}  {alert.action:<10} {urgency_emoji} {alert.urgency}"
+                f"{alert.drift:>+8.1%}  {alert.action:<10} {emoji[i]} {alert.urgency}\n"
             )
-        lines.append("")
+        write("\n")
     else:
-        lines.append("✅ No rebalancing needed at this time.")
-        lines.append("")
+        write("✅ No rebalancing needed at this time.\n")
+        write("\n")
     
     # Recommendations
     if health.recommendations:
-        lines.append("💡 Recommendations:")
-        lines.append("-" * 40)
+        write("💡 Recommendations:\n")
+        write("-" * 40 + "\n")
         for rec in health.recommendations:
-            lines.append(f"  {rec}")
-        lines.append("")
+            write(f"  {rec}\n")
+        write("\n")
     
     # Summary
-    lines.append("📊 Summary:")
-    lines.append("-" * 40)
-    lines.append(f"  Total Drift:         {health.total_drift:.1%}")
-    lines.append(f"  Max Position Drift:  {health.max_position_drift:.1%}")
-    lines.append(f"  Alerts:              {len(health.alerts)}")
-    lines.append(f"{'='*80}\n")
+    write("📊 Summary:\n")
+    write("-" * 40 + "\n")
+    write(f"  Total Drift:         {health.total_drift:.1%}\n")
+    write(f"  Max Position Drift:  {health.max_position_drift:.1%}\n")
+    write(f"  Alerts:              {len(alerts)}\n")
+    write(f"{'='*80}\n")
     
-    return "\n".join(lines)
+    return buf.getvalue()
 
 def main():
     import argparse
@@ -249,6 +291,8 @@ def main():
     parser.add_argument("--threshold", "-t", type=float, default=0.05,
                        help="Drift threshold (default 0.05 = 5%)")
     parser.add_argument("--json", "-j", action="store_true", help="Output as JSON")
+    parser.add_argument("--no-cache", action="store_true",
+                       help="Always fetch fresh market data (skip today's disk cache)")
     
     args = parser.parse_args()
     
@@ -263,7 +307,7 @@ def main():
             tickers = [t.strip().upper() for t in args.holdings.split(",")]
             holdings = {t: 1.0/len(tickers) for t in tickers}
     
-    monitor = RebalancingMonitor(drift_threshold=args.threshold)
+    monitor = RebalancingMonitor(drift_threshold=args.threshold, use_cache=not args.no_cache)
     
     try:
         health = monitor.check_portfolio(holdings, args.last_rebalanced)
@@ -302,6 +346,8 @@ def main():
         import traceback
         traceback.print_exc()
         sys.exit(1)
+    finally:
+        monitor.data_fetcher.report_cache_stats()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -4,9 +4,11 @@ AI Hedge Fund - Tax Optimization Module
 Tax-loss harvesting and tax-efficient portfolio management
 """
 
+import io
 import os
 import sys
 import json
+import numpy as np
 from datetime import datetime, timedelta
 from typing import Dict, List, Tuple, Optional
 from dataclasses import dataclass
@@ -14,6 +16,62 @@ from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent))
 from ai_hedge_fund_advanced import AIHedgeFundAdvanced, DataFetcher
+from base import NUMBA_AVAILABLE, njit
+
+if NUMBA_AVAILABLE:
+    from numba import guvectorize
+    
+    @guvectorize(['void(float64[:], float64[:], float64[:], int32[:], int64, '
+                  'float64[:], float64[:], float64[:], float64[:], boolean[:])'],
+                 '(n),(n),(n),(n),()->(n),(n),(n),(n),(n)', nopython=True, cache=True)
+    def _lot_metrics_kernel(shares, purchase_price, current_price, days_held, long_term_threshold,
+                            cost_basis, current_value, unrealized_gain, gain_percent, is_long_term):
+        for i in range(shares.shape[0]):
+            cost_basis[i] = shares[i] * purchase_price[i]
+            current_value[i] = shares[i] * current_price[i]
+            unrealized_gain[i] = current_value[i] - cost_basis[i]
+            gain_percent[i] = unrealized_gain[i] / cost_basis[i] if cost_basis[i] > 0 else 0.0
+            is_long_term[i] = days_held[i] >= long_term_threshold
+
+def _lot_metrics(shares: np.ndarray, purchase_price: np.ndarray, current_price: np.ndarray,
+                 days_held: np.ndarray, long_term_threshold: int) -> Tuple[np.ndarray, ...]:
+    """Cost basis, current value, unrealized gain, gain percent and long-term flag per lot"""
+    if NUMBA_AVAILABLE:
+        return _lot_metrics_kernel(shares, purchase_price, current_price, days_held, long_term_threshold)
+    
+    cost_basis = shares * purchase_price
+    current_value = shares * current_price
+    unrealized_gain = current_value - cost_basis
+    gain_percent = np.divide(unrealized_gain, cost_basis,
+                             out=np.zeros(len(shares)), where=cost_basis > 0)
+    return cost_basis, current_value, unrealized_gain, gain_percent, days_held >= long_term_threshold
+
+# Sector ETFs suggested in place of a harvested position
+_SECTOR_REPLACEMENTS: Dict[str, Tuple[str, ...]] = {
+    'Technology': ('VGT', 'XLK', 'QQQ'),
+    'Healthcare': ('VHT', 'XLV', 'IHI'),
+    'Financials': ('VFH', 'XLF', 'KRE'),
+    'Consumer Discretionary': ('XLY', 'VCR'),
+    'Industrials': ('VIS', 'XLI'),
+    'Energy': ('VDE', 'XLE'),
+    'Real Estate': ('VNQ', 'XLRE'),
+    'Materials': ('VAW', 'XLB'),
+    'Utilities': ('VPU', 'XLU'),
+    'Communication Services': ('VOX', 'XLC'),
+}
+_BROAD_MARKET_REPLACEMENTS = ('VTI', 'VOO', 'SPY')
+
+@njit(cache=True)
+def _select_harvests(losses: np.ndarray, target_loss: float) -> Tuple[int, float]:
+    """Greedily take losses in order until target_loss is covered; returns (count, total)"""
+    accumulated = 0.0
+    count = 0
+    for i in range(losses.shape[0]):
+        if accumulated >= target_loss:
+            break
+        accumulated += losses[i]
+        count += 1
+    return count, accumulated
 
 @dataclass
 class TaxLot:
@@ -30,6 +88,63 @@ class TaxLot:
     is_long_term: bool
     days_held: int
 
+@dataclass
+class TaxLotTable:
+    """Tax lots as parallel column arrays; TaxLot rows are built on demand"""
+    ticker: np.ndarray          # object
+    shares: np.ndarray
+    purchase_date: np.ndarray   # object
+    purchase_price: np.ndarray
+    current_price: np.ndarray
+    days_held: np.ndarray       # int32
+    is_long_term: np.ndarray    # bool
+    cost_basis: np.ndarray
+    current_value: np.ndarray
+    unrealized_gain: np.ndarray
+    gain_percent: np.ndarray
+
+    @classmethod
+    def from_records(cls, records: List[Tuple], long_term_threshold: int,
+                     today_ordinal: int) -> 'TaxLotTable':
+        """Build columns from (ticker, shares, purchase_date, purchase_price, current_price, purchase_ordinal) tuples"""
+        n = len(records)
+        ticker = np.empty(n, dtype=object)
+        purchase_date = np.empty(n, dtype=object)
+        ticker[:] = [r[0] for r in records]
+        purchase_date[:] = [r[2] for r in records]
+        shares = np.fromiter((r[1] for r in records), dtype=np.float64, count=n)
+        purchase_price = np.fromiter((r[3] for r in records), dtype=np.float64, count=n)
+        current_price = np.fromiter((r[4] for r in records), dtype=np.float64, count=n)
+        purchase_ordinal = np.fromiter((r[5] for r in records), dtype=np.int32, count=n)
+        days_held = (today_ordinal - purchase_ordinal).astype(np.int32)
+        cost_basis, current_value, unrealized_gain, gain_percent, is_long_term = _lot_metrics(
+            shares, purchase_price, current_price, days_held, long_term_threshold)
+
+        return cls(ticker=ticker, shares=shares, purchase_date=purchase_date,
+                   purchase_price=purchase_price, current_price=current_price,
+                   days_held=days_held, is_long_term=is_long_term,
+                   cost_basis=cost_basis, current_value=current_value,
+                   unrealized_gain=unrealized_gain, gain_percent=gain_percent)
+
+    def __len__(self) -> int:
+        return len(self.ticker)
+
+    def row(self, i: int) -> TaxLot:
+        """Materialize lot i as a TaxLot record"""
+        return TaxLot(
+            ticker=self.ticker[i],
+            shares=float(self.shares[i]),
+            purchase_date=self.purchase_date[i],
+            purchase_price=float(self.purchase_price[i]),
+            current_price=float(self.current_price[i]),
+            cost_basis=float(self.cost_basis[i]),
+            current_value=float(self.current_value[i]),
+            unrealized_gain=float(self.unrealized_gain[i]),
+            gain_percent=float(self.gain_percent[i]),
+            is_long_term=bool(self.is_long_term[i]),
+            days_held=int(self.days_held[i])
+        )
+
 @dataclass
 class TaxLossOpportunity:
     """Tax loss harvesting opportunity"""
@@ -60,12 +175,15 @@ class TaxReport:
 class TaxOptimizer:
     """Tax optimization and loss harvesting"""
     
-    def __init__(self, tax_rate_short: float = 0.35, tax_rate_long: float = 0.20):
+    LOT_TIMEOUT = 30  # seconds to wait for one lot's market data (skips it, doesn't cancel the fetch)
+    
+    def __init__(self, tax_rate_short: float = 0.35, tax_rate_long: float = 0.20,
+                 use_cache: bool = False):
         self.tax_rate_short = tax_rate_short  # Short-term capital gains rate
         self.tax_rate_long = tax_rate_long    # Long-term capital gains rate
         self.long_term_threshold = 365        # Days for long-term status
         self.wash_sale_window = 30            # Days to avoid wash sale
-        self.data_fetcher = DataFetcher()
+        self.data_fetcher = DataFetcher(use_disk_cache=use_cache)
         self.hedge_fund = AIHedgeFundAdvanced(use_subagents=False)
     
     def analyze_tax_position(self, lots: List[Dict]) -> TaxReport:
@@ -77,45 +195,37 @@ class TaxOptimizer:
         """
         print(f"\n💰 Analyzing tax position for {len(lots)} lots...\n", file=sys.stderr)
         
-        # Enrich lots with current data
-        enriched_lots = []
+        # Fetch market data once per distinct ticker, in one batch; the timeout
+        # covers the whole batch, so allow LOT_TIMEOUT per wave of concurrent requests
+        tickers = list(dict.fromkeys(lot['ticker'] for lot in lots))
+        waves = -(-len(tickers) // self.data_fetcher.MAX_CONCURRENT_REQUESTS)
+        market_data = self.data_fetcher.get_comprehensive_data_batch(tickers, timeout=self.LOT_TIMEOUT * waves)
+        
+        # Price each lot, then derive gains column-wise
+        records, errors = [], []
         for lot in lots:
             try:
-                data = self.data_fetcher.get_comprehensive_data(lot['ticker'])
-                current_price = data.get('current_price', lot['purchase_price'])
-                
-                purchase_date = datetime.strptime(lot['purchase_date'], '%Y-%m-%d')
-                days_held = (datetime.now() - purchase_date).days
-                
-                cost_basis = lot['shares'] * lot['purchase_price']
-                current_value = lot['shares'] * current_price
-                unrealized_gain = current_value - cost_basis
-                
-                enriched_lots.append(TaxLot(
-                    ticker=lot['ticker'],
-                    shares=lot['shares'],
-                    purchase_date=lot['purchase_date'],
-                    purchase_price=lot['purchase_price'],
-                    current_price=current_price,
-                    cost_basis=cost_basis,
-                    current_value=current_value,
-                    unrealized_gain=unrealized_gain,
-                    gain_percent=(unrealized_gain / cost_basis) if cost_basis > 0 else 0,
-                    is_long_term=days_held >= self.long_term_threshold,
-                    days_held=days_held
-                ))
+                if lot['ticker'] not in market_data:
+                    raise RuntimeError("no market data")
+                records.append(self._price_lot(lot, market_data[lot['ticker']]))
             except Exception as e:
-                print(f"❌ Error processing {lot['ticker']}: {e}", file=sys.stderr)
+                errors.append(f"❌ Error processing {lot['ticker']}: {e}")
+        if errors:
+            sys.stderr.write("\n".join(errors) + "\n")
+            sys.stderr.flush()
+        table = TaxLotTable.from_records(records, self.long_term_threshold,
+                                         datetime.now().toordinal())
         
         # Calculate gains/losses
-        short_term_gains = sum(l.unrealized_gain for l in enriched_lots 
-                              if not l.is_long_term and l.unrealized_gain > 0)
-        short_term_losses = sum(l.unrealized_gain for l in enriched_lots 
-                               if not l.is_long_term and l.unrealized_gain < 0)
-        long_term_gains = sum(l.unrealized_gain for l in enriched_lots 
-                             if l.is_long_term and l.unrealized_gain > 0)
-        long_term_losses = sum(l.unrealized_gain for l in enriched_lots 
-                              if l.is_long_term and l.unrealized_gain < 0)
+        gains = table.unrealized_gain
+        long_term = table.is_long_term
+        short_term = ~long_term
+        is_gain, is_loss = gains > 0, gains < 0
+        
+        short_term_gains = float(gains[short_term & is_gain].sum())
+        short_term_losses = float(gains[short_term & is_loss].sum())
+        long_term_gains = float(gains[long_term & is_gain].sum())
+        long_term_losses = float(gains[long_term & is_loss].sum())
         
         net_short_term = short_term_gains + short_term_losses
         net_long_term = long_term_gains + long_term_losses
@@ -125,14 +235,14 @@ class TaxOptimizer:
                         max(0, net_long_term) * self.tax_rate_long)
         
         # Find harvesting opportunities
-        opportunities = self._find_harvesting_opportunities(enriched_lots)
+        opportunities = self._find_harvesting_opportunities(table, market_data)
         
         # Calculate total tax savings potential
         total_savings = sum(o.tax_savings for o in opportunities)
         
         # Generate recommendations
         recommendations = self._generate_tax_recommendations(
-            enriched_lots, opportunities, net_short_term, net_long_term
+            table, opportunities, net_short_term, net_long_term
         )
         
         return TaxReport(
@@ -148,22 +258,33 @@ class TaxOptimizer:
             year_end_recommendations=recommendations
         )
     
-    def _find_harvesting_opportunities(self, lots: List[TaxLot]) -> List[TaxLossOpportunity]:
+    def _price_lot(self, lot: Dict, data: Dict) -> Tuple:
+        """Resolve a lot's current price and purchase day ordinal"""
+        current_price = float(data.get('current_price', lot['purchase_price']))
+        purchase_ordinal = datetime.fromisoformat(lot['purchase_date'][:10]).toordinal()
+        
+        return (lot['ticker'], float(lot['shares']), lot['purchase_date'],
+                float(lot['purchase_price']), current_price, purchase_ordinal)
+    
+    def _find_harvesting_opportunities(self, table: TaxLotTable,
+                                       market_data: Dict[str, Dict]) -> List[TaxLossOpportunity]:
         """Find tax loss harvesting opportunities"""
-        opportunities = []
+        loss_idx = np.flatnonzero(table.unrealized_gain < 0)
         
-        loss_lots = [l for l in lots if l.unrealized_gain < 0]
+        # Tax savings for every loss lot at once, ordered largest first
+        rates = np.where(table.is_long_term[loss_idx], self.tax_rate_long, self.tax_rate_short)
+        savings = np.abs(table.unrealized_gain[loss_idx]) * rates
+        order = np.argsort(-savings, kind="stable")
         
-        for lot in loss_lots:
+        opportunities = []
+        for k in order:
+            lot = table.row(loss_idx[k])
+            
             # Check wash sale risk
             wash_sale_risk = lot.days_held < self.wash_sale_window
             
             # Find replacement candidates
-            replacements = self._find_replacements(lot.ticker)
-            
-            # Calculate tax savings
-            tax_rate = self.tax_rate_long if lot.is_long_term else self.tax_rate_short
-            tax_savings = abs(lot.unrealized_gain) * tax_rate
+            replacements = self._find_replacements(market_data[lot.ticker].get('sector'))
             
             if wash_sale_risk:
                 recommendation = "WAIT - Wash sale risk. Sell after 30 days."
@@ -178,37 +299,17 @@ class TaxOptimizer:
                 days_held=lot.days_held,
                 replacement_candidates=replacements,
                 wash_sale_risk=wash_sale_risk,
-                tax_savings=tax_savings,
+                tax_savings=float(savings[k]),
                 recommendation=recommendation
             ))
         
-        return sorted(opportunities, key=lambda x: x.tax_savings, reverse=True)
+        return opportunities
     
-    def _find_replacements(self, ticker: str) -> List[str]:
+    def _find_replacements(self, sector: Optional[str]) -> List[str]:
         """Find replacement securities to avoid wash sale"""
-        try:
-            data = self.data_fetcher.get_comprehensive_data(ticker)
-            sector = data.get('sector', '')
-            
-            # Sector-based replacement suggestions
-            replacements = {
-                'Technology': ['VGT', 'XLK', 'QQQ'],
-                'Healthcare': ['VHT', 'XLV', 'IHI'],
-                'Financials': ['VFH', 'XLF', 'KRE'],
-                'Consumer Discretionary': ['XLY', 'VCR'],
-                'Industrials': ['VIS', 'XLI'],
-                'Energy': ['VDE', 'XLE'],
-                'Real Estate': ['VNQ', 'XLRE'],
-                'Materials': ['VAW', 'XLB'],
-                'Utilities': ['VPU', 'XLU'],
-                'Communication Services': ['VOX', 'XLC']
-            }
-            
-            return replacements.get(sector, ['VTI', 'VOO', 'SPY'])  # Default to broad market
-        except:
-            return ['VTI', 'VOO']  # Safe defaults
+        return list(_SECTOR_REPLACEMENTS.get(sector, _BROAD_MARKET_REPLACEMENTS))
     
-    def _generate_tax_recommendations(self, lots: List[TaxLot], 
+    def _generate_tax_recommendations(self, lots: TaxLotTable, 
                                      opportunities: List[TaxLossOpportunity],
                                      net_st: float, net_lt: float) -> List[str]:
         """Generate tax recommendations"""
@@ -247,28 +348,36 @@ class TaxOptimizer:
                                     target_gains: float = 0) -> Dict:
         """Calculate optimal year-end tax strategy"""
         report = self.analyze_tax_position(lots)
+        wash_sale_warnings = [o.ticker for o in report.harvesting_opportunities if o.wash_sale_risk]
+        
+        current_gains = report.net_short_term + report.net_long_term
+        target_loss = current_gains - target_gains
+        
+        # Already at or below target: nothing to harvest
+        if target_loss <= 0:
+            return {
+                "current_gains": current_gains,
+                "target_gains": target_gains,
+                "losses_needed": 0,
+                "recommended_harvests": [],
+                "total_harvest_loss": 0.0,
+                "tax_savings": 0.0,
+                "wash_sale_warnings": wash_sale_warnings
+            }
         
         # Find lots to harvest
         harvest_candidates = [o for o in report.harvesting_opportunities 
                              if not o.wash_sale_risk]
         
         # Calculate optimal harvest
-        current_gains = report.net_short_term + report.net_long_term
-        target_loss = current_gains - target_gains
-        
-        selected_harvests = []
-        accumulated_loss = 0
-        
-        for opportunity in harvest_candidates:
-            if accumulated_loss >= target_loss:
-                break
-            selected_harvests.append(opportunity)
-            accumulated_loss += opportunity.unrealized_loss
+        losses = np.ascontiguousarray([o.unrealized_loss for o in harvest_candidates], dtype=np.float64)
+        count, accumulated_loss = _select_harvests(losses, float(target_loss))
+        selected_harvests = harvest_candidates[:count]
         
         return {
             "current_gains": current_gains,
             "target_gains": target_gains,
-            "losses_needed": max(0, target_loss),
+            "losses_needed": target_loss,
             "recommended_harvests": [
                 {
                     "ticker": o.ticker,
@@ -280,63 +389,64 @@ class TaxOptimizer:
             ],
             "total_harvest_loss": accumulated_loss,
             "tax_savings": accumulated_loss * self.tax_rate_short,
-            "wash_sale_warnings": [o.ticker for o in report.harvesting_opportunities if o.wash_sale_risk]
+            "wash_sale_warnings": wash_sale_warnings
         }
 
+# Harvesting table row; "{:.30}" truncates the recommendation to 30 characters
+_TAX_ROW = "{:<10} ${:>10,.0f} {:>8.1%} {:>6} ${:>10,.0f} {:.30} {}\n".format
+_WASH_TAG = {True: "⚠️ WASH", False: ""}
+
 def format_tax_report(report: TaxReport) -> str:
     """Format tax report for display"""
-    lines = [
-        f"\n{'='*80}",
-        f"💰 Tax Optimization Report",
-        f"{'='*80}",
-        "",
-        "📊 Current Tax Position:",
-        "-" * 50,
-        f"  Short-Term Gains:   ${report.short_term_gains:>12,.0f}",
-        f"  Short-Term Losses:  ${report.short_term_losses:>12,.0f}",
-        f"  Net Short-Term:     ${report.net_short_term:>12,.0f}",
-        "",
-        f"  Long-Term Gains:    ${report.long_term_gains:>12,.0f}",
-        f"  Long-Term Losses:   ${report.long_term_losses:>12,.0f}",
-        f"  Net Long-Term:      ${report.net_long_term:>12,.0f}",
-        "",
-        f"  Estimated Tax:      ${report.estimated_tax_liability:>12,.0f}",
-        ""
-    ]
+    buf = io.StringIO()
+    write = buf.write
+    write(
+        f"\n{'='*80}\n"
+        "💰 Tax Optimization Report\n"
+        f"{'='*80}\n"
+        "\n"
+        "📊 Current Tax Position:\n"
+        f"{'-' * 50}\n"
+        f"  Short-Term Gains:   ${report.short_term_gains:>12,.0f}\n"
+        f"  Short-Term Losses:  ${report.short_term_losses:>12,.0f}\n"
+        f"  Net Short-Term:     ${report.net_short_term:>12,.0f}\n"
+        "\n"
+        f"  Long-Term Gains:    ${report.long_term_gains:>12,.0f}\n"
+        f"  Long-Term Losses:   ${report.long_term_losses:>12,.0f}\n"
+        f"  Net Long-Term:      ${report.net_long_term:>12,.0f}\n"
+        "\n"
+        f"  Estimated Tax:      ${report.estimated_tax_liability:>12,.0f}\n"
+        "\n"
+    )
     
-    # Harvesting opportunities
+    # Harvesting opportunities (already ordered by tax savings)
     if report.harvesting_opportunities:
-        lines.extend([
-            "🌾 Tax Loss Harvesting Opportunities:",
-            "-" * 80,
-            f"{'Ticker':<10} {'Loss':<12} {'Loss %':<10} {'Days':<8} {'Tax Savings':<12} {'Action'}",
-            "-" * 80
-        ])
+        write("🌾 Tax Loss Harvesting Opportunities:\n")
+        write("-" * 80 + "\n")
+        write(f"{'Ticker':<10} {'Loss':<12} {'Loss %':<10} {'Days':<8} {'Tax Savings':<12} {'Action'}\n")
+        write("-" * 80 + "\n")
         
-        for opp in report.harvesting_opportunities[:10]:
-            wash_sale = "⚠️ WASH" if opp.wash_sale_risk else ""
-            lines.append(
-                f"{opp.ticker:<10} ${opp.unrealized_loss:>10,.0f} {opp.loss_percent:>8.1%} "
-                f"{opp.days_held:>6} ${opp.tax_savings:>10,.0f} {opp.recommendation[:30]} {wash_sale}"
-            )
+        write("".join([
+            _TAX_ROW(opp.ticker, opp.unrealized_loss, opp.loss_percent, opp.days_held,
+                     opp.tax_savings, opp.recommendation, _WASH_TAG[opp.wash_sale_risk])
+            for opp in report.harvesting_opportunities[:10]
+        ]))
         
-        lines.append("")
-        lines.append(f"💵 Total Tax Savings Potential: ${report.total_tax_savings_potential:,.0f}")
-        lines.append("")
+        write("\n")
+        write(f"💵 Total Tax Savings Potential: ${report.total_tax_savings_potential:,.0f}\n")
+        write("\n")
     
     # Recommendations
     if report.year_end_recommendations:
-        lines.extend([
-            "💡 Recommendations:",
-            "-" * 50
-        ])
+        write("💡 Recommendations:\n")
+        write("-" * 50 + "\n")
         for rec in report.year_end_recommendations:
-            lines.append(f"  {rec}")
-        lines.append("")
+            write(f"  {rec}\n")
+        write("\n")
     
-    lines.append(f"{'='*80}\n")
+    write(f"{'='*80}\n")
     
-    return "\n".join(lines)
+    return buf.getvalue()
 
 def main():
     import argparse
@@ -352,6 +462,8 @@ def main():
     parser.add_argument("--tax-rate-long", type=float, default=0.20,
                        help="Long-term tax rate")
     parser.add_argument("--json", "-j", action="store_true", help="Output as JSON")
+    parser.add_argument("--no-cache", action="store_true",
+                       help="Always fetch fresh market data (skip today's disk cache)")
     
     args = parser.parse_args()
     
@@ -364,7 +476,8 @@ def main():
     
     optimizer = TaxOptimizer(
         tax_rate_short=args.tax_rate_short,
-        tax_rate_long=args.tax_rate_long
+        tax_rate_long=args.tax_rate_long,
+        use_cache=not args.no_cache
     )
     
     try:
@@ -412,6 +525,8 @@ def main():
         import traceback
         traceback.print_exc()
         sys.exit(1)
+    finally:
+        optimizer.data_fetcher.report_cache_stats()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
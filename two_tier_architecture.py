@@ -4,10 +4,21 @@ Tier 1: Data Analysts (5 enhanced agents) - Research & Analysis
 Tier 2: Investment Masters (5 classic agents) - Decision Making
 """
 
+import os
 import sys
-from typing import Dict, List, Optional
-from dataclasses import dataclass, field
-from base import AgentSignal, InvestmentAgent
+import time
+import atexit
+import asyncio
+import hashlib
+import threading
+from bisect import bisect_right
+from collections import Counter, OrderedDict
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Tuple
+from dataclasses import dataclass, field, replace
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import numpy as np
+
+from base import DATACLASS_SLOTS, AgentSignal, InvestmentAgent, njit
 from data_enhancement import EnhancedStockData, EnhancedDataFetcher
 from enhanced_agents import (
     EarningsAgent, AnalystConsensusAgent, MacroAgent, 
@@ -16,7 +27,14 @@ from enhanced_agents import (
 from news_analyst import NewsAnalyst, NewsAnalysisReport, format_news_report
 
 
-@dataclass
+# One bounded pool for every analyst and master task in the process; these tasks
+# never wait on other pool tasks, so sharing it cannot deadlock
+_POOL = ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 4) * 4),
+                           thread_name_prefix="hedgefund")
+atexit.register(_POOL.shutdown)
+
+
+@dataclass(**DATACLASS_SLOTS)
 class AnalystReport:
     """Comprehensive research report from Tier 1 analysts"""
     # Earnings Analysis
@@ -67,658 +85,1068 @@ class AnalystReport:
     tech_disruption_risk: str = "low"
     news_summary: str = ""
     external_factors_count: int = 0
-    key_news_risks: List[str] = field(default_factory=list)
-    key_news_opportunities: List[str] = field(default_factory=list)
+    key_news_risks: Tuple[str, ...] = ()
+    key_news_opportunities: Tuple[str, ...] = ()
     news_analysis_report: Optional[NewsAnalysisReport] = None
     
     # Overall Research Summary
     overall_bullish_count: int = 0
     overall_bearish_count: int = 0
     overall_neutral_count: int = 0
-    key_findings: List[str] = field(default_factory=list)
-    major_risks: List[str] = field(default_factory=list)
+    key_findings: Tuple[str, ...] = ()
+    major_risks: Tuple[str, ...] = ()
+
+
+@dataclass
+class AnalystReportBatch:
+    """Research reports for several tickers, with master scoring inputs stored column-wise"""
+    tickers: List[str]
+    reports: List[AnalystReport]
+    columns: Dict[str, np.ndarray] = field(default_factory=dict)
+    
+    @classmethod
+    def from_reports(cls, datas: List[EnhancedStockData],
+                     reports: List[AnalystReport]) -> "AnalystReportBatch":
+        """Pack one float64 column per scoring feature (NaN where missing)"""
+        columns = {name: np.array([_num(get(d, r)) for d, r in zip(datas, reports)], dtype=np.float64)
+                   for name, get in _FEATURES.items()}
+        return cls([d.ticker for d in datas], reports, columns)
+    
+    def feature_matrix(self, names) -> np.ndarray:
+        """Tickers x named features, C-contiguous for the scoring kernels"""
+        return np.column_stack([self.columns[name] for name in names])
 
 
 class DataAnalystTeam:
     """Tier 1: Research Team - 6 Enhanced Analysts (including News)"""
     
-    def __init__(self):
-        self.analysts = {
-            'earnings': EarningsAgent(),
-            'wall_street': AnalystConsensusAgent(),
-            'macro': MacroAgent(),
-            'dividend': DividendAgent(),
-            'financial_health': FinancialHealthAgent(),
-            'news': NewsAnalyst()  # NEW: News & External Factors Analyst
-        }
+    REPORT_CACHE_TTL = 3600  # seconds
+    REPORT_CACHE_SIZE = 256
     
-    def generate_research_report(self, data: EnhancedStockData) -> AnalystReport:
-        """Generate comprehensive research report"""
+    _shared_analysts = None
+    _shared_lock = threading.Lock()
+    
+    def __init__(self, use_cache: bool = True):
+        self.analysts = self.shared_analysts()
+        self.news_analyst = dict(self.analysts)['news']
+        self.analyst_names = frozenset(name for name, _ in self.analysts)
+        # Reports memoized by data content; use_cache=False (e.g. backtests) also
+        # bypasses the shared news analyst's same-day report cache
+        self.use_cache = use_cache
+        self._report_cache: "OrderedDict[Tuple, Tuple[float, AnalystReport]]" = OrderedDict()
+        self._report_lock = threading.Lock()
+    
+    @classmethod
+    def shared_analysts(cls):
+        """Process-wide (name, analyst) pairs in report order, built on first use.
+        
+        Analysts keep no per-request state (the news analyst's caches are lock-guarded),
+        so every team shares them instead of reloading keyword automata and models.
+        """
+        with cls._shared_lock:
+            if cls._shared_analysts is None:
+                cls._shared_analysts = (
+                    ('earnings', EarningsAgent()),
+                    ('wall_street', AnalystConsensusAgent()),
+                    ('macro', MacroAgent()),
+                    ('dividend', DividendAgent()),
+                    ('financial_health', FinancialHealthAgent()),
+                    ('news', NewsAnalyst()),  # NEW: News & External Factors Analyst
+                )
+            return cls._shared_analysts
+    
+    def close(self):
+        """Kept for compatibility; analysts run on the shared _POOL, shut down at exit"""
+    
+    def generate_research_report(self, data: EnhancedStockData,
+                                 on_ready: Optional[Callable[[AnalystReport, FrozenSet[str]], None]] = None
+                                 ) -> AnalystReport:
+        """Generate comprehensive research report
+        
+        ``on_ready`` is called with the partial report and the names of the analysts
+        compiled so far each time more analysts finish, so dependents can start early.
+        """
+        # Same data (every field, nested ones included) means the same report; a
+        # SHA-256 of the repr keeps the key small without risking hash() collisions
+        key = ((data.ticker, hashlib.sha256(repr(data).encode()).digest())
+               if self.use_cache else None)
+        if key is not None:
+            now = time.time()
+            with self._report_lock:
+                entry = self._report_cache.get(key)
+                cached = entry[1] if entry and now - entry[0] < self.REPORT_CACHE_TTL else None
+                if cached is not None:
+                    self._report_cache.move_to_end(key)
+            if cached is not None:
+                # A copy per caller, so editing a returned report can't change later hits
+                cached = replace(cached)
+                if on_ready is not None:
+                    on_ready(cached, self.analyst_names)
+                return cached
+        
         report = AnalystReport()
+        self._compile_data_fields(report, data)
+        
+        # Run all analysts concurrently and compile each section as it lands;
+        # the news analyst also hands back the report it scored, honouring use_cache
+        pending = {}
+        for name, agent in self.analysts:
+            if agent is self.news_analyst:
+                future = _POOL.submit(agent.analyze_with_report, data, self.use_cache)
+            else:
+                future = _POOL.submit(agent.analyze_enhanced, data)
+            pending[future] = name
+        results = {}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = pending.pop(future)
+                result = future.result()
+                if name == 'news':
+                    result, report.news_analysis_report = result
+                results[name] = result
+                self._compile_section(report, name, result, data)
+            if on_ready is not None:
+                on_ready(report, frozenset(results))
+        
+        # Calculate overall sentiment (now includes news), in a fixed analyst order
+        signals = [results[name] for name, _ in self.analysts]
+        counts = Counter(s.signal for s in signals)
+        report.overall_bullish_count = counts["bullish"]
+        report.overall_bearish_count = counts["bearish"]
+        report.overall_neutral_count = counts["neutral"]
         
-        # Run all analysts
-        earnings_signal = self.analysts['earnings'].analyze_enhanced(data)
-        wall_street_signal = self.analysts['wall_street'].analyze_enhanced(data)
-        macro_signal = self.analysts['macro'].analyze_enhanced(data)
-        dividend_signal = self.analysts['dividend'].analyze_enhanced(data)
-        health_signal = self.analysts['financial_health'].analyze_enhanced(data)
-        news_signal = self.analysts['news'].analyze_enhanced(data)
-        
-        # Compile Earnings Analysis
-        report.earnings_signal = earnings_signal.signal
-        report.earnings_confidence = earnings_signal.confidence
+        # Extract key findings
+        report.key_findings = self._extract_key_findings(data, signals)
+        report.major_risks = self._extract_major_risks(data, signals)
+        
+        if key is not None:
+            with self._report_lock:
+                self._report_cache[key] = (now, replace(report))
+                self._report_cache.move_to_end(key)
+                while len(self._report_cache) > self.REPORT_CACHE_SIZE:
+                    self._report_cache.popitem(last=False)
+        return report
+    
+    def generate_research_report_batch(self, datas: List[EnhancedStockData]) -> AnalystReportBatch:
+        """Research reports for several tickers, packed for batched master scoring"""
+        reports = [self.generate_research_report(data) for data in datas]
+        return AnalystReportBatch.from_reports(datas, reports)
+    
+    def _compile_data_fields(self, report: AnalystReport, data: EnhancedStockData):
+        """Copy the report fields that come straight from the fetched data"""
         report.eps_surprise = data.earnings.surprise_pct
         report.beat_rate = data.earnings.beats_last_4q
-        report.earnings_summary = earnings_signal.reasoning
-        
-        # Compile Wall Street Analysis
-        report.wall_street_signal = wall_street_signal.signal
-        report.wall_street_confidence = wall_street_signal.confidence
         report.num_analysts = data.analyst.num_analysts
         report.consensus_rating = data.analyst.consensus_rating
         report.upside_potential = data.analyst.upside_pct
-        report.analyst_summary = wall_street_signal.reasoning
-        
-        # Compile Macro Analysis
-        report.macro_signal = macro_signal.signal
-        report.macro_confidence = macro_signal.confidence
         report.vix_level = data.macro.vix_level
         report.market_regime = data.macro.market_regime
-        report.macro_summary = macro_signal.reasoning
-        
-        # Compile Dividend Analysis
-        report.dividend_signal = dividend_signal.signal
-        report.dividend_confidence = dividend_signal.confidence
         report.dividend_yield = data.dividend.yield_pct
         report.payout_safety = data.dividend.payout_status
-        report.dividend_summary = dividend_signal.reasoning
-        
-        # Compile Financial Health
-        report.health_signal = health_signal.signal
-        report.health_confidence = health_signal.confidence
         report.health_score = data.financials.financial_health_score
         report.operating_margin = data.financials.operating_margin
         report.debt_to_equity = data.financials.debt_to_equity
         report.roe = data.financials.return_on_equity
         report.free_cash_flow = data.financials.free_cash_flow
-        report.health_summary = health_signal.reasoning
-        
-        # Compile News & External Factors Analysis (NEW)
-        report.news_signal = news_signal.signal
-        report.news_confidence = news_signal.confidence
-        if news_signal.key_metrics:
-            report.news_sentiment = news_signal.key_metrics.get('sentiment', 'neutral')
-            report.political_risk = news_signal.key_metrics.get('political_risk', 'low')
-            report.geopolitical_exposure = news_signal.key_metrics.get('geopolitical_exposure', 'low')
-            report.tech_disruption_risk = news_signal.key_metrics.get('tech_risk', 'low')
-            report.external_factors_count = news_signal.key_metrics.get('external_factors', 0)
-        report.news_summary = news_signal.reasoning
-        
-        # Generate full news analysis report
-        report.news_analysis_report = self.analysts['news'].generate_news_analysis(data.ticker, data)
-        if report.news_analysis_report:
-            report.key_news_risks = report.news_analysis_report.key_risks_from_news
-            report.key_news_opportunities = report.news_analysis_report.key_opportunities
-        
-        # Calculate overall sentiment (now includes news)
-        signals = [earnings_signal, wall_street_signal, macro_signal, 
-                   dividend_signal, health_signal, news_signal]
-        report.overall_bullish_count = sum(1 for s in signals if s.signal == "bullish")
-        report.overall_bearish_count = sum(1 for s in signals if s.signal == "bearish")
-        report.overall_neutral_count = sum(1 for s in signals if s.signal == "neutral")
-        
-        # Extract key findings
-        report.key_findings = self._extract_key_findings(data, signals)
-        report.major_risks = self._extract_major_risks(data, signals)
-        
-        return report
     
-    def _extract_key_findings(self, data: EnhancedStockData, signals: List[AgentSignal]) -> List[str]:
+    def _compile_section(self, report: AnalystReport, name: str, signal: AgentSignal,
+                         data: EnhancedStockData):
+        """Copy one analyst's findings into the report"""
+        if name == 'earnings':
+            report.earnings_signal = signal.signal
+            report.earnings_confidence = signal.confidence
+            report.earnings_summary = signal.reasoning
+        elif name == 'wall_street':
+            report.wall_street_signal = signal.signal
+            report.wall_street_confidence = signal.confidence
+            report.analyst_summary = signal.reasoning
+        elif name == 'macro':
+            report.macro_signal = signal.signal
+            report.macro_confidence = signal.confidence
+            report.macro_summary = signal.reasoning
+        elif name == 'dividend':
+            report.dividend_signal = signal.signal
+            report.dividend_confidence = signal.confidence
+            report.dividend_summary = signal.reasoning
+        elif name == 'financial_health':
+            report.health_signal = signal.signal
+            report.health_confidence = signal.confidence
+            report.health_summary = signal.reasoning
+        elif name == 'news':
+            report.news_signal = signal.signal
+            report.news_confidence = signal.confidence
+            if signal.key_metrics:
+                report.news_sentiment = signal.key_metrics.get('sentiment', 'neutral')
+                report.political_risk = signal.key_metrics.get('political_risk', 'low')
+                report.geopolitical_exposure = signal.key_metrics.get('geopolitical_exposure', 'low')
+                report.tech_disruption_risk = signal.key_metrics.get('tech_risk', 'low')
+                report.external_factors_count = signal.key_metrics.get('external_factors', 0)
+            report.news_summary = signal.reasoning
+            
+            # Full news analysis report, handed back alongside the signal
+            if report.news_analysis_report:
+                report.key_news_risks = report.news_analysis_report.key_risks_from_news
+                report.key_news_opportunities = report.news_analysis_report.key_opportunities
+    
+    def _extract_key_findings(self, data: EnhancedStockData, signals: List[AgentSignal]) -> Tuple[str, ...]:
         """Extract key positive findings"""
+        # (template, args) pairs; only the ones kept get formatted
         findings = []
+        earnings, analyst, fin = data.earnings, data.analyst, data.financials
         
         # Earnings findings
-        if data.earnings.surprise_pct and data.earnings.surprise_pct > 5:
-            findings.append(f"Strong earnings beat: +{data.earnings.surprise_pct:.1f}%")
-        if data.earnings.beats_last_4q >= 3:
-            findings.append(f"Consistent earnings performer: {data.earnings.beats_last_4q}/4 beats")
+        surprise = earnings.surprise_pct
+        if surprise and surprise > 5:
+            findings.append(("Strong earnings beat: +{:.1f}%", (surprise,)))
+        if earnings.beats_last_4q >= 3:
+            findings.append(("Consistent earnings performer: {}/4 beats", (earnings.beats_last_4q,)))
         
         # Analyst findings
-        if data.analyst.upside_pct and data.analyst.upside_pct > 20:
-            findings.append(f"Significant upside potential: +{data.analyst.upside_pct:.1f}%")
-        if data.analyst.consensus_rating in ['strong_buy', 'buy'] and data.analyst.num_analysts > 10:
-            findings.append(f"Strong analyst support: {data.analyst.num_analysts} analysts, {data.analyst.consensus_rating}")
+        upside = analyst.upside_pct
+        if upside and upside > 20:
+            findings.append(("Significant upside potential: +{:.1f}%", (upside,)))
+        if analyst.consensus_rating in ['strong_buy', 'buy'] and analyst.num_analysts > 10:
+            findings.append(("Strong analyst support: {} analysts, {}",
+                             (analyst.num_analysts, analyst.consensus_rating)))
         
         # Financial health findings
-        if data.financials.operating_margin and data.financials.operating_margin > 20:
-            findings.append(f"Excellent margins: {data.financials.operating_margin:.1f}% operating margin")
-        if data.financials.return_on_equity and data.financials.return_on_equity > 20:
-            findings.append(f"High ROE: {data.financials.return_on_equity:.1f}%")
-        if data.financials.free_cash_flow and data.financials.free_cash_flow > 1000:
-            findings.append(f"Strong cash generation: ${data.financials.free_cash_flow:,.0f}M FCF")
-        
-        return findings[:5]  # Top 5 findings
+        margin, roe, fcf = fin.operating_margin, fin.return_on_equity, fin.free_cash_flow
+        if margin and margin > 20:
+            findings.append(("Excellent margins: {:.1f}% operating margin", (margin,)))
+        if roe and roe > 20:
+            findings.append(("High ROE: {:.1f}%", (roe,)))
+        if fcf and fcf > 1000:
+            findings.append(("Strong cash generation: ${:,.0f}M FCF", (fcf,)))
+        
+        return tuple(template.format(*args) for template, args in findings[:5])  # Top 5 findings
     
-    def _extract_major_risks(self, data: EnhancedStockData, signals: List[AgentSignal]) -> List[str]:
+    def _extract_major_risks(self, data: EnhancedStockData, signals: List[AgentSignal]) -> Tuple[str, ...]:
         """Extract major risks from all analysts"""
         risks = []
         
         for signal in signals:
-            if signal.key_metrics and "risks" in signal.key_metrics:
-                risks.extend(signal.key_metrics["risks"])
+            if signal.key_metrics:
+                risks.extend(signal.key_metrics.get("risks", ()))
         
         # Add data-based risks
-        if data.financials.debt_to_equity and data.financials.debt_to_equity > 1.5:
-            risks.append(f"High debt burden (D/E {data.financials.debt_to_equity:.2f}x)")
-        if data.beta and data.beta > 1.5:
-            risks.append(f"High volatility (Beta {data.beta:.1f})")
-        if data.earnings.surprise_pct and data.earnings.surprise_pct < -10:
-            risks.append(f"Recent earnings miss ({data.earnings.surprise_pct:.1f}%)")
-        
-        return list(set(risks))[:5]  # Top 5 unique risks
+        d2e, beta, surprise = data.financials.debt_to_equity, data.beta, data.earnings.surprise_pct
+        if d2e and d2e > 1.5:
+            risks.append(f"High debt burden (D/E {d2e:.2f}x)")
+        if beta and beta > 1.5:
+            risks.append(f"High volatility (Beta {beta:.1f})")
+        if surprise and surprise < -10:
+            risks.append(f"Recent earnings miss ({surprise:.1f}%)")
+        
+        return tuple(dict.fromkeys(risks))[:5]  # Top 5 unique risks, in the order found
+
+
+# Tier 2 scoring kernels. Each takes a master's feature vector (columns named by its
+# FEATURES; missing metrics are NaN, so "x and x > t" becomes "x > t" and
+# "x and x < t" becomes "x != 0 and x < t"; flags are 0/1), marks the rules that
+# fired in ``hits`` and returns the clamped score. Reasoning text is rendered from
+# the matching REASONS entries.
+#
+# The explicit signature compiles (or loads from the on-disk cache) at import, so the
+# first analysis doesn't pay JIT latency. No fastmath: the NaN comparisons are relied on.
+_KERNEL_SIGNATURE = "int64(float64[::1], int8[::1])"
+
+@njit(_KERNEL_SIGNATURE, cache=True)
+def _buffett_kernel(x, hits):
+    health = x[0]
+    margin = x[1]
+    d2e = x[2]
+    roe = x[3]
+    ws_bullish = x[4]
+    ws_conf = x[5]
+    beat_rate = x[6]
+    bear = x[7]
+    vix = x[8]
+    news_bearish = x[9]
+    news_bullish = x[10]
+    political_high = x[11]
+    geo_high = x[12]
+    score = 50
+    if health >= 80:
+        score += 20
+        hits[0] = 1
+    elif health >= 60:
+        score += 10
+        hits[1] = 1
+    elif health < 40:
+        score -= 20
+        hits[2] = 1
+    if margin > 20:
+        score += 15
+        hits[3] = 1
+    if d2e != 0 and d2e < 0.5:
+        score += 10
+        hits[4] = 1
+    elif d2e > 1.5:
+        score -= 15
+        hits[5] = 1
+    if roe > 15:
+        score += 15
+        hits[6] = 1
+    if ws_bullish and ws_conf > 70:
+        score += 5  # Small boost, Buffett is independent
+        hits[7] = 1
+    if beat_rate >= 3:
+        score += 10
+        hits[8] = 1
+    if bear and vix > 30:
+        score += 10  # Opportunities in fear
+        hits[9] = 1
+    if news_bearish:
+        if political_high:
+            score -= 15
+            hits[10] = 1
+        elif geo_high:
+            score -= 10
+            hits[11] = 1
+    elif news_bullish:
+        score += 5
+        hits[12] = 1
+    return max(10, min(95, score))
+
+
+@njit(_KERNEL_SIGNATURE, cache=True)
+def _graham_kernel(x, hits):
+    health = x[0]
+    current_ratio = x[1]
+    d2e = x[2]
+    beat_rate = x[3]
+    dividend_bullish = x[4]
+    upside = x[5]
+    score = 50
+    if health >= 70:
+        score += 15
+        hits[0] = 1
+    elif health < 40:
+        score -= 25
+        hits[1] = 1
+    if current_ratio > 2:
+        score += 15
+        hits[2] = 1
+    elif current_ratio != 0 and current_ratio < 1:
+        score -= 20
+        hits[3] = 1
+    if d2e > 1.0:
+        score -= 20
+        hits[4] = 1
+    elif d2e != 0 and d2e < 0.3:
+        score += 10
+        hits[5] = 1
+    if beat_rate >= 3:
+        score += 10
+        hits[6] = 1
+    elif beat_rate <= 1:
+        score -= 10
+        hits[7] = 1
+    if dividend_bullish:
+        score += 10
+        hits[8] = 1
+    if upside > 30:
+        score += 10
+        hits[9] = 1
+    return max(10, min(95, score))
 
 
-class WarrenBuffettWithResearch(InvestmentAgent):
+@njit(_KERNEL_SIGNATURE, cache=True)
+def _technical_kernel(x, hits):
+    price = x[0]
+    avg50 = x[1]
+    avg200 = x[2]
+    ws_bullish = x[3]
+    earnings_bullish = x[4]
+    volume = x[5]
+    avg_volume = x[6]
+    score = 50
+    if price != 0 and avg50 != 0 and price > avg50:
+        score += 15
+        hits[0] = 1
+    if price != 0 and avg200 != 0 and price > avg200:
+        score += 15
+        hits[1] = 1
+    if avg50 != 0 and avg200 != 0 and avg50 > avg200:
+        score += 10
+        hits[2] = 1
+    if ws_bullish:
+        score += 10
+        hits[3] = 1
+    if earnings_bullish:
+        score += 15
+        hits[4] = 1
+    if volume != 0 and avg_volume != 0 and volume > avg_volume * 1.5:
+        score += 5
+        hits[5] = 1
+    return max(10, min(95, score))
+
+
+@njit(_KERNEL_SIGNATURE, cache=True)
+def _risk_kernel(x, hits):
+    health = x[0]
+    d2e = x[1]
+    beta = x[2]
+    beat_rate = x[3]
+    num_analysts = x[4]
+    ws_conf = x[5]
+    bear = x[6]
+    news_bearish = x[7]
+    political_high = x[8]
+    geo_high = x[9]
+    tech_high = x[10]
+    score = 50
+    if health < 50:
+        score -= 20
+        hits[0] = 1
+    elif health >= 80:
+        score += 15
+        hits[1] = 1
+    if d2e > 1.5:
+        score -= 20
+        hits[2] = 1
+    elif d2e != 0 and d2e < 0.5:
+        score += 10
+        hits[3] = 1
+    if beta > 1.5:
+        score -= 15
+        hits[4] = 1
+    elif beta != 0 and beta < 0.8:
+        score += 10
+        hits[5] = 1
+    if beat_rate <= 1:
+        score -= 15
+        hits[6] = 1
+    elif beat_rate >= 3:
+        score += 10
+        hits[7] = 1
+    if num_analysts > 0 and ws_conf < 50:
+        score -= 10
+        hits[8] = 1
+    if bear:
+        score -= 10
+        hits[9] = 1
+    if news_bearish:
+        score -= 15
+        hits[10] = 1
+    if political_high:
+        score -= 15
+        hits[11] = 1
+    if geo_high:
+        score -= 10
+        hits[12] = 1
+    if tech_high:
+        score -= 10
+        hits[13] = 1
+    return max(10, min(95, score))
+
+
+@njit(_KERNEL_SIGNATURE, cache=True)
+def _cathie_kernel(x, hits):
+    innovation = x[0]
+    rd_ratio = x[1]
+    revenue_growth = x[2]
+    earnings_growth = x[3]
+    innovation_sector = x[4]
+    ws_bullish = x[5]
+    tech_high = x[6]
+    tech_sector = x[7]
+    news_opportunity = x[8]
+    score = 50
+    if innovation >= 70:
+        score += 25
+        hits[0] = 1
+    elif innovation >= 50:
+        score += 15
+        hits[1] = 1
+    elif innovation < 30:
+        score -= 15
+        hits[2] = 1
+    if rd_ratio > 15:
+        score += 20
+        hits[3] = 1
+    elif rd_ratio > 8:
+        score += 10
+        hits[4] = 1
+    if revenue_growth > 20:
+        score += 15
+        hits[5] = 1
+    elif revenue_growth < 0:
+        score -= 10
+        hits[6] = 1
+    if earnings_growth > 25:
+        score += 10
+        hits[7] = 1
+    if innovation_sector:
+        score += 15
+        hits[8] = 1
+    else:
+        score -= 10
+        hits[9] = 1
+    if ws_bullish:
+        score += 10
+        hits[10] = 1
+    if tech_high:
+        # High tech disruption can be good (disruptor) or bad (disrupted)
+        if tech_sector:
+            score += 10
+            hits[11] = 1
+        else:
+            score -= 15
+            hits[12] = 1
+    if news_opportunity:
+        score += 10
+        hits[13] = 1
+    return max(10, min(95, score))
+
+
+@njit(cache=True)
+def _score_rows(kernel, features, n_rules):
+    """Run a scoring kernel over each row of a feature matrix"""
+    scores = np.empty(features.shape[0], dtype=np.int64)
+    hits = np.zeros(n_rules, dtype=np.int8)
+    for i in range(features.shape[0]):
+        hits[:] = 0
+        scores[i] = kernel(features[i], hits)
+    return scores
+
+
+_INNOVATION_SECTORS = ('Technology', 'Healthcare', 'Biotechnology', 'Communications')
+_TECH_SECTORS = ('Technology', 'Communications')
+
+# Kernel feature columns, derived from (data, report)
+_FEATURES = {
+    'health_score': lambda d, r: r.health_score,
+    'operating_margin': lambda d, r: r.operating_margin,
+    'debt_to_equity': lambda d, r: r.debt_to_equity,
+    'roe': lambda d, r: r.roe,
+    'beat_rate': lambda d, r: r.beat_rate,
+    'num_analysts': lambda d, r: r.num_analysts,
+    'upside_potential': lambda d, r: r.upside_potential,
+    'vix_level': lambda d, r: r.vix_level,
+    'ws_bullish': lambda d, r: r.wall_street_signal == "bullish",
+    'ws_confidence': lambda d, r: r.wall_street_confidence,
+    'earnings_bullish': lambda d, r: r.earnings_signal == "bullish",
+    'dividend_bullish': lambda d, r: r.dividend_signal == "bullish",
+    'bear_market': lambda d, r: r.market_regime == "bear",
+    'news_bearish': lambda d, r: r.news_signal == "bearish",
+    'news_bullish': lambda d, r: r.news_signal == "bullish",
+    'news_opportunity': lambda d, r: r.news_signal == "bullish" and bool(r.key_news_opportunities),
+    'political_high': lambda d, r: r.political_risk == "high",
+    'geo_high': lambda d, r: r.geopolitical_exposure == "high",
+    'tech_high': lambda d, r: r.tech_disruption_risk == "high",
+    'price': lambda d, r: d.current_price,
+    'avg_50': lambda d, r: d.avg_50,
+    'avg_200': lambda d, r: d.avg_200,
+    'volume': lambda d, r: d.volume,
+    'avg_volume': lambda d, r: d.avg_volume,
+    'beta': lambda d, r: d.beta,
+    'current_ratio': lambda d, r: d.financials.current_ratio,
+    'innovation_score': lambda d, r: d.financials.innovation_score,
+    'rd_to_revenue': lambda d, r: d.financials.rd_to_revenue,
+    'revenue_growth': lambda d, r: d.financials.revenue_growth_yoy,
+    'earnings_growth': lambda d, r: d.financials.earnings_growth_yoy,
+    'innovation_sector': lambda d, r: d.sector in _INNOVATION_SECTORS,
+    'tech_sector': lambda d, r: d.sector in _TECH_SECTORS,
+}
+
+
+def _num(value) -> float:
+    """Kernel input for an optional metric (None becomes NaN)"""
+    return np.nan if value is None else float(value)
+
+
+# Score -> signal step function: <=35 bearish, 36-64 neutral, >=65 bullish
+_SIGNAL_EDGES = (36, 65)
+_SIGNAL_LABELS = ("bearish", "neutral", "bullish")
+
+
+def _signal_for(score: int) -> str:
+    """Map a clamped 10-95 score to a signal"""
+    return _SIGNAL_LABELS[bisect_right(_SIGNAL_EDGES, score)]
+
+
+def _signal_index(scores: np.ndarray) -> np.ndarray:
+    """Vectorized _signal_for, as indices into _SIGNAL_LABELS"""
+    return np.searchsorted(_SIGNAL_EDGES, scores, side="right")
+
+
+def _render_reasons(templates, hits, values: Dict) -> List[str]:
+    """Reasoning lines for the rules that fired, in rule order"""
+    return [template.format(**values) for template, hit in zip(templates, hits) if hit]
+
+
+class ResearchInformedMaster(InvestmentAgent):
+    """Tier 2 master scored by a compiled kernel over research-derived features.
+    
+    analyze_with_report only renders reasoning text when ``detailed`` is set; callers
+    that just aggregate signals and confidences skip it.
+    """
+    
+    KERNEL = None
+    FEATURES: tuple = ()
+    REASONS: tuple = ()
+    
+    def _score(self, data: EnhancedStockData, report: AnalystReport):
+        """Kernel score and fired-rule flags for one ticker"""
+        features = np.array([_num(_FEATURES[name](data, report)) for name in self.FEATURES])
+        hits = np.zeros(len(self.REASONS), dtype=np.int8)
+        return self.KERNEL(features, hits), hits
+    
+    def _confidence(self, score):
+        """Confidence reported for a score (works on arrays too)"""
+        return score
+    
+    def analyze_batch(self, batch: "AnalystReportBatch"):
+        """Signal indices (into bearish/neutral/bullish) and confidences for every ticker"""
+        scores = _score_rows(self.KERNEL, batch.feature_matrix(self.FEATURES), len(self.REASONS))
+        return _signal_index(scores), self._confidence(scores)
+
+
+class WarrenBuffettWithResearch(ResearchInformedMaster):
     """Warren Buffett with access to analyst research reports"""
     
+    # Analyst sections read by analyze_with_report
+    needs = frozenset({'wall_street', 'news'})
+    
+    KERNEL = staticmethod(_buffett_kernel)
+    FEATURES = ('health_score', 'operating_margin', 'debt_to_equity', 'roe', 'ws_bullish',
+                'ws_confidence', 'beat_rate', 'bear_market', 'vix_level', 'news_bearish',
+                'news_bullish', 'political_high', 'geo_high')
+    REASONS = (
+        "Excellent financial health ({health}/100)",
+        "Good financial health ({health}/100)",
+        "Poor financial health ({health}/100)",
+        "Wide moat indicated by {margin:.1f}% margins",
+        "Conservative debt levels",
+        "High debt concerns ({d2e:.2f}x)",
+        "Strong ROE of {roe:.1f}%",
+        "Analysts agree, but I do my own analysis",
+        "Reliable earnings: {beat_rate}/4 beats",
+        "Market fear may create opportunity",
+        "High political/regulatory risk from news",
+        "Geopolitical concerns",
+        "Positive news sentiment",
+    )
+    
     def __init__(self):
         super().__init__(
             "Warren Buffett (Research-Informed)",
             "Value investing informed by comprehensive analyst research."
         )
     
-    def analyze_with_report(self, data: EnhancedStockData, report: AnalystReport) -> AgentSignal:
+    def analyze_with_report(self, data: EnhancedStockData, report: AnalystReport,
+                            detailed: bool = True) -> AgentSignal:
         """Analyze based on both raw data and analyst research"""
-        score = 50
-        reasoning_parts = []
-        
-        # Consider Financial Health Analyst findings
-        if report.health_score >= 80:
-            score += 20
-            reasoning_parts.append(f"Excellent financial health ({report.health_score}/100)")
-        elif report.health_score >= 60:
-            score += 10
-            reasoning_parts.append(f"Good financial health ({report.health_score}/100)")
-        elif report.health_score < 40:
-            score -= 20
-            reasoning_parts.append(f"Poor financial health ({report.health_score}/100)")
-        
-        # Consider margins from research
-        if report.operating_margin and report.operating_margin > 20:
-            score += 15
-            reasoning_parts.append(f"Wide moat indicated by {report.operating_margin:.1f}% margins")
-        
-        # Consider debt analysis
-        if report.debt_to_equity and report.debt_to_equity < 0.5:
-            score += 10
-            reasoning_parts.append("Conservative debt levels")
-        elif report.debt_to_equity and report.debt_to_equity > 1.5:
-            score -= 15
-            reasoning_parts.append(f"High debt concerns ({report.debt_to_equity:.2f}x)")
-        
-        # Consider ROE
-        if report.roe and report.roe > 15:
-            score += 15
-            reasoning_parts.append(f"Strong ROE of {report.roe:.1f}%")
-        
-        # Consider Wall Street consensus (but with skepticism)
-        if report.wall_street_signal == "bullish" and report.wall_street_confidence > 70:
-            score += 5  # Small boost, Buffett is independent
-            reasoning_parts.append("Analysts agree, but I do my own analysis")
-        
-        # Consider earnings quality
-        if report.beat_rate >= 3:
-            score += 10
-            reasoning_parts.append(f"Reliable earnings: {report.beat_rate}/4 beats")
-        
-        # Consider macro (market timing not important for Buffett, but extremes matter)
-        if report.market_regime == "bear" and report.vix_level and report.vix_level > 30:
-            score += 10  # Opportunities in fear
-            reasoning_parts.append("Market fear may create opportunity")
-        
-        # Consider News & External Factors (NEW)
-        if report.news_signal == "bearish":
-            if report.political_risk == "high":
-                score -= 15
-                reasoning_parts.append("High political/regulatory risk from news")
-            elif report.geopolitical_exposure == "high":
-                score -= 10
-                reasoning_parts.append("Geopolitical concerns")
-        elif report.news_signal == "bullish":
-            score += 5
-            reasoning_parts.append("Positive news sentiment")
-        
-        # Clamp and determine signal
-        score = max(10, min(95, score))
-        
-        if score >= 65:
-            signal = "bullish"
-        elif score <= 35:
-            signal = "bearish"
-        else:
-            signal = "neutral"
+        health = report.health_score
+        margin = report.operating_margin
+        d2e = report.debt_to_equity
+        roe = report.roe
+        
+        score, hits = self._score(data, report)
+        reasoning = ""
+        if detailed:
+            reasoning_parts = _render_reasons(self.REASONS, hits, {
+                "health": health, "margin": margin, "d2e": d2e, "roe": roe, "beat_rate": report.beat_rate})
+            reasoning = "; ".join(reasoning_parts) if reasoning_parts else "Awaiting clearer signals"
         
         return AgentSignal(
             agent_name=self.name,
-            signal=signal,
+            signal=_signal_for(score),
             confidence=score,
-            reasoning="; ".join(reasoning_parts) if reasoning_parts else "Awaiting clearer signals",
+            reasoning=reasoning,
             key_metrics={
-                "health_score": report.health_score,
-                "operating_margin": report.operating_margin,
-                "roe": report.roe,
-                "debt_to_equity": report.debt_to_equity
+                "health_score": health,
+                "operating_margin": margin,
+                "roe": roe,
+                "debt_to_equity": d2e
             }
         )
 
 
-class BenGrahamWithResearch(InvestmentAgent):
+class BenGrahamWithResearch(ResearchInformedMaster):
     """Ben Graham with access to analyst research"""
     
+    # Analyst sections read by analyze_with_report
+    needs = frozenset({'dividend'})
+    
+    KERNEL = staticmethod(_graham_kernel)
+    FEATURES = ('health_score', 'current_ratio', 'debt_to_equity', 'beat_rate',
+                'dividend_bullish', 'upside_potential')
+    REASONS = (
+        "Strong financial position",
+        "Financial instability - avoid",
+        "Excellent liquidity (current ratio > 2)",
+        "Liquidity concerns",
+        "Excessive leverage: {d2e:.2f}x",
+        "Conservative capital structure",
+        "Predictable earnings history",
+        "Erratic earnings",
+        "Reliable dividend income",
+        "Potential margin of safety (+{upside:.1f}% upside)",
+    )
+    
     def __init__(self):
         super().__init__(
             "Ben Graham (Research-Informed)",
             "Deep value investing with quantitative research support."
         )
     
-    def analyze_with_report(self, data: EnhancedStockData, report: AnalystReport) -> AgentSignal:
+    def analyze_with_report(self, data: EnhancedStockData, report: AnalystReport,
+                            detailed: bool = True) -> AgentSignal:
         """Graham analysis informed by research"""
-        score = 50
-        reasoning_parts = []
-        
-        # Financial health is critical for Graham
-        if report.health_score >= 70:
-            score += 15
-            reasoning_parts.append("Strong financial position")
-        elif report.health_score < 40:
-            score -= 25
-            reasoning_parts.append("Financial instability - avoid")
-        
-        # Current ratio check
-        if data.financials.current_ratio and data.financials.current_ratio > 2:
-            score += 15
-            reasoning_parts.append("Excellent liquidity (current ratio > 2)")
-        elif data.financials.current_ratio and data.financials.current_ratio < 1:
-            score -= 20
-            reasoning_parts.append("Liquidity concerns")
-        
-        # Debt levels
-        if report.debt_to_equity and report.debt_to_equity > 1.0:
-            score -= 20
-            reasoning_parts.append(f"Excessive leverage: {report.debt_to_equity:.2f}x")
-        elif report.debt_to_equity and report.debt_to_equity < 0.3:
-            score += 10
-            reasoning_parts.append("Conservative capital structure")
+        health = report.health_score
+        d2e = report.debt_to_equity
+        upside = report.upside_potential
+        current_ratio = data.financials.current_ratio
         
-        # Consistent earnings important for Graham
-        if report.beat_rate >= 3:
-            score += 10
-            reasoning_parts.append("Predictable earnings history")
-        elif report.beat_rate <= 1:
-            score -= 10
-            reasoning_parts.append("Erratic earnings")
-        
-        # Dividend safety (Graham liked dividends)
-        if report.dividend_signal == "bullish":
-            score += 10
-            reasoning_parts.append("Reliable dividend income")
-        
-        # Margin of safety - analyst upside helps
-        if report.upside_potential and report.upside_potential > 30:
-            score += 10
-            reasoning_parts.append(f"Potential margin of safety (+{report.upside_potential:.1f}% upside)")
-        
-        score = max(10, min(95, score))
-        
-        if score >= 65:
-            signal = "bullish"
-        elif score <= 35:
-            signal = "bearish"
-        else:
-            signal = "neutral"
+        score, hits = self._score(data, report)
+        reasoning = ""
+        if detailed:
+            reasoning_parts = _render_reasons(self.REASONS, hits, {"d2e": d2e, "upside": upside})
+            reasoning = "; ".join(reasoning_parts) if reasoning_parts else "No clear value opportunity"
         
         return AgentSignal(
             agent_name=self.name,
-            signal=signal,
+            signal=_signal_for(score),
             confidence=score,
-            reasoning="; ".join(reasoning_parts) if reasoning_parts else "No clear value opportunity",
+            reasoning=reasoning,
             key_metrics={
-                "health_score": report.health_score,
-                "current_ratio": data.financials.current_ratio,
-                "debt_to_equity": report.debt_to_equity
+                "health_score": health,
+                "current_ratio": current_ratio,
+                "debt_to_equity": d2e
             }
         )
 
 
-class TechnicalAnalystWithResearch(InvestmentAgent):
+class TechnicalAnalystWithResearch(ResearchInformedMaster):
     """Technical Analyst with research context"""
     
+    # Analyst sections read by analyze_with_report
+    needs = frozenset({'wall_street', 'earnings'})
+    
+    KERNEL = staticmethod(_technical_kernel)
+    FEATURES = ('price', 'avg_50', 'avg_200', 'ws_bullish', 'earnings_bullish',
+                'volume', 'avg_volume')
+    REASONS = (
+        "Price above 50-day MA",
+        "Price above 200-day MA",
+        "Golden cross pattern",
+        "Wall Street bullish - fundamental support",
+        "Strong earnings momentum",
+        "Above-average volume",
+    )
+    
     def __init__(self):
         super().__init__(
             "Technical Analyst (Research-Informed)",
             "Technical analysis combined with fundamental research insights."
         )
     
-    def analyze_with_report(self, data: EnhancedStockData, report: AnalystReport) -> AgentSignal:
+    def analyze_with_report(self, data: EnhancedStockData, report: AnalystReport,
+                            detailed: bool = True) -> AgentSignal:
         """Technical analysis with fundamental confirmation"""
-        score = 50
-        reasoning_parts = []
-        
         price = data.current_price
-        avg50 = data.avg_50
         avg200 = data.avg_200
         
-        # Trend analysis (original)
-        if price and avg50 and price > avg50:
-            score += 15
-            reasoning_parts.append("Price above 50-day MA")
-        
-        if price and avg200 and price > avg200:
-            score += 15
-            reasoning_parts.append("Price above 200-day MA")
-        
-        # Golden cross
-        if avg50 and avg200 and avg50 > avg200:
-            score += 10
-            reasoning_parts.append("Golden cross pattern")
-        
-        # Fundamental confirmation from research
-        if report.wall_street_signal == "bullish":
-            score += 10
-            reasoning_parts.append("Wall Street bullish - fundamental support")
-        
-        if report.earnings_signal == "bullish":
-            score += 15
-            reasoning_parts.append("Strong earnings momentum")
-        
-        # Volume confirmation (if data available)
-        if data.volume and data.avg_volume and data.volume > data.avg_volume * 1.5:
-            score += 5
-            reasoning_parts.append("Above-average volume")
-        
-        score = max(10, min(95, score))
-        
-        if score >= 65:
-            signal = "bullish"
-        elif score <= 35:
-            signal = "bearish"
-        else:
-            signal = "neutral"
+        score, hits = self._score(data, report)
+        reasoning = ""
+        if detailed:
+            reasoning_parts = _render_reasons(self.REASONS, hits, {})
+            reasoning = "; ".join(reasoning_parts) if reasoning_parts else "Mixed technical signals"
         
         return AgentSignal(
             agent_name=self.name,
-            signal=signal,
+            signal=_signal_for(score),
             confidence=score,
-            reasoning="; ".join(reasoning_parts) if reasoning_parts else "Mixed technical signals",
+            reasoning=reasoning,
             key_metrics={"price_vs_200ma": price > avg200 if price and avg200 else None}
         )
 
 
-class RiskManagerWithResearch(InvestmentAgent):
+class RiskManagerWithResearch(ResearchInformedMaster):
     """Risk Manager with comprehensive research"""
     
+    # Analyst sections read by analyze_with_report
+    needs = frozenset({'wall_street', 'news'})
+    
+    KERNEL = staticmethod(_risk_kernel)
+    FEATURES = ('health_score', 'debt_to_equity', 'beta', 'beat_rate', 'num_analysts',
+                'ws_confidence', 'bear_market', 'news_bearish', 'political_high',
+                'geo_high', 'tech_high')
+    # None marks the slot filled with the top news-derived risks
+    REASONS = (
+        "Poor financial health ({health}/100)",
+        "Strong financial health",
+        "High debt burden (D/E {d2e:.2f}x)",
+        "Low debt risk",
+        "High volatility (Beta {beta:.1f})",
+        "Low volatility/defensive",
+        "Unreliable earnings history",
+        "Consistent earnings performer",
+        "Analyst disagreement",
+        "Bear market environment",
+        None,
+        "High political/regulatory risk",
+        "Geopolitical exposure risk",
+        "Technology disruption threat",
+    )
+    
     def __init__(self):
         super().__init__(
             "Risk Manager (Research-Informed)",
             "Risk assessment using all available research data."
         )
     
-    def analyze_with_report(self, data: EnhancedStockData, report: AnalystReport) -> AgentSignal:
+    def _confidence(self, score):
+        """Distance from neutral: confident either way"""
+        return abs(score - 50) + 50
+    
+    def analyze_with_report(self, data: EnhancedStockData, report: AnalystReport,
+                            detailed: bool = True) -> AgentSignal:
         """Comprehensive risk assessment"""
-        score = 50
-        risks = []
-        
-        # Financial health risk
-        if report.health_score < 50:
-            score -= 20
-            risks.append(f"Poor financial health ({report.health_score}/100)")
-        elif report.health_score >= 80:
-            score += 15
-            risks.append("Strong financial health")
-        
-        # Debt risk
-        if report.debt_to_equity and report.debt_to_equity > 1.5:
-            score -= 20
-            risks.append(f"High debt burden (D/E {report.debt_to_equity:.2f}x)")
-        elif report.debt_to_equity and report.debt_to_equity < 0.5:
-            score += 10
-            risks.append("Low debt risk")
-        
-        # Volatility risk
-        if data.beta and data.beta > 1.5:
-            score -= 15
-            risks.append(f"High volatility (Beta {data.beta:.1f})")
-        elif data.beta and data.beta < 0.8:
-            score += 10
-            risks.append("Low volatility/defensive")
-        
-        # Earnings risk
-        if report.beat_rate <= 1:
-            score -= 15
-            risks.append("Unreliable earnings history")
-        elif report.beat_rate >= 3:
-            score += 10
-            risks.append("Consistent earnings performer")
-        
-        # Analyst divergence risk
-        if report.num_analysts > 0 and report.wall_street_confidence < 50:
-            score -= 10
-            risks.append("Analyst disagreement")
+        health = report.health_score
+        d2e = report.debt_to_equity
+        beta = data.beta
         
-        # Macro risk
-        if report.market_regime == "bear":
-            score -= 10
-            risks.append("Bear market environment")
+        score, hits = self._score(data, report)
         
-        # News & External Risk (NEW)
-        if report.news_signal == "bearish":
-            score -= 15
-            if report.key_news_risks:
+        # key_metrics always carries the risk list; only the reasoning text is optional
+        risks = []
+        values = {"health": health, "d2e": d2e, "beta": beta}
+        for template, hit in zip(self.REASONS, hits):
+            if not hit:
+                continue
+            if template is None:
                 risks.extend(report.key_news_risks[:2])
-        
-        if report.political_risk == "high":
-            score -= 15
-            risks.append("High political/regulatory risk")
-        
-        if report.geopolitical_exposure == "high":
-            score -= 10
-            risks.append("Geopolitical exposure risk")
-        
-        if report.tech_disruption_risk == "high":
-            score -= 10
-            risks.append("Technology disruption threat")
-        
-        score = max(10, min(95, score))
-        
-        if score >= 65:
-            signal = "bullish"  # Low risk
-        elif score <= 35:
-            signal = "bearish"  # High risk
-        else:
-            signal = "neutral"
+            else:
+                risks.append(template.format(**values))
         
         return AgentSignal(
             agent_name=self.name,
-            signal=signal,
-            confidence=abs(score - 50) + 50,
-            reasoning=f"Risk assessment: {', '.join(risks)}",
+            signal=_signal_for(score),  # bullish = low risk, bearish = high risk
+            confidence=self._confidence(score),
+            reasoning=f"Risk assessment: {', '.join(risks)}" if detailed else "",
             key_metrics={
-                "health_score": report.health_score,
-                "beta": data.beta,
-                "debt_to_equity": report.debt_to_equity,
+                "health_score": health,
+                "beta": beta,
+                "debt_to_equity": d2e,
                 "risks": risks
             }
         )
 
 
-class CathieWoodWithResearch(InvestmentAgent):
+class CathieWoodWithResearch(ResearchInformedMaster):
     """Cathie Wood with research insights"""
     
+    # Analyst sections read by analyze_with_report
+    needs = frozenset({'wall_street', 'news'})
+    
+    KERNEL = staticmethod(_cathie_kernel)
+    FEATURES = ('innovation_score', 'rd_to_revenue', 'revenue_growth', 'earnings_growth',
+                'innovation_sector', 'ws_bullish', 'tech_high', 'tech_sector',
+                'news_opportunity')
+    REASONS = (
+        "High innovation investment ({innovation_score}/100)",
+        "Moderate innovation focus ({innovation_score}/100)",
+        "Limited innovation investment",
+        "Heavy R&D: {rd_ratio:.1f}% of revenue",
+        "Strong R&D: {rd_ratio:.1f}%",
+        "Rapid growth: {revenue_growth:.1f}%",
+        "Revenue decline",
+        "Explosive earnings growth",
+        "Innovation sector: {sector}",
+        "Traditional sector: {sector}",
+        "Institutional support",
+        "Tech disruption opportunity",
+        "Risk of being disrupted",
+        "News indicates innovation opportunities",
+    )
+    
     def __init__(self):
         super().__init__(
             "Cathie Wood (Research-Informed)",
             "Disruptive innovation investing with data-driven insights."
         )
     
-    def analyze_with_report(self, data: EnhancedStockData, report: AnalystReport) -> AgentSignal:
+    def analyze_with_report(self, data: EnhancedStockData, report: AnalystReport,
+                            detailed: bool = True) -> AgentSignal:
         """Innovation-focused analysis"""
-        score = 50
-        reasoning_parts = []
-        
-        # Innovation score from research
-        innovation_score = data.financials.innovation_score
-        if innovation_score >= 70:
-            score += 25
-            reasoning_parts.append(f"High innovation investment ({innovation_score}/100)")
-        elif innovation_score >= 50:
-            score += 15
-            reasoning_parts.append(f"Moderate innovation focus ({innovation_score}/100)")
-        elif innovation_score < 30:
-            score -= 15
-            reasoning_parts.append("Limited innovation investment")
-        
-        # R&D intensity
-        rd_ratio = data.financials.rd_to_revenue
-        if rd_ratio and rd_ratio > 15:
-            score += 20
-            reasoning_parts.append(f"Heavy R&D: {rd_ratio:.1f}% of revenue")
-        elif rd_ratio and rd_ratio > 8:
-            score += 10
-            reasoning_parts.append(f"Strong R&D: {rd_ratio:.1f}%")
-        
-        # Growth metrics
-        if data.financials.revenue_growth_yoy and data.financials.revenue_growth_yoy > 20:
-            score += 15
-            reasoning_parts.append(f"Rapid growth: {data.financials.revenue_growth_yoy:.1f}%")
-        elif data.financials.revenue_growth_yoy and data.financials.revenue_growth_yoy < 0:
-            score -= 10
-            reasoning_parts.append("Revenue decline")
-        
-        # Earnings growth
-        if data.financials.earnings_growth_yoy and data.financials.earnings_growth_yoy > 25:
-            score += 10
-            reasoning_parts.append("Explosive earnings growth")
-        
-        # Sector preference
-        if data.sector in ['Technology', 'Healthcare', 'Biotechnology', 'Communications']:
-            score += 15
-            reasoning_parts.append(f"Innovation sector: {data.sector}")
-        else:
-            score -= 10
-            reasoning_parts.append(f"Traditional sector: {data.sector}")
-        
-        # Wall Street support helps
-        if report.wall_street_signal == "bullish":
-            score += 10
-            reasoning_parts.append("Institutional support")
-        
-        # News & Tech Disruption (NEW) - Critical for Cathie Wood
-        if report.tech_disruption_risk == "high":
-            # High tech disruption can be good (disruptor) or bad (disrupted)
-            if data.sector in ['Technology', 'Communications']:
-                score += 10
-                reasoning_parts.append("Tech disruption opportunity")
-            else:
-                score -= 15
-                reasoning_parts.append("Risk of being disrupted")
-        
-        if report.news_signal == "bullish" and report.key_news_opportunities:
-            score += 10
-            reasoning_parts.append("News indicates innovation opportunities")
-        
-        score = max(10, min(95, score))
-        
-        if score >= 65:
-            signal = "bullish"
-        elif score <= 35:
-            signal = "bearish"
-        else:
-            signal = "neutral"
+        fin = data.financials
+        sector = data.sector
+        innovation_score = fin.innovation_score
+        rd_ratio = fin.rd_to_revenue
+        revenue_growth = fin.revenue_growth_yoy
+        
+        score, hits = self._score(data, report)
+        reasoning = ""
+        if detailed:
+            reasoning_parts = _render_reasons(self.REASONS, hits, {
+                "innovation_score": innovation_score, "rd_ratio": rd_ratio,
+                "revenue_growth": revenue_growth, "sector": sector})
+            reasoning = "; ".join(reasoning_parts) if reasoning_parts else "Neutral on innovation potential"
         
         return AgentSignal(
             agent_name=self.name,
-            signal=signal,
+            signal=_signal_for(score),
             confidence=score,
-            reasoning="; ".join(reasoning_parts) if reasoning_parts else "Neutral on innovation potential",
+            reasoning=reasoning,
             key_metrics={
                 "innovation_score": innovation_score,
                 "rd_ratio": rd_ratio,
-                "revenue_growth": data.financials.revenue_growth_yoy,
-                "sector": data.sector
+                "revenue_growth": revenue_growth,
+                "sector": sector
             }
         )
 
 
+# Tier 2 masters are stateless, so one set serves every fund instance
+_MASTERS = (
+    WarrenBuffettWithResearch(),
+    BenGrahamWithResearch(),
+    TechnicalAnalystWithResearch(),
+    RiskManagerWithResearch(),
+    CathieWoodWithResearch()
+)
+
+
+# Position sizing recommendation by (consensus signal, confidence > 70)
+_RECOMMENDATIONS = {
+    ("bullish", True): "Consider 5-10% position size",
+    ("bullish", False): "Consider 3-5% position size",
+    ("neutral", True): "Watchlist candidate, no position",
+    ("neutral", False): "Watchlist candidate, no position",
+    ("bearish", True): "Avoid or reduce position",
+    ("bearish", False): "Avoid or reduce position",
+}
+
+
+def _consensus(calls: Iterable[Tuple[str, int]]) -> Dict:
+    """Consensus signal, confidence, agreement and sizing from the masters' (signal, confidence) calls"""
+    counts = Counter()
+    total_confidence = 0
+    for signal, confidence in calls:
+        counts[signal] += 1
+        total_confidence += confidence
+    bullish_count = counts["bullish"]
+    bearish_count = counts["bearish"]
+    neutral_count = counts["neutral"]
+    total = sum(counts.values())
+    
+    avg_confidence = total_confidence / total if total > 0 else 50
+    
+    # Determine consensus
+    if bullish_count > bearish_count and bullish_count > neutral_count:
+        consensus_signal = "bullish"
+        consensus_confidence = int(avg_confidence * (bullish_count / total))
+    elif bearish_count > bullish_count and bearish_count > neutral_count:
+        consensus_signal = "bearish"
+        consensus_confidence = int(avg_confidence * (bearish_count / total))
+    else:
+        consensus_signal = "neutral"
+        consensus_confidence = int(avg_confidence * 0.7)
+    
+    return {
+        "signal": consensus_signal,
+        "confidence": consensus_confidence,
+        "agreement": f"{bullish_count}/{total} bullish, {bearish_count}/{total} bearish",
+        "recommendation": _RECOMMENDATIONS[consensus_signal, consensus_confidence > 70]
+    }
+
+
 class TwoTierAIHedgeFund:
     """Two-tier AI Hedge Fund: Analysts → Investment Masters"""
     
-    def __init__(self):
-        self.data_fetcher = EnhancedDataFetcher()
-        self.analyst_team = DataAnalystTeam()
+    def __init__(self, use_cache: bool = True):
+        self.data_fetcher = EnhancedDataFetcher(use_cache=use_cache)
+        self.analyst_team = DataAnalystTeam(use_cache=use_cache)
         
         # Tier 2: Investment Masters (informed by research)
-        self.investment_masters = [
-            WarrenBuffettWithResearch(),
-            BenGrahamWithResearch(),
-            TechnicalAnalystWithResearch(),
-            RiskManagerWithResearch(),
-            CathieWoodWithResearch()
-        ]
+        self.investment_masters = list(_MASTERS)
+        for master in self.investment_masters:
+            unknown = getattr(master, 'needs', frozenset()) - self.analyst_team.analyst_names
+            if unknown:
+                raise ValueError(f"Master {master.name} needs unknown analysts: {sorted(unknown)}")
     
-    def analyze(self, ticker: str, detailed: bool = False):
-        """Two-tier analysis process"""
-        
-        # Step 1: Fetch all data
-        data = self.data_fetcher.get_enhanced_data(ticker)
-        
-        # Step 2: Tier 1 - Analysts generate research report
-        research_report = self.analyst_team.generate_research_report(data)
+    def close(self):
+        """Kept for compatibility; the shared _POOL is shut down at exit"""
+        self.analyst_team.close()
+    
+    def analyze_batch(self, tickers: List[str]) -> Dict[str, Dict]:
+        """Score-only two-tier analysis of many tickers.
+        
+        Each master scores the whole batch column-wise, so results carry the consensus
+        and research reports but not the per-master signals and reasoning.
+        """
+        datas = list(self.data_fetcher.get_enhanced_data_batch(tickers).values())
+        batch = self.analyst_team.generate_research_report_batch(datas)
+        scored = [master.analyze_batch(batch) for master in self.investment_masters]
+        
+        results = {}
+        for i, (ticker, report) in enumerate(zip(batch.tickers, batch.reports)):
+            consensus = _consensus((_SIGNAL_LABELS[signal_idx[i]], int(confidence[i]))
+                                   for signal_idx, confidence in scored)
+            results[ticker] = {"ticker": ticker, **consensus, "research_report": report}
+        return results
+    
+    def analyze_many(self, tickers: List[str], detailed: bool = False) -> Dict[str, Dict]:
+        """Two-tier analysis for several tickers, prefetching their data in one batch"""
+        prefetched = self.data_fetcher.get_enhanced_data_batch(tickers)
+        # Tickers get their own short-lived pool: each analyze blocks on analyst and
+        # master tasks in _POOL, so running it there too could exhaust the workers
+        with ThreadPoolExecutor(max_workers=max(1, min(8, len(prefetched))),
+                                thread_name_prefix="ticker") as executor:
+            futures = [(t, executor.submit(self.analyze, t, detailed, data))
+                       for t, data in prefetched.items()]
+            return {t: future.result() for t, future in futures}
+    
+    async def analyze_async(self, ticker: str, detailed: bool = False):
+        """Async variant of analyze, so many tickers can share one event loop"""
+        data = await self.data_fetcher.get_enhanced_data_async(ticker)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.analyze, ticker, detailed, data)
+    
+    def analyze(self, ticker: str, detailed: bool = False,
+                data: Optional[EnhancedStockData] = None):
+        """Two-tier analysis process; master reasoning is only built when detailed"""
+        
+        # Step 1: Fetch all data (unless prefetched by analyze_many)
+        if data is None:
+            data = self.data_fetcher.get_enhanced_data(ticker)
+        
+        # Step 2+3: Tier 1 analysts build the research report while each Tier 2
+        # master starts as soon as the analyst sections it reads are in (data and
+        # report fields are only read once compiled)
+        futures = {}
+        
+        def start_ready_masters(report: AnalystReport, ready: FrozenSet[str]):
+            # Once every analyst is in, start whatever hasn't started, so a master
+            # whose needs can never be met still runs rather than going missing
+            all_ready = len(ready) == len(self.analyst_team.analysts)
+            for master in self.investment_masters:
+                needs = getattr(master, 'needs', None)
+                if master not in futures and (all_ready or needs is not None and needs <= ready):
+                    futures[master] = _POOL.submit(master.analyze_with_report, data, report, detailed)
+        
+        research_report = self.analyst_team.generate_research_report(data, on_ready=start_ready_masters)
         
-        # Step 3: Tier 2 - Investment Masters review research and decide
         master_signals = []
         for master in self.investment_masters:
             try:
-                signal = master.analyze_with_report(data, research_report)
-                master_signals.append(signal)
+                master_signals.append(futures[master].result())
             except Exception as e:
                 print(f"Master {master.name} failed: {e}", file=sys.stderr)
         
         # Step 4: Generate consensus from masters' decisions
-        bullish_count = sum(1 for s in master_signals if s.signal == "bullish")
-        bearish_count = sum(1 for s in master_signals if s.signal == "bearish")
-        neutral_count = sum(1 for s in master_signals if s.signal == "neutral")
-        total = len(master_signals)
-        
-        total_confidence = sum(s.confidence for s in master_signals)
-        avg_confidence = total_confidence / total if total > 0 else 50
-        
-        # Determine consensus
-        if bullish_count > bearish_count and bullish_count > neutral_count:
-            consensus_signal = "bullish"
-            consensus_confidence = int(avg_confidence * (bullish_count / total))
-        elif bearish_count > bullish_count and bearish_count > neutral_count:
-            consensus_signal = "bearish"
-            consensus_confidence = int(avg_confidence * (bearish_count / total))
-        else:
-            consensus_signal = "neutral"
-            consensus_confidence = int(avg_confidence * 0.7)
-        
-        # Position sizing recommendation
-        if consensus_signal == "bullish" and consensus_confidence > 70:
-            recommendation = "Consider 5-10% position size"
-        elif consensus_signal == "bullish":
-            recommendation = "Consider 3-5% position size"
-        elif consensus_signal == "neutral":
-            recommendation = "Watchlist candidate, no position"
-        else:
-            recommendation = "Avoid or reduce position"
+        consensus = _consensus((s.signal, s.confidence) for s in master_signals)
         
         return {
             "ticker": ticker,
-            "signal": consensus_signal,
-            "confidence": consensus_confidence,
-            "agreement": f"{bullish_count}/{total} bullish, {bearish_count}/{total} bearish",
+            "signal": consensus["signal"],
+            "confidence": consensus["confidence"],
+            "agreement": consensus["agreement"],
             "master_signals": master_signals,
             "research_report": research_report,
-            "recommendation": recommendation
+            "recommendation": consensus["recommendation"]
         }
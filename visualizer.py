@@ -4,9 +4,98 @@ Generate charts for financial analysis
 """
 
 import os
-from typing import Dict, Optional
+import operator
+from collections import deque
+from functools import lru_cache
+from typing import Dict, Optional, TextIO, Tuple
 from dataclasses import dataclass
 
+import numpy as np
+
+_SEP_EQ = {70: "=" * 70, 100: "=" * 100}
+_SEP_DASH = {50: "─" * 50, 70: "─" * 70, 100: "─" * 100}
+
+# Traffic-light markers, indexed by how many thresholds a score clears
+_EMOJIS = ("🔴", "🟡", "🟢")
+
+
+def _runs(char: str, n: int) -> Tuple[str, ...]:
+    """Pre-built runs of char, indexed by length 0..n"""
+    return tuple(char * i for i in range(n + 1))
+
+
+# eq=False keeps identity hashing, so a glyph set can key the render caches
+@dataclass(frozen=True, eq=False)
+class _Glyphs:
+    """Markers and pre-built bar segments for one output mode"""
+    lights: Tuple[str, str, str]
+    ok: str
+    bad: str
+    bar20: Tuple[Tuple[str, ...], Tuple[str, ...]]
+    bar25: Tuple[Tuple[str, ...], Tuple[str, ...]]
+    stars10: Tuple[Tuple[str, ...], Tuple[str, ...]]
+    sep_dash: Dict[int, str]
+    icons: bool
+    
+    def icon(self, prefix: str) -> str:
+        """Decorative heading icon, dropped in ASCII mode"""
+        return prefix if self.icons else ""
+
+
+def _make_glyphs(lights, ok, bad, full, empty, star, unstar, dash, icons) -> _Glyphs:
+    return _Glyphs(
+        lights, ok, bad,
+        bar20=(_runs(full, 20), _runs(empty, 20)),
+        bar25=(_runs(full, 25), _runs(empty, 25)),
+        stars10=(_runs(star, 10), _runs(unstar, 10)),
+        sep_dash={n: dash * n for n in _SEP_DASH},
+        icons=icons,
+    )
+
+
+_UNICODE_GLYPHS = _make_glyphs(_EMOJIS, "✅", "❌", "█", "░", "★", "☆", "─", icons=True)
+_ASCII_GLYPHS = _make_glyphs(("!", "~", "+"), "+", "!", "#", ".", "*", ".", "-", icons=False)
+
+# Radar dimensions: (icon, label, key, benchmark, lower-is-better)
+_RADAR_DIMENSIONS = (
+    ("💰 ", "Profitability", "operating_margin", 30, False),
+    ("📊 ", "Efficiency", "return_on_equity", 40, False),
+    ("⚖️  ", "Low Leverage", "debt_to_equity", 2, True),
+    ("💵 ", "Cash Generation", "free_cash_flow", 10000, False),
+    ("🔬 ", "Innovation", "rd_to_revenue", 20, False),
+    ("📈 ", "Growth", "revenue_growth_yoy", 30, False),
+)
+_RADAR_BENCH = np.array([d[3] for d in _RADAR_DIMENSIONS], dtype=np.float64)
+_RADAR_REV = np.array([d[4] for d in _RADAR_DIMENSIONS])
+
+# Metrics to compare: (label, key, unit, decimals)
+_COMPARISON_METRICS = (
+    ("Health Score", "financial_health_score", "", 0),
+    ("Innovation Score", "innovation_score", "", 0),
+    ("Operating Margin", "operating_margin", "%", 1),
+    ("ROE", "return_on_equity", "%", 1),
+    ("Debt/Equity", "debt_to_equity", "x", 2),
+    ("Current Ratio", "current_ratio", "x", 2),
+    ("FCF ($M)", "free_cash_flow", "", 0),
+    ("R&D/Revenue", "rd_to_revenue", "%", 1),
+    ("CapEx/Revenue", "capex_to_revenue", "%", 1),
+)
+
+# Comparison cell formatters, indexed by decimal places
+_CELL_FMT = ("{:>14.0f}{}".format, "{:>14.1f}{}".format, "{:>14.2f}{}".format)
+_CELL_NA = "N/A".rjust(15)
+
+# Summary metrics: (key, line template, marker rules, fallback marker). A rule is
+# (compare, bound, marker); the first rule that holds for the value picks the marker.
+_SUMMARY_METRICS = (
+    ("operating_margin", "  💵 Operating Margin: {v:.1f}%", (), None),
+    ("debt_to_equity", "  {m} Debt/Equity: {v:.2f}x",
+     ((operator.lt, 0.5, "✅"), (operator.lt, 1.5, "⚠️")), "❌"),
+    ("return_on_equity", "  📊 ROE: {v:.1f}%", (), None),
+    ("free_cash_flow", "  {m} Free Cash Flow: ${v:,.0f}M", ((operator.gt, 0, "✅"),), "❌"),
+    ("rd_to_revenue", "  🔬 R&D: {v:.1f}% of revenue", (), None),
+)
+
 
 @dataclass
 class ChartConfig:
@@ -14,6 +103,8 @@ class ChartConfig:
     width: int = 800
     height: int = 600
     output_dir: str = "."
+    ascii_only: bool = False  # Plain ASCII markers and bars, e.g. for logs
+    history_size: int = 256   # Most recent charts kept in charts_generated
 
 
 class FinancialVisualizer:
@@ -21,258 +112,226 @@ class FinancialVisualizer:
     
     def __init__(self, config: Optional[ChartConfig] = None):
         self.config = config or ChartConfig()
-        self.charts_generated = []
+        self.charts_generated = deque(maxlen=self.config.history_size)
+        self._glyphs = _ASCII_GLYPHS if self.config.ascii_only else _UNICODE_GLYPHS
     
-    def generate_ascii_health_dashboard(self, ticker: str, financials: Dict) -> str:
-        """Generate ASCII art financial health dashboard"""
+    def generate_ascii_health_dashboard(self, ticker: str, financials: Dict,
+                                        out: Optional[TextIO] = None) -> str:
+        """Generate ASCII art financial health dashboard
+        
+        If out is given, lines are written straight to it and "" is returned.
+        """
+        g = self._glyphs
         lines = []
-        lines.append(f"\n{'='*70}")
-        lines.append(f"📊 FINANCIAL HEALTH DASHBOARD: {ticker}")
-        lines.append(f"{'='*70}\n")
+        emit = lines.append if out is None else (lambda line: out.write(f"{line}\n"))
+        emit(f"\n{_SEP_EQ[70]}")
+        emit(f"{g.icon('📊 ')}FINANCIAL HEALTH DASHBOARD: {ticker}")
+        emit(f"{_SEP_EQ[70]}\n")
         
         # Health Score Gauge
         health_score = financials.get('financial_health_score', 50)
-        lines.append(self._create_gauge("Financial Health", health_score, 100))
+        emit(self._create_gauge("Financial Health", health_score, 100))
         
         # Innovation Score Gauge
         innovation_score = financials.get('innovation_score', 50)
-        lines.append(self._create_gauge("Innovation Score", innovation_score, 100))
+        emit(self._create_gauge("Innovation Score", innovation_score, 100))
         
-        lines.append(f"\n{'─'*70}\n")
+        emit(f"\n{g.sep_dash[70]}\n")
         
         # Profitability Section
-        lines.append("💰 PROFITABILITY:")
+        emit(f"{g.icon('💰 ')}PROFITABILITY:")
         op_margin = financials.get('operating_margin')
         if op_margin is not None:
-            lines.append(self._create_bar("Operating Margin", op_margin, 50, "%"))
+            emit(self._create_bar("Operating Margin", op_margin, 50, "%"))
         
         gross_margin = financials.get('gross_margin')
         if gross_margin is not None:
-            lines.append(self._create_bar("Gross Margin", gross_margin, 80, "%"))
+            emit(self._create_bar("Gross Margin", gross_margin, 80, "%"))
         
         roe = financials.get('return_on_equity')
         if roe is not None:
-            lines.append(self._create_bar("ROE", roe, 50, "%"))
+            emit(self._create_bar("ROE", roe, 50, "%"))
         
-        lines.append(f"\n{'─'*70}\n")
+        emit(f"\n{g.sep_dash[70]}\n")
         
         # Debt Section
-        lines.append("⚖️  DEBT & LEVERAGE:")
+        emit(f"{g.icon('⚖️  ')}DEBT & LEVERAGE:")
         debt_to_equity = financials.get('debt_to_equity')
         if debt_to_equity is not None:
-            lines.append(self._create_bar("Debt/Equity", debt_to_equity, 3, "x", reverse=True))
+            emit(self._create_bar("Debt/Equity", debt_to_equity, 3, "x", reverse=True))
         
         current_ratio = financials.get('current_ratio')
         if current_ratio is not None:
-            lines.append(self._create_bar("Current Ratio", current_ratio, 3, "x"))
+            emit(self._create_bar("Current Ratio", current_ratio, 3, "x"))
         
-        lines.append(f"\n{'─'*70}\n")
+        emit(f"\n{g.sep_dash[70]}\n")
         
         # Cash Flow Section
-        lines.append("💵 CASH FLOW:")
+        emit(f"{g.icon('💵 ')}CASH FLOW:")
         fcf = financials.get('free_cash_flow')
         if fcf is not None:
-            lines.append(f"  Free Cash Flow: ${fcf:,.0f}M {'✅' if fcf > 0 else '❌'}")
+            emit(f"  Free Cash Flow: ${fcf:,.0f}M {g.ok if fcf > 0 else g.bad}")
         
         cash = financials.get('cash')
         if cash is not None:
-            lines.append(f"  Cash Position: ${cash:,.0f}M")
+            emit(f"  Cash Position: ${cash:,.0f}M")
         
-        lines.append(f"\n{'─'*70}\n")
+        emit(f"\n{g.sep_dash[70]}\n")
         
         # Innovation Section
-        lines.append("🔬 INNOVATION INVESTMENT:")
+        emit(f"{g.icon('🔬 ')}INNOVATION INVESTMENT:")
         rd_ratio = financials.get('rd_to_revenue')
         if rd_ratio is not None:
-            lines.append(self._create_bar("R&D / Revenue", rd_ratio, 25, "%"))
+            emit(self._create_bar("R&D / Revenue", rd_ratio, 25, "%"))
         
         capex_ratio = financials.get('capex_to_revenue')
         if capex_ratio is not None:
-            lines.append(self._create_bar("CapEx / Revenue", capex_ratio, 20, "%"))
+            emit(self._create_bar("CapEx / Revenue", capex_ratio, 20, "%"))
         
         rd_expense = financials.get('rd_expense')
         if rd_expense is not None:
-            lines.append(f"  R&D Expense: ${rd_expense:,.0f}M")
+            emit(f"  R&D Expense: ${rd_expense:,.0f}M")
         
-        lines.append(f"\n{'='*70}\n")
+        emit(f"\n{_SEP_EQ[70]}\n")
         
         return "\n".join(lines)
     
     def _create_gauge(self, label: str, value: float, max_val: float) -> str:
         """Create ASCII gauge"""
-        percentage = min(100, max(0, (value / max_val) * 100))
-        filled = int(percentage / 5)  # 20 segments
-        empty = 20 - filled
-        
-        # Color coding
-        if percentage >= 70:
-            emoji = "🟢"
-        elif percentage >= 50:
-            emoji = "🟡"
-        else:
-            emoji = "🔴"
-        
-        bar = "█" * filled + "░" * empty
-        return f"  {emoji} {label:20s} [{bar}] {value:.0f}/{max_val:.0f}"
+        return _gauge_cached(label, value, max_val, self._glyphs)
     
     def _create_bar(self, label: str, value: float, max_val: float, unit: str = "", reverse: bool = False) -> str:
         """Create ASCII horizontal bar"""
-        if reverse:
-            # For metrics where lower is better (like debt)
-            percentage = min(100, max(0, 100 - (value / max_val) * 100))
-        else:
-            percentage = min(100, max(0, (value / max_val) * 100))
-        
-        filled = int(percentage / 4)  # 25 segments
-        empty = 25 - filled
-        
-        # Color coding
-        if reverse:
-            # For reverse metrics (debt), green is low
-            if percentage >= 70:
-                emoji = "🟢"
-            elif percentage >= 40:
-                emoji = "🟡"
-            else:
-                emoji = "🔴"
-        else:
-            # Normal metrics
-            if percentage >= 70:
-                emoji = "🟢"
-            elif percentage >= 40:
-                emoji = "🟡"
-            else:
-                emoji = "🔴"
-        
-        bar = "█" * filled + "░" * empty
-        return f"  {emoji} {label:20s} [{bar}] {value:.1f}{unit}"
+        return _bar_cached(label, value, max_val, unit, reverse, self._glyphs)
+    
+    @staticmethod
+    def clear_cache():
+        """Drop memoized gauge and bar renderings"""
+        _gauge_cached.cache_clear()
+        _bar_cached.cache_clear()
     
     def generate_comparison_table(self, tickers: Dict[str, Dict]) -> str:
         """Generate side-by-side comparison table"""
+        g = self._glyphs
         lines = []
-        lines.append(f"\n{'='*100}")
-        lines.append(f"📊 MULTI-STOCK FINANCIAL COMPARISON")
-        lines.append(f"{'='*100}\n")
+        lines.append(f"\n{_SEP_EQ[100]}")
+        lines.append(f"{g.icon('📊 ')}MULTI-STOCK FINANCIAL COMPARISON")
+        lines.append(f"{_SEP_EQ[100]}\n")
         
         # Header
-        header = f"{'Metric':<25}"
+        header = [f"{'Metric':<25}"]
         for ticker in tickers.keys():
-            header += f"{ticker:>15}"
-        lines.append(header)
-        lines.append("─" * 100)
-        
-        # Metrics to compare
-        metrics = [
-            ("Health Score", "financial_health_score", "", 0),
-            ("Innovation Score", "innovation_score", "", 0),
-            ("Operating Margin", "operating_margin", "%", 1),
-            ("ROE", "return_on_equity", "%", 1),
-            ("Debt/Equity", "debt_to_equity", "x", 2),
-            ("Current Ratio", "current_ratio", "x", 2),
-            ("FCF ($M)", "free_cash_flow", "", 0),
-            ("R&D/Revenue", "rd_to_revenue", "%", 1),
-            ("CapEx/Revenue", "capex_to_revenue", "%", 1),
-        ]
+            header.append(f"{ticker:>15}")
+        lines.append("".join(header))
+        lines.append(g.sep_dash[100])
         
-        for label, key, unit, decimals in metrics:
-            row = f"{label:<25}"
-            for ticker, data in tickers.items():
+        columns = tuple(tickers.values())
+        for label, key, unit, decimals in _COMPARISON_METRICS:
+            cell_fmt = _CELL_FMT[decimals]
+            parts = [f"{label:<25}"]
+            for data in columns:
                 value = data.get(key)
                 if value is not None:
-                    if decimals == 0:
-                        row += f"{value:>14.0f}{unit}"
-                    elif decimals == 1:
-                        row += f"{value:>14.1f}{unit}"
-                    else:
-                        row += f"{value:>14.2f}{unit}"
+                    parts.append(cell_fmt(value, unit))
                 else:
-                    row += f"{'N/A':>15}"
-            lines.append(row)
+                    parts.append(_CELL_NA)
+            lines.append("".join(parts))
         
-        lines.append(f"\n{'='*100}\n")
+        lines.append(f"\n{_SEP_EQ[100]}\n")
         return "\n".join(lines)
     
     def generate_radar_summary(self, ticker: str, financials: Dict) -> str:
         """Generate text-based radar chart summary"""
+        g = self._glyphs
         lines = []
-        lines.append(f"\n{'='*70}")
-        lines.append(f"🎯 FINANCIAL PROFILE RADAR: {ticker}")
-        lines.append(f"{'='*70}\n")
+        lines.append(f"\n{_SEP_EQ[70]}")
+        lines.append(f"{g.icon('🎯 ')}FINANCIAL PROFILE RADAR: {ticker}")
+        lines.append(f"{_SEP_EQ[70]}\n")
         
-        dimensions = [
-            ("💰 Profitability", "operating_margin", 30, False),
-            ("📊 Efficiency", "return_on_equity", 40, False),
-            ("⚖️  Low Leverage", "debt_to_equity", 2, True),
-            ("💵 Cash Generation", "free_cash_flow", 10000, False),
-            ("🔬 Innovation", "rd_to_revenue", 20, False),
-            ("📈 Growth", "revenue_growth_yoy", 30, False),
-        ]
+        vals = np.fromiter(
+            (financials.get(key, 0) or 0 for _, _, key, _, _ in _RADAR_DIMENSIONS),
+            dtype=np.float64, count=len(_RADAR_DIMENSIONS),
+        )
+        ratio = vals / _RADAR_BENCH * 100
+        # Lower is better for reverse dimensions; NaN scores as 0
+        scores = np.nan_to_num(np.where(_RADAR_REV, 100 - ratio, ratio), nan=0.0).clip(0, 100)
+        filled_counts = (scores / 10).astype(np.intp)
         
-        for label, key, benchmark, reverse in dimensions:
-            value = financials.get(key, 0) or 0
-            if reverse:
-                # Lower is better
-                score = min(100, max(0, 100 - (value / benchmark) * 100))
-            else:
-                score = min(100, (value / benchmark) * 100)
-            
-            filled = int(score / 10)
-            empty = 10 - filled
-            
-            if score >= 70:
-                emoji = "🟢"
-            elif score >= 40:
-                emoji = "🟡"
-            else:
-                emoji = "🔴"
-            
-            stars = "★" * filled + "☆" * empty
-            lines.append(f"  {emoji} {label:18s} {stars} {score:.0f}/100")
+        stars_full, stars_empty = g.stars10
+        for (icon, label, *_), score, filled in zip(_RADAR_DIMENSIONS, scores.tolist(), filled_counts.tolist()):
+            emoji = g.lights[(score >= 40) + (score >= 70)]
+            stars = stars_full[filled] + stars_empty[10 - filled]
+            lines.append(f"  {emoji} {g.icon(icon) + label:18s} {stars} {score:.0f}/100")
         
-        lines.append(f"\n{'='*70}\n")
+        lines.append(f"\n{_SEP_EQ[70]}\n")
         return "\n".join(lines)
 
 
-def format_financial_summary(ticker: str, financials: Dict) -> str:
-    """Quick formatted summary of key financial metrics"""
-    lines = []
-    lines.append(f"\n  📈 Key Financial Metrics for {ticker}:")
-    lines.append(f"  {'─'*50}")
+@lru_cache(maxsize=1024)
+def _gauge_cached(label: str, value: float, max_val: float,
+                  glyphs: _Glyphs = _UNICODE_GLYPHS) -> str:
+    """Render a 20-segment gauge; pure in its arguments so safe to memoize"""
+    percentage = (value / max_val) * 100
+    # Inline clamp to 0..100; "not >" also sends NaN to 0 as max(0, nan) did
+    if not percentage > 0:
+        percentage = 0
+    elif percentage > 100:
+        percentage = 100
+    filled = int(percentage / 5)  # 20 segments
     
-    # Health indicators
-    health = financials.get('financial_health_score', 50)
-    innovation = financials.get('innovation_score', 50)
+    emoji = glyphs.lights[(percentage >= 50) + (percentage >= 70)]
     
-    health_emoji = "🟢" if health >= 70 else "🟡" if health >= 50 else "🔴"
-    innov_emoji = "🟢" if innovation >= 70 else "🟡" if innovation >= 50 else "🔴"
+    bar = glyphs.bar20[0][filled] + glyphs.bar20[1][20 - filled]
+    return f"  {emoji} {label:20s} [{bar}] {value:.0f}/{max_val:.0f}"
+
+
+@lru_cache(maxsize=1024)
+def _bar_cached(label: str, value: float, max_val: float, unit: str = "", reverse: bool = False,
+               glyphs: _Glyphs = _UNICODE_GLYPHS) -> str:
+    """Render a 25-segment bar; pure in its arguments so safe to memoize"""
+    if reverse:
+        # For metrics where lower is better (like debt)
+        percentage = 100 - (value / max_val) * 100
+    else:
+        percentage = (value / max_val) * 100
+    if not percentage > 0:
+        percentage = 0
+    elif percentage > 100:
+        percentage = 100
     
-    lines.append(f"  {health_emoji} Financial Health: {health}/100")
-    lines.append(f"  {innov_emoji} Innovation Score: {innovation}/100")
-    lines.append("")
+    filled = int(percentage / 4)  # 25 segments
     
-    # Key metrics
-    op_margin = financials.get('operating_margin')
-    if op_margin:
-        lines.append(f"  💵 Operating Margin: {op_margin:.1f}%")
+    # Reverse metrics were already flipped above, so green is always high
+    emoji = glyphs.lights[(percentage >= 40) + (percentage >= 70)]
     
-    debt = financials.get('debt_to_equity')
-    if debt:
-        debt_emoji = "✅" if debt < 0.5 else "⚠️" if debt < 1.5 else "❌"
-        lines.append(f"  {debt_emoji} Debt/Equity: {debt:.2f}x")
+    bar = glyphs.bar25[0][filled] + glyphs.bar25[1][25 - filled]
+    return f"  {emoji} {label:20s} [{bar}] {value:.1f}{unit}"
+
+
+def format_financial_summary(ticker: str, financials: Dict) -> str:
+    """Quick formatted summary of key financial metrics"""
+    get = financials.get
     
-    roe = financials.get('return_on_equity')
-    if roe:
-        lines.append(f"  📊 ROE: {roe:.1f}%")
+    # Health indicators
+    health = get('financial_health_score', 50)
+    innovation = get('innovation_score', 50)
     
-    fcf = financials.get('free_cash_flow')
-    if fcf:
-        fcf_emoji = "✅" if fcf > 0 else "❌"
-        lines.append(f"  {fcf_emoji} Free Cash Flow: ${fcf:,.0f}M")
+    lines = [
+        f"\n  📈 Key Financial Metrics for {ticker}:",
+        f"  {_SEP_DASH[50]}",
+        f"  {_EMOJIS[(health >= 50) + (health >= 70)]} Financial Health: {health}/100",
+        f"  {_EMOJIS[(innovation >= 50) + (innovation >= 70)]} Innovation Score: {innovation}/100",
+        "",
+    ]
     
-    rd = financials.get('rd_to_revenue')
-    if rd:
-        lines.append(f"  🔬 R&D: {rd:.1f}% of revenue")
+    # Key metrics (missing or zero values are left out)
+    for key, template, rules, fallback in _SUMMARY_METRICS:
+        value = get(key)
+        if not value:
+            continue
+        marker = next((m for compare, bound, m in rules if compare(value, bound)), fallback)
+        lines.append(template.format(v=value, m=marker))
     
-    lines.append(f"  {'─'*50}\n")
+    lines.append(f"  {_SEP_DASH[50]}\n")
     
     return "\n".join(lines)
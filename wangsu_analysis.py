@@ -5,6 +5,30 @@
 """
 
 import sys
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from base import DailyPickleCache
+
+# Per-day cache of AKShare responses, alongside the other CLI tools' caches
+_AKSHARE_CACHE = DailyPickleCache("akshare")
+
+
+def cached_call(fn, **kwargs):
+    """Call an AKShare endpoint, reusing today's on-disk result if present"""
+    key = "_".join([fn.__name__, *map(str, kwargs.values())])
+    result = _AKSHARE_CACHE.get(key)
+    if result is not None:
+        return result
+    
+    result = fn(**kwargs)
+    if getattr(result, 'empty', False):
+        return result  # Don't pin an empty response for the rest of the day
+    _AKSHARE_CACHE.put(key, result)
+    return result
+
 
 try:
     import akshare as ak
@@ -16,12 +40,27 @@ try:
     print("🇨🇳 网宿科技 (300017) 快速分析")
     print("="*70 + "\n")
     
+    # Only the last two sessions are shown; a month covers the longest market holiday
+    today = datetime.now()
+    quote_start = f"{today - timedelta(days=30):%Y%m%d}"
+    
+    # Issue all four requests up front; each section waits only for its own
+    executor = ThreadPoolExecutor(max_workers=4)
+    futures = {
+        "info": executor.submit(cached_call, ak.stock_individual_info_em, symbol=ticker),
+        "quote": executor.submit(ak.stock_zh_a_hist, symbol=ticker, period="daily",
+                                 start_date=quote_start, end_date=f"{today:%Y%m%d}", adjust="qfq"),
+        "financials": executor.submit(cached_call, ak.stock_financial_analysis_indicator, symbol=ticker),
+        "news": executor.submit(cached_call, ak.stock_news_em, symbol=ticker),
+    }
+    executor.shutdown(wait=False)
+    
     # Method 1: Get individual stock info
     print("📋 获取公司基本信息...")
     try:
-        info_df = ak.stock_individual_info_em(symbol=ticker)
+        info_df = futures["info"].result()
         if not info_df.empty:
-            info = dict(zip(info_df['item'], info_df['value']))
+            info = info_df.set_index('item')['value'].to_dict()
             print(f"  股票名称: {info.get('股票简称', '网宿科技')}")
             print(f"  所属行业: {info.get('行业', '未知')}")
             print(f"  总市值: {info.get('总市值', 'N/A')}")
@@ -36,7 +75,7 @@ try:
     print("💹 获取实时行情...")
     try:
         # Use individual stock real-time quote
-        quote_df = ak.stock_zh_a_hist(symbol=ticker, period="daily", start_date="20250217", adjust="qfq")
+        quote_df = futures["quote"].result()
         if not quote_df.empty:
             latest = quote_df.iloc[-1]
             prev = quote_df.iloc[-2] if len(quote_df) > 1 else latest
@@ -60,7 +99,7 @@ try:
     # Method 3: Get financial indicators
     print("💰 获取财务指标...")
     try:
-        fin_df = ak.stock_financial_analysis_indicator(symbol=ticker)
+        fin_df = futures["financials"].result()
         if not fin_df.empty:
             latest = fin_df.iloc[0]
             print(f"  净资产收益率(ROE): {latest.get('净资产收益率(%)', 'N/A')}%")
@@ -75,13 +114,15 @@ try:
     # Method 4: Get news
     print("📰 获取最新新闻...")
     try:
-        news_df = ak.stock_news_em(symbol=ticker)
+        news_df = futures["news"].result()
         if not news_df.empty:
             print(f"  最新5条新闻:")
-            for i, (_, row) in enumerate(news_df.head(5).iterrows(), 1):
-                title = row['标题'][:40] + "..." if len(row['标题']) > 40 else row['标题']
+            latest_news = news_df.head(5)[['标题', '来源', '发布时间']].itertuples(index=False, name=None)
+            for i, (title, source, published) in enumerate(latest_news, 1):
+                if len(title) > 40:
+                    title = f"{title[:40]}..."
                 print(f"    {i}. {title}")
-                print(f"       来源: {row['来源']} | {row['发布时间']}")
+                print(f"       来源: {source} | {published}")
     except Exception as e:
         print(f"  新闻获取失败: {e}")
     